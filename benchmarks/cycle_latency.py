@@ -0,0 +1,90 @@
+"""Measure poll latency against the fake logger, under injected faults.
+
+Starts benchmarks/logger_simulator.py in-process and runs InverterData
+polls against it, with the same time budget as the coordinator:
+
+  cycles    polls run
+  failed    polls that raised (all core blocks failed, or no connection)
+  partial   polls that returned with some blocks skipped or failed
+  p50, p95, max   poll duration in milliseconds
+  requests  requests the logger received
+
+Usage: python benchmarks/cycle_latency.py [--cycles N] [--latency S]
+           [--jitter S] [--timeout-rate P] [--drop-rate P] [--corrupt-rate P]
+Prints one JSON object.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.logger_simulator import Faults, LoggerSimulator  # noqa: E402
+from custom_components.deye_inverter.const import DEFAULT_POLL_BUDGET  # noqa: E402
+from custom_components.deye_inverter.InverterData import InverterData  # noqa: E402
+
+SERIAL = 1234567890
+
+
+async def run(args: argparse.Namespace) -> dict:
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        timeout_rate=args.timeout_rate,
+        drop_rate=args.drop_rate,
+        corrupt_rate=args.corrupt_rate,
+    )
+    durations = []
+    failed = partial = 0
+    async with LoggerSimulator(SERIAL, {0x0000: 0x0003}, faults, args.seed) as sim:
+        inverter = InverterData("127.0.0.1", sim.port, str(SERIAL))
+        try:
+            await inverter.connect()
+        except Exception:
+            pass  # the first poll connects again
+        for _ in range(args.cycles):
+            start = time.perf_counter()
+            try:
+                snapshot = await inverter.fetch_data(budget=args.budget)
+            except Exception:
+                failed += 1
+            else:
+                partial += snapshot.partial
+            durations.append((time.perf_counter() - start) * 1e3)
+        await inverter.close()
+        requests = len(sim.stats.requests)
+    durations.sort()
+    return {
+        "cycles": args.cycles,
+        "failed": failed,
+        "partial": partial,
+        "p50": round(statistics.median(durations), 1),
+        "p95": round(durations[min(int(0.95 * len(durations)), len(durations) - 1)], 1),
+        "max": round(durations[-1], 1),
+        "requests": requests,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=DEFAULT_POLL_BUDGET)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--corrupt-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    print(json.dumps(asyncio.run(run(parser.parse_args()))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure import and definitions-load time of the parser module.
+
+Each sample runs in a fresh interpreter with bytecode caching on, as in a
+real install. Home Assistant and pysolarmanv5 are imported before the clock
+starts, so only this integration is measured:
+
+  import  importing the package and InverterDataParser
+  cold    first load_compiled_definitions() with no compiled cache
+  warm    the same with the cache in place (the normal restart path)
+
+Usage: python benchmarks/import_time.py [--runs N]
+Prints one JSON object with the median of each phase in milliseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_FILE = ROOT / "custom_components/deye_inverter/__pycache__/DYRealTime.plan"
+
+SAMPLE = """
+import json, time
+import homeassistant.config_entries, homeassistant.helpers.update_coordinator
+import homeassistant.components.sensor, pysolarmanv5
+t0 = time.perf_counter()
+from custom_components.deye_inverter import InverterDataParser as parser
+t1 = time.perf_counter()
+parser.load_compiled_definitions()
+t2 = time.perf_counter()
+print(json.dumps({"import": (t1 - t0) * 1e3, "load": (t2 - t1) * 1e3}))
+"""
+
+
+def sample() -> dict[str, float]:
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    out = subprocess.run(
+        [sys.executable, "-c", SAMPLE],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    sample()  # write the bytecode caches
+    imports, cold, warm = [], [], []
+    for _ in range(args.runs):
+        CACHE_FILE.unlink(missing_ok=True)
+        first = sample()
+        second = sample()
+        imports += [first["import"], second["import"]]
+        cold.append(first["load"])
+        warm.append(second["load"])
+
+    print(
+        json.dumps(
+            {
+                "runs": args.runs,
+                "import_ms": round(statistics.median(imports), 3),
+                "load_cold_ms": round(statistics.median(cold), 3),
+                "load_warm_ms": round(statistics.median(warm), 3),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
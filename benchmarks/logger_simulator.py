@@ -0,0 +1,286 @@
+"""Fake Solarman V5 data logger, for testing without an inverter.
+
+An asyncio TCP server that speaks the Solarman V5 framing and answers
+Read Holding Registers requests from a register image, with injectable
+faults:
+
+  latency, jitter   seconds added to every answer (jitter: uniform extra)
+  timeout_rate      share of requests left unanswered
+  drop_rate         share of requests answered by closing the connection
+  corrupt_rate      share of answers with a broken Modbus CRC
+  illegal           registers answered with an illegal-address exception
+  max_registers     longer requests get an illegal-data-value exception
+  single_client     further connections are closed right away while one
+                    client is connected, like most loggers do
+
+Registers not in the image read as 0, as on a real logger. The image is
+a plain dict, so a test or script can change values between reads. With
+units (slave ID -> image) the logger fronts several inverters on its
+RS485 bus, and requests for other slave IDs go unanswered.
+
+Usage: python benchmarks/logger_simulator.py [--port 8899] [--serial N]
+           [--registers FILE] [--latency S] [--timeout-rate P] ...
+FILE is a JSON object of register address (e.g. "0x00BA") -> word.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from umodbus.client.serial.redundancy_check import get_crc  # noqa: E402
+
+# V5 control codes
+_REQUEST = 0x4510
+_RESPONSE = 0x1510
+# Frame type 0x02, sensor type and three 32-bit times before the Modbus frame
+_REQUEST_HEADER = 15
+# Modbus exception codes
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_ADDRESS = 0x02
+ILLEGAL_VALUE = 0x03
+
+
+@dataclass
+class Faults:
+    """Faults injected into the answers; rates are probabilities 0..1."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    timeout_rate: float = 0.0
+    drop_rate: float = 0.0
+    corrupt_rate: float = 0.0
+    illegal: set[int] = field(default_factory=set)
+    max_registers: int = 125
+    single_client: bool = True
+
+
+@dataclass
+class Stats:
+    """What the simulator was asked and how it answered."""
+
+    connections: int = 0
+    rejected_connections: int = 0
+    # (first register, quantity) of every request, in order
+    requests: list[tuple[int, int]] = field(default_factory=list)
+    answered: int = 0
+    timeouts: int = 0
+    drops: int = 0
+    corrupted: int = 0
+    exceptions: int = 0
+
+
+def v5_checksum(frame: bytes | bytearray) -> int:
+    """Sum of the bytes between start and checksum, as Solarman loggers use."""
+    return sum(frame[1:-2]) & 0xFF
+
+
+def v5_response(request: bytes, modbus_frame: bytes) -> bytes:
+    """V5 frame answering request with modbus_frame."""
+    header = struct.pack(
+        "<BHH2s4s", 0xA5, 14 + len(modbus_frame), _RESPONSE, request[5:7], request[7:11]
+    )
+    # Frame type, status, total working time, power-on time, offset time
+    payload = bytes([0x02, 0x01]) + bytes(12) + modbus_frame
+    frame = bytearray(header + payload + b"\x00\x15")
+    frame[-2] = v5_checksum(frame)
+    return bytes(frame)
+
+
+def modbus_exception(slave: int, function: int, code: int) -> bytes:
+    body = bytes([slave, function | 0x80, code])
+    return body + get_crc(body)
+
+
+class LoggerSimulator:
+    """A fake logger serving registers on a TCP port."""
+
+    def __init__(
+        self,
+        serial: int,
+        registers: dict[int, int] | None = None,
+        faults: Faults | None = None,
+        seed: int | None = None,
+        units: dict[int, dict[int, int]] | None = None,
+    ) -> None:
+        self.serial = serial
+        self.registers = {} if registers is None else registers
+        self.units = units
+        self.faults = Faults() if faults is None else faults
+        self.stats = Stats()
+        self.port = 0
+        self._random = random.Random(seed)
+        self._server: asyncio.base_events.Server | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Listen on host:port (0: any free port); returns the port."""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        """Close the server and every client connection."""
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._clients):
+            writer.close()
+        # Closed connections end their handlers; wait for them
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    def drop_clients(self) -> None:
+        """Close the connected clients' connections, as a logger reboot does."""
+        for writer in list(self._clients):
+            writer.close()
+
+    async def __aenter__(self) -> LoggerSimulator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.stop()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        if self.faults.single_client and self._clients:
+            self.stats.rejected_connections += 1
+            writer.close()
+            return
+        self.stats.connections += 1
+        self._clients.add(writer)
+        task = asyncio.current_task()
+        assert task is not None
+        self._tasks.add(task)
+        try:
+            while True:
+                head = await reader.readexactly(3)
+                (length,) = struct.unpack("<H", head[1:3])
+                frame = head + await reader.readexactly(length + 10)
+                if not await self._answer(frame, writer):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            self._tasks.discard(task)
+            writer.close()
+
+    async def _answer(self, frame: bytes, writer: asyncio.StreamWriter) -> bool:
+        """Answer one V5 request; False once the connection is to be closed."""
+        faults = self.faults
+        if (
+            frame[0] != 0xA5
+            or frame[-1] != 0x15
+            or frame[-2] != v5_checksum(frame)
+            or struct.unpack("<H", frame[3:5])[0] != _REQUEST
+            or struct.unpack("<I", frame[7:11])[0] != self.serial
+        ):
+            return True  # loggers ignore frames that are not for them
+        request = frame[11 + _REQUEST_HEADER : -2]
+        slave, function, first, quantity = struct.unpack(">BBHH", request[:6])
+        self.stats.requests.append((first, quantity))
+        registers = self.registers
+        if self.units is not None:
+            if slave not in self.units:
+                # No such unit on the bus: the logger's read times out
+                self.stats.timeouts += 1
+                return True
+            registers = self.units[slave]
+
+        delay = faults.latency + self._random.uniform(0, faults.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._random.random() < faults.drop_rate:
+            self.stats.drops += 1
+            return False
+        if self._random.random() < faults.timeout_rate:
+            self.stats.timeouts += 1
+            return True
+
+        if function != 0x03:
+            response = modbus_exception(slave, function, ILLEGAL_FUNCTION)
+        elif quantity > faults.max_registers:
+            response = modbus_exception(slave, function, ILLEGAL_VALUE)
+        elif any(first <= reg < first + quantity for reg in faults.illegal):
+            response = modbus_exception(slave, function, ILLEGAL_ADDRESS)
+        else:
+            words = [registers.get(reg, 0) for reg in range(first, first + quantity)]
+            body = bytes([slave, 0x03, 2 * quantity])
+            body += struct.pack(f">{quantity}H", *words)
+            response = body + get_crc(body)
+            if self._random.random() < faults.corrupt_rate:
+                self.stats.corrupted += 1
+                response = response[:-2] + bytes([response[-2] ^ 0xFF, response[-1]])
+        if response[1] & 0x80:
+            self.stats.exceptions += 1
+        writer.write(v5_response(frame, response))
+        await writer.drain()
+        self.stats.answered += 1
+        return True
+
+
+def _load_registers(path: str | None) -> dict[int, int]:
+    if path is None:
+        return {}
+    with open(path, encoding="utf-8") as file:
+        return {int(reg, 0): int(word) for reg, word in json.load(file).items()}
+
+
+async def _main(args: argparse.Namespace) -> None:
+    faults = Faults(
+        latency=args.latency,
+        jitter=args.jitter,
+        timeout_rate=args.timeout_rate,
+        drop_rate=args.drop_rate,
+        corrupt_rate=args.corrupt_rate,
+        illegal={int(reg, 0) for reg in args.illegal},
+        max_registers=args.max_registers,
+        single_client=not args.multi_client,
+    )
+    simulator = LoggerSimulator(args.serial, _load_registers(args.registers), faults)
+    port = await simulator.start(args.host, args.port)
+    print(f"Logger {args.serial} listening on {args.host}:{port}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--serial", type=int, default=1234567890)
+    parser.add_argument("--registers", help="JSON file of address -> word")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--corrupt-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--illegal", nargs="*", default=[], help="registers answered as illegal"
+    )
+    parser.add_argument("--max-registers", type=int, default=125)
+    parser.add_argument("--multi-client", action="store_true")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Micro-benchmarks of the register parser.
+
+Decodes a corpus of realistic register images (day, night, charging,
+discharging, exporting, optional blocks missing, alert bits set) and times
+the parser entry points, also against synthetic definitions scaled to 10x
+and 100x the items of DYRealTime.txt:
+
+  parse_raw            flat register list -> metrics dict
+  parse_image          RegisterImage -> metrics dict
+  combine_registers    one 32-bit value
+  _build_enum_mappings enum tables of the whole definitions
+  compile_definitions  plan, enum tables and sensor list
+  build_descriptions   sensor entity descriptions
+
+Each result has the median time per call over several rounds, the
+throughput (calls/s, i.e. snapshots/s for the parse functions), the peak
+memory allocated by one call and the memory blocks still allocated per
+call once its result is kept.
+
+Usage: python benchmarks/parser_bench.py [--quick] [--output FILE]
+Prints (or writes) one JSON document, to compare between versions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from custom_components.deye_inverter import InverterDataParser as parser  # noqa: E402
+from custom_components.deye_inverter.RegisterImage import (  # noqa: E402
+    RegisterImage,
+)
+from custom_components.deye_inverter.profiles import DEFAULT_PROFILE  # noqa: E402
+
+MANIFEST = ROOT / "custom_components/deye_inverter/manifest.json"
+
+# Engineering values per scenario, by metric title
+_DAY = {
+    "PV1 Power": 3150,
+    "PV2 Power": 2870,
+    "PV1 Voltage": 382.4,
+    "PV2 Voltage": 371.9,
+    "PV1 Current": 8.2,
+    "PV2 Current": 7.7,
+    "Daily Production": 18.6,
+    "Total Production": 15234.7,
+    "Battery Voltage": 53.12,
+    "Battery SOC": 72,
+    "Battery Temperature": 27.5,
+    "Daily Battery Charge": 6.4,
+    "Daily Battery Discharge": 3.1,
+    "Total Battery Charge": 4120.3,
+    "Total Battery Discharge": 3987.6,
+    "Grid Voltage L1": 231.2,
+    "Grid Voltage L2": 230.8,
+    "Daily Energy Bought": 2.3,
+    "Total Energy Bought": 6021.4,
+    "Daily Energy Sold": 4.9,
+    "Total Energy Sold": 2875.2,
+    "Total Grid Production": 9123.8,
+    "Grid Frequency": 50.01,
+    "Load Voltage": 231.0,
+    "Load Frequency": 50.01,
+    "Daily Load Consumption": 14.2,
+    "Total Load Consumption": 12876.5,
+    "Running Status": 2,
+    "DC Temperature": 41.3,
+    "AC Temperature": 46.8,
+    "Communication Board Version No.": 0x1054,
+    "Control Board Version No.": 0x2031,
+}
+
+
+def _flows(pv, battery, grid, load):
+    """Power flows (W); battery > 0 discharges, grid > 0 imports."""
+    return {
+        "PV1 Power": pv // 2,
+        "PV2 Power": pv - pv // 2,
+        "Battery Power": battery,
+        "Battery Current": round(battery / 53.0, 2),
+        "Total Grid Power": grid,
+        "Internal CT L1 Power": grid // 2,
+        "Internal CT L2 Power": grid - grid // 2,
+        "External CT L1 Power": grid // 2,
+        "External CT L2 Power": grid - grid // 2,
+        "Grid Current L1": round(grid / 2 / 231, 2),
+        "Grid Current L2": round(grid / 2 / 231, 2),
+        "Total Load Power": load,
+        "Load L1 Power": load // 2,
+        "Load L2 Power": load - load // 2,
+        "Total Power": pv + battery,
+        "Inverter L1 Power": (pv + battery) // 2,
+        "Inverter L2 Power": (pv + battery) - (pv + battery) // 2,
+        "Current L1": round((pv + battery) / 2 / 231, 2),
+        "Current L2": round((pv + battery) / 2 / 231, 2),
+    }
+
+
+SCENARIOS: dict[str, dict[str, Any]] = {
+    "day": {**_DAY, **_flows(6020, 0, 120, 2400)},
+    "night": {
+        **_DAY,
+        **_flows(0, 780, 0, 780),
+        "PV1 Voltage": 0.0,
+        "PV2 Voltage": 0.0,
+        "PV1 Current": 0.0,
+        "PV2 Current": 0.0,
+        "Battery SOC": 41,
+    },
+    "charge": {**_DAY, **_flows(5200, -3400, 0, 1800), "Battery SOC": 55},
+    "discharge": {**_DAY, **_flows(900, 2600, 0, 3500), "Battery SOC": 63},
+    "export": {**_DAY, **_flows(7400, 0, -4900, 2500), "Battery SOC": 100},
+    "missing_optional": {**_DAY, **_flows(4300, -1200, 0, 3100)},
+    "alerts": {**_DAY, **_flows(0, 0, 1900, 1900), "Running Status": 3},
+}
+
+# Raw words set directly, by register address
+_RAW_WORDS: dict[str, dict[int, int]] = {
+    # A few alert bits set in three of the six alert words
+    "alerts": {0x0065: 0x0001, 0x0066: 0x0040, 0x0068: 0x8000},
+}
+_OPTIONAL = {
+    # Inverter ID "2306123456", work mode zero-export to load with solar sell
+    **{0x0003 + i: w for i, w in enumerate((0x3233, 0x3036, 0x3132, 0x3334, 0x3536))},
+    0x00F4: 1,
+    0x00F7: 1,
+    0x00F8: 1,
+}
+
+
+def _encode(values: dict[str, Any], words: dict[int, int]) -> list[int | None]:
+    """Flat register list that parses back to values."""
+    plan = parser.compile_plan(parser._load_definitions())
+    assert plan is not None
+    indices = parser._register_indices()
+    raw: list[int | None] = [0] * plan.width
+    for metric in plan.metrics:
+        value = values.get(metric.title)
+        if value is None or metric.kind not in (
+            parser.KIND_NUMERIC,
+            parser.KIND_TEMPERATURE,
+            parser.KIND_ENUM,
+        ):
+            continue
+        if metric.kind == parser.KIND_TEMPERATURE:
+            value += 100
+        count = len(metric.registers)
+        number = round((value - metric.offset) / metric.ratio) % (1 << 16 * count)
+        regs = [(number >> 16 * (count - 1 - i)) & 0xFFFF for i in range(count)]
+        if metric.reverse:
+            regs.reverse()
+        for reg, word in zip(metric.registers, regs):
+            raw[indices[reg]] = word
+    for reg, word in words.items():
+        raw[indices[reg]] = word
+    return raw
+
+
+def build_corpus() -> dict[str, list[int | None]]:
+    corpus = {}
+    for name, values in SCENARIOS.items():
+        raw = _encode(values, {**_OPTIONAL, **_RAW_WORDS.get(name, {})})
+        if name == "missing_optional":
+            for start, end in parser.REGISTER_BLOCKS[2:]:
+                for reg in range(start, end + 1):
+                    raw[parser._register_indices()[reg]] = None
+        corpus[name] = raw
+    return corpus
+
+
+def scaled_definitions(definitions: list[Any], factor: int) -> list[Any]:
+    """definitions with every item repeated factor times, under new titles."""
+    scaled = copy.deepcopy(definitions)
+    for section in scaled:
+        items = section.get("items", [])
+        section["items"] = [
+            {**item, "titleEN": f"{item.get('titleEN')} #{k}"} if k else item
+            for item in items
+            for k in range(factor)
+        ]
+    return scaled
+
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> dict[str, Any]:
+    """Median time per call, throughput and memory of fn."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time / 5:
+            break
+        number *= 2
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    per_call = statistics.median(rounds)
+
+    tracemalloc.start()
+    fn()  # warm up any lazily built state
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    keep = []
+    calls = min(number, 100)
+    blocks = sys.getallocatedblocks()
+    for _ in range(calls):
+        keep.append(fn())
+    retained = (sys.getallocatedblocks() - blocks) / calls
+
+    return {
+        "us_per_call": round(per_call * 1e6, 3),
+        "calls_per_s": round(1 / per_call, 1),
+        "peak_alloc_bytes": peak - before,
+        "retained_blocks": round(retained, 1),
+    }
+
+
+def run(quick: bool) -> dict[str, Any]:
+    repeat, min_time = (3, 0.05) if quick else (7, 0.5)
+    corpus = build_corpus()
+    definitions = parser._load_definitions()
+    results: list[dict[str, Any]] = []
+
+    def record(name: str, fn: Callable[[], Any], **labels: Any) -> None:
+        results.append({"name": name, **labels, **measure(fn, repeat, min_time)})
+
+    for factor in (1, 10, 100):
+        scaled = scaled_definitions(definitions, factor)
+        plan = parser.compile_plan(scaled)
+        items = sum(len(s.get("items", [])) for s in scaled)
+        for scenario, raw in corpus.items():
+            image = RegisterImage.from_registers(raw)
+            labels = {"scale": factor, "items": items, "scenario": scenario}
+            record("parse_raw", lambda: parser.parse_raw(raw, plan=plan), **labels)
+            record(
+                "parse_image", lambda: parser.parse_image(image, plan=plan), **labels
+            )
+        labels = {"scale": factor, "items": items}
+        record(
+            "_build_enum_mappings",
+            lambda: parser._build_enum_mappings(scaled),
+            **labels,
+        )
+        record(
+            "compile_definitions",
+            lambda: parser.compile_definitions(scaled),
+            **labels,
+        )
+        try:
+            from custom_components.deye_inverter.entity_descriptions import (
+                build_descriptions,
+            )
+        except ImportError:  # Home Assistant not installed
+            pass
+        else:
+            compiled = parser.load_compiled_definitions()
+            parser._COMPILED[DEFAULT_PROFILE] = parser.compile_definitions(scaled)
+            record("build_descriptions", build_descriptions, **labels)
+            parser._COMPILED[DEFAULT_PROFILE] = compiled
+
+    for reverse in (False, True):
+        record(
+            "combine_registers",
+            lambda: parser.combine_registers([0x0001, 0xE240], reverse=reverse),
+            reverse=reverse,
+        )
+
+    return {
+        "version": json.loads(MANIFEST.read_text())["version"],
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument("--quick", action="store_true", help="short rounds, for CI")
+    args.add_argument("--output", type=Path, help="write the JSON here")
+    opts = args.parse_args()
+
+    report = json.dumps(run(opts.quick), indent=2)
+    if opts.output:
+        opts.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Capture a logger session, or replay a captured one through InverterData.
+
+  capture  poll a logger (or benchmarks/logger_simulator.py) and log every
+           frame: python benchmarks/replay.py capture HOST SERIAL FILE
+           [--port 8899] [--cycles N] [--interval S]
+  replay   serve FILE back and parse every poll: python benchmarks/replay.py
+           replay FILE [--speed X] [--repeat N] [--profile NAME]
+
+--speed 1 keeps the captured timing (response times, and the gaps between
+requests and between polls), 2 runs it twice as fast, 0 (the default)
+answers at once, so a replay measures the parsing and bookkeeping of a
+poll. Replay prints one JSON object: polls, failed polls, polls per second
+and the median poll time in milliseconds.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from custom_components.deye_inverter.FrameCapture import (  # noqa: E402
+    ReplayClient,
+    read_exchanges,
+)
+from custom_components.deye_inverter.InverterData import InverterData  # noqa: E402
+from custom_components.deye_inverter.profiles import DEFAULT_PROFILE  # noqa: E402
+
+
+async def capture(args: argparse.Namespace) -> None:
+    inverter = InverterData(args.host, args.port, args.serial, profile=args.profile)
+    await inverter.connect()
+    inverter.start_capture(args.file)
+    try:
+        for cycle in range(args.cycles):
+            if cycle:
+                await asyncio.sleep(args.interval)
+            try:
+                await inverter.fetch_data()
+            except Exception as e:
+                print(f"poll {cycle}: {e}", file=sys.stderr)
+    finally:
+        await inverter.close()
+
+
+async def replay(args: argparse.Namespace) -> dict:
+    exchanges = read_exchanges(args.file)
+    durations = []
+    failed = 0
+    for _ in range(args.repeat):
+        client = ReplayClient(exchanges, args.speed)
+        inverter = InverterData(
+            "replay", serial="1", profile=args.profile, client=client
+        )
+        if not args.speed:
+            # No pacing between requests either: time the poll's own work
+            inverter.seed_link({"pause": 0.0})
+        await inverter.connect()
+        while client.remaining:
+            # The captured interval between polls
+            await client.wait_next()
+            start = time.perf_counter()
+            try:
+                await inverter.fetch_data()
+            except Exception:
+                failed += 1
+            durations.append(time.perf_counter() - start)
+        await inverter.close()
+    return {
+        "polls": len(durations),
+        "failed": failed,
+        "polls_per_s": round(len(durations) / sum(durations), 1) if durations else 0,
+        "median_ms": round(statistics.median(durations) * 1e3, 3) if durations else 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("capture")
+    record.add_argument("host")
+    record.add_argument("serial")
+    record.add_argument("file")
+    record.add_argument("--port", type=int, default=8899)
+    record.add_argument("--cycles", type=int, default=10)
+    record.add_argument("--interval", type=float, default=30.0)
+    record.add_argument("--profile", default=DEFAULT_PROFILE)
+    play = commands.add_parser("replay")
+    play.add_argument("file")
+    play.add_argument("--speed", type=float, default=0.0)
+    play.add_argument("--repeat", type=int, default=1)
+    play.add_argument("--profile", default=DEFAULT_PROFILE)
+    args = parser.parse_args()
+    if args.command == "capture":
+        asyncio.run(capture(args))
+    else:
+        print(json.dumps(asyncio.run(replay(args))))
+
+
+if __name__ == "__main__":
+    main()
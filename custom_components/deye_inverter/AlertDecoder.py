@@ -0,0 +1,115 @@
+"""Decoding of the inverter's alert registers into warning and fault codes."""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# Six alert registers: the first two hold warnings W01-W32, the other four
+# faults F01-F64; bit n of each group's words (low word first, LSB first)
+# is code n + 1. They start at 0x0065 on single-phase hybrids.
+ALERT_REGISTER = 0x0065
+ALERT_WORDS = 6
+_WARNING_WORDS = 2
+
+# Faults documented for Deye hybrid inverters; other codes get a generic name
+FAULT_DESCRIPTIONS: Dict[str, str] = {
+    "F07": "DC start failure",
+    "F10": "Auxiliary power board failure",
+    "F13": "Working mode change",
+    "F15": "AC over current (software)",
+    "F16": "GFCI failure",
+    "F18": "AC over current (hardware)",
+    "F20": "DC over current",
+    "F22": "Emergency stop",
+    "F23": "AC leakage current",
+    "F24": "DC insulation impedance failure",
+    "F25": "DC feedback failure",
+    "F26": "DC busbar unbalanced",
+    "F29": "Parallel CAN bus fault",
+    "F34": "AC overload",
+    "F35": "No AC grid",
+    "F41": "Parallel system stop",
+    "F42": "AC line low voltage",
+    "F46": "Backup battery fault",
+    "F47": "AC over frequency",
+    "F48": "AC under frequency",
+    "F56": "DC busbar voltage too low",
+    "F58": "BMS communication fault",
+    "F63": "Arc fault",
+    "F64": "Heatsink high temperature",
+}
+
+
+class AlertBit(NamedTuple):
+    """One alert bit: where it lives and what it means."""
+
+    code: str
+    description: str
+    # "warning" or "fault"
+    severity: str
+    register: int
+    mask: int
+
+
+def _build_bit_table(register: int) -> Tuple[Tuple[AlertBit, ...], ...]:
+    """Per alert word, its 16 bits indexed by bit position."""
+    table = []
+    for word in range(ALERT_WORDS):
+        if word < _WARNING_WORDS:
+            prefix, severity, first = "W", "warning", 16 * word + 1
+        else:
+            prefix, severity, first = "F", "fault", 16 * (word - _WARNING_WORDS) + 1
+        bits = []
+        for bit in range(16):
+            code = f"{prefix}{first + bit:02d}"
+            description = FAULT_DESCRIPTIONS.get(code, f"{severity.title()} {code}")
+            bits.append(
+                AlertBit(code, description, severity, register + word, 1 << bit)
+            )
+        table.append(tuple(bits))
+    return tuple(table)
+
+
+class AlertTracker:
+    """Follows the alert words and reports the bits that changed.
+
+    Only words that differ from the previous ones (XOR) are looked at, and
+    only their flipped bits, so an unchanged cycle costs one comparison.
+    """
+
+    def __init__(self, register: int = ALERT_REGISTER) -> None:
+        self.register = register
+        self._table = _build_bit_table(register)
+        # Unknown until the first read: the alerts already active then are
+        # taken as the starting state, not reported as raised
+        self._words: Optional[Tuple[int, ...]] = None
+        self.active: Dict[str, AlertBit] = {}
+
+    def update(self, words: Optional[Sequence[int]]) -> List[Tuple[AlertBit, bool]]:
+        """Take new alert words; returns (bit, raised) for each flipped bit.
+
+        None (alert registers not read) keeps the previous state. The first
+        words read only fill active: they report no transitions.
+        """
+        if words is None:
+            return []
+        words = tuple(words)
+        previous = self._words
+        if words == previous:
+            return []
+
+        transitions: List[Tuple[AlertBit, bool]] = []
+        for table, new, old in zip(self._table, words, previous or (0,) * len(words)):
+            flipped = new ^ old
+            while flipped:
+                low = flipped & -flipped
+                flipped ^= low
+                bit = table[low.bit_length() - 1]
+                raised = bool(new & low)
+                if raised:
+                    self.active[bit.code] = bit
+                else:
+                    self.active.pop(bit.code, None)
+                transitions.append((bit, raised))
+        self._words = words
+        if previous is None:
+            return []
+        return transitions
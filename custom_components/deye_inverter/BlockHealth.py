@@ -0,0 +1,101 @@
+"""Tracking of optional register blocks the inverter fails to serve."""
+
+import time
+from typing import Dict, Mapping
+
+from umodbus.exceptions import IllegalDataAddressError, IllegalFunctionError
+
+from .ReadPlanner import Block
+
+# A failed optional block is skipped for RETRY_DELAY seconds, doubled after
+# each further failure up to MAX_RETRY_DELAY
+RETRY_DELAY = 60.0
+MAX_RETRY_DELAY = 3600.0
+# Modbus exceptions the inverter answers the same way every time: the
+# registers do not exist on this model or firmware
+DETERMINISTIC_ERRORS = (IllegalDataAddressError, IllegalFunctionError)
+# Consecutive deterministic failures before a block is unsupported
+UNSUPPORTED_AFTER = 2
+# Unsupported blocks are still probed this rarely, to notice new firmware
+UNSUPPORTED_RETRY = 86400.0
+
+
+class BlockHealth:
+    """Decides which optional blocks are worth requesting.
+
+    A block that fails (timeout, bad frame) is backed off exponentially for
+    the rest of the connection. One that keeps answering with an illegal
+    address is unsupported: it is skipped across reconnects, and the
+    verdict can be stored and restored across restarts. Times passed in
+    are time.monotonic() values.
+    """
+
+    def __init__(self) -> None:
+        # Consecutive failures, and of those the deterministic ones
+        self._failures: Dict[Block, int] = {}
+        self._deterministic: Dict[Block, int] = {}
+        # Monotonic time before which a block is not requested
+        self._retry_at: Dict[Block, float] = {}
+        # Unsupported block -> wall-clock time of the verdict
+        self._unsupported: Dict[Block, float] = {}
+
+    @property
+    def unsupported(self) -> Dict[Block, float]:
+        """Unsupported blocks and the wall-clock time each was found so."""
+        return dict(self._unsupported)
+
+    def should_read(self, block: Block, now: float) -> bool:
+        """Whether block is due for a (re-)probe."""
+        return now >= self._retry_at.get(block, now)
+
+    def succeeded(self, block: Block) -> None:
+        """Forget the failures of a block read successfully."""
+        self._failures.pop(block, None)
+        self._deterministic.pop(block, None)
+        self._retry_at.pop(block, None)
+        self._unsupported.pop(block, None)
+
+    def failed(self, block: Block, error: Exception, now: float) -> bool:
+        """Back a failed block off; True if it just became unsupported."""
+        failures = self._failures[block] = self._failures.get(block, 0) + 1
+        if isinstance(error, DETERMINISTIC_ERRORS):
+            deterministic = self._deterministic.get(block, 0) + 1
+        else:
+            deterministic = 0
+        self._deterministic[block] = deterministic
+
+        if deterministic >= UNSUPPORTED_AFTER:
+            new = block not in self._unsupported
+            self._unsupported[block] = time.time()
+            self._retry_at[block] = now + UNSUPPORTED_RETRY
+            return new
+        delay = min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY)
+        self._retry_at[block] = now + delay
+        return False
+
+    def reconnected(self) -> None:
+        """Retry the blocks that failed on the previous connection.
+
+        Timeouts may have been the connection's fault; unsupported blocks
+        stay skipped.
+        """
+        for block in list(self._retry_at):
+            if block not in self._unsupported:
+                del self._retry_at[block]
+                self._failures.pop(block, None)
+                self._deterministic.pop(block, None)
+
+    def restore(self, unsupported: Mapping[Block, float], now: float) -> None:
+        """Skip blocks found unsupported by an earlier run.
+
+        Each is probed again UNSUPPORTED_RETRY after its verdict.
+        """
+        wall = time.time()
+        for block, found_at in unsupported.items():
+            remaining = found_at + UNSUPPORTED_RETRY - wall
+            if remaining <= 0:
+                continue
+            self._unsupported[block] = found_at
+            self._deterministic[block] = UNSUPPORTED_AFTER
+            self._failures[block] = UNSUPPORTED_AFTER
+            self._retry_at[block] = now + remaining
@@ -0,0 +1,235 @@
+"""Capture of the Modbus frames exchanged with a logger, and their replay."""
+
+import asyncio
+import os
+import struct
+import time
+from typing import Any, Awaitable, Callable, Iterator, List, NamedTuple, Optional
+
+from umodbus.client.serial import rtu
+
+# Every capture file starts with this
+MAGIC = b"DYFC\x01"
+# Record header: monotonic time, kind, length of the frame that follows
+_RECORD = struct.Struct("<dBH")
+REQUEST, RESPONSE, TIMEOUT, ERROR = range(4)
+# Rotation: the current file is renamed to path.1 (path.1 to path.2, ...)
+# when it would grow past max_bytes; backups older ones are kept
+CAPTURE_MAX_BYTES = 4 * 1024 * 1024
+CAPTURE_BACKUPS = 3
+
+
+class Record(NamedTuple):
+    time: float
+    kind: int
+    data: bytes
+
+
+class Exchange(NamedTuple):
+    """A request and how the logger answered it."""
+
+    request: bytes
+    # RESPONSE, TIMEOUT or ERROR, and the response frame or error message
+    outcome: int
+    data: bytes
+    # Seconds between the request and the outcome
+    delay: float
+    # When the request was sent, in seconds since the first record
+    at: float = 0.0
+
+
+class FrameCapture:
+    """Appends the frames sent and received to a rotating binary log.
+
+    Records are buffered in memory and written by flush(), which does file
+    I/O and so runs in an executor.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._pending: List[bytes] = []
+
+    def add(self, kind: int, data: bytes) -> None:
+        self._pending.append(_RECORD.pack(time.monotonic(), kind, len(data)) + data)
+
+    async def exchange(
+        self, send: Callable[[bytes], Awaitable[bytes]], request: bytes
+    ) -> bytes:
+        """send(request), recording the request and its outcome."""
+        self.add(REQUEST, request)
+        try:
+            frame = await send(request)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # The caller's timeout, or the client's own
+            self.add(TIMEOUT, b"")
+            raise
+        except Exception as e:
+            self.add(ERROR, str(e).encode()[:1024])
+            raise
+        self.add(RESPONSE, bytes(frame))
+        return frame
+
+    def flush(self) -> None:
+        """Write the buffered records, rotating the file as it fills up."""
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        out = open(self.path, "ab")
+        try:
+            if not size:
+                size = out.write(MAGIC)
+            for record in pending:
+                if size + len(record) > self._max_bytes and size > len(MAGIC):
+                    out.close()
+                    self._rotate()
+                    out = open(self.path, "ab")
+                    size = out.write(MAGIC)
+                size += out.write(record)
+        finally:
+            out.close()
+
+    def _rotate(self) -> None:
+        for index in range(self._backups, 0, -1):
+            source = self.path if index == 1 else f"{self.path}.{index - 1}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index}")
+        if not self._backups:
+            os.remove(self.path)
+
+
+def capture_files(path: str) -> List[str]:
+    """The files of a capture, oldest first."""
+    files = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        files.append(f"{path}.{index}")
+        index += 1
+    files.reverse()
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_records(path: str) -> Iterator[Record]:
+    """Records of a capture and its rotated files, in order."""
+    for name in capture_files(path):
+        with open(name, "rb") as file:
+            data = file.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"{name} is not a frame capture")
+        offset = len(MAGIC)
+        while offset + _RECORD.size <= len(data):
+            at, kind, length = _RECORD.unpack_from(data, offset)
+            offset += _RECORD.size
+            yield Record(at, kind, data[offset : offset + length])
+            offset += length
+
+
+def read_exchanges(path: str) -> List[Exchange]:
+    """The requests of a capture paired with their outcomes."""
+    exchanges = []
+    request: Optional[Record] = None
+    first: Optional[float] = None
+    for record in read_records(path):
+        if first is None:
+            first = record.time
+        if record.kind == REQUEST:
+            request = record
+        elif request is not None:
+            exchanges.append(
+                Exchange(
+                    request.data,
+                    record.kind,
+                    record.data,
+                    record.time - request.time,
+                    request.time - first,
+                )
+            )
+            request = None
+    return exchanges
+
+
+class ReplayClient:
+    """Stands in for PySolarmanV5Async, answering from a capture.
+
+    Each request is answered by the next captured exchange with the same
+    request frame. The capture's clock is replayed divided by speed (0: no
+    wait): a request is held until its captured time, then answered after
+    its captured delay. wait_next() sleeps out the gap before the next
+    request, between polls, outside the caller's request timeout.
+    Captured timeouts raise TimeoutError and errors ConnectionError.
+    EOFError is raised once no captured exchange matches.
+    """
+
+    def __init__(self, exchanges: List[Exchange], speed: float = 1.0) -> None:
+        self._exchanges = exchanges
+        self._speed = speed
+        self._position = 0
+        # Loop time matching the first record of the capture
+        self._start: Optional[float] = None
+        self.writer: Any = None
+        self.socket_timeout = 0.0
+        self.mb_slave_id = 1
+
+    @property
+    def remaining(self) -> int:
+        """Exchanges not replayed yet."""
+        return len(self._exchanges) - self._position
+
+    def _due(self, at: float) -> float:
+        """Loop time at which the capture's clock reads at."""
+        if self._start is None:
+            self._start = asyncio.get_running_loop().time() - at / self._speed
+        return self._start + at / self._speed
+
+    async def wait_next(self) -> None:
+        """Sleep until the captured time of the next request."""
+        if self._speed and self.remaining:
+            due = self._due(self._exchanges[self._position].at)
+            await asyncio.sleep(due - asyncio.get_running_loop().time())
+
+    async def connect(self) -> None:
+        self.writer = object()
+
+    async def disconnect(self) -> None:
+        self.writer = None
+
+    async def send_raw_modbus_frame(self, frame: bytes) -> bytes:
+        frame = bytes(frame)
+        for index in range(self._position, len(self._exchanges)):
+            exchange = self._exchanges[index]
+            if exchange.request == frame:
+                break
+        else:
+            raise EOFError(f"No captured exchange left for request {frame.hex()}")
+        self._position = index + 1
+        if self._speed:
+            now = asyncio.get_running_loop().time()
+            # A request sent late is still answered after its delay
+            sent = max(now, self._due(exchange.at))
+            await asyncio.sleep(sent + exchange.delay / self._speed - now)
+        if exchange.outcome == TIMEOUT:
+            raise TimeoutError("Captured timeout")
+        if exchange.outcome == ERROR:
+            raise ConnectionError(exchange.data.decode(errors="replace"))
+        return exchange.data
+
+    async def read_holding_registers(
+        self, register_addr: int, quantity: int
+    ) -> List[int]:
+        response = await self.send_raw_modbus_frame(
+            rtu.read_holding_registers(self.mb_slave_id, register_addr, quantity)
+        )
+        count = response[2] // 2
+        return list(struct.unpack(f">{count}H", response[3 : 3 + 2 * count]))
@@ -1,53 +1,114 @@
 import asyncio
+import functools
 import logging
-from typing import Any, Dict, List, Optional
+import struct
+import time
+from array import array
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Set, Tuple
 
-from pysolarmanv5.pysolarmanv5 import PySolarmanV5, NoSocketAvailableError
+from pysolarmanv5 import NoSocketAvailableError
+from umodbus.client.serial import rtu
+from umodbus.client.serial.redundancy_check import get_crc
+from umodbus.exceptions import ModbusError, error_code_to_exception_map
 
+from .AlertDecoder import ALERT_WORDS, AlertBit, AlertTracker
+from .BlockHealth import DETERMINISTIC_ERRORS, BlockHealth
 from .const import (
-    CORE_REGISTER_BLOCKS,
-    DEFAULT_MODBUS_TIMEOUT,
-    OPTIONAL_REGISTER_BLOCKS,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_CYCLE_RETRIES,
+    DEFAULT_MODBUS_RETRIES,
+    DEFAULT_SLAVE_ID,
+    MAX_METRIC_AGE,
 )
-from .InverterDataParser import parse_raw
+from .FrameCapture import CAPTURE_BACKUPS, CAPTURE_MAX_BYTES, FrameCapture
+from .InverterDataParser import IncrementalParser, load_compiled_definitions
+from .LinkStats import LinkStats
+from .LinkTuner import LinkTuner
+from .LoggerConnection import LoggerConnection, acquire_connection
+from .profiles import (
+    DEFAULT_PROFILE,
+    DEVICE_TYPE_REGISTER,
+    get_profile,
+    profile_for_device_type,
+)
+from .ReadPlanner import (
+    DEFAULT_READ_GAP,
+    Block,
+    ReadMap,
+    ReadPlan,
+    plan_profile_reads,
+)
+from .ReadRecovery import BISECT_AFTER, READ_MAP_RETRY, REJECTIONS, bisect_reads
+from .RegisterImage import RegisterImage
+from .Snapshot import Snapshot
 
 _LOGGER = logging.getLogger(__name__)
 
+# Wait before the first retry of a failed core read, doubled for each
+# further retry of the same block
+RETRY_BACKOFF = 0.2
+
 
 class ModbusReadError(Exception):
     """Raised when reading registers from the inverter fails."""
 
 
-def test_connection(host: str, port: int, serial: str) -> None:
-    """Open a connection and read one register; raises on any failure.
+async def test_connection(
+    host: str, port: int, serial: str, slave_id: int = DEFAULT_SLAVE_ID
+) -> int:
+    """Read the device type register through the logger's shared connection.
 
-    Blocking: must run in an executor.
+    Returns the device type; raises on any failure.
     """
-    modbus = PySolarmanV5(
-        host,
-        int(serial),
-        port=port,
-        mb_slave_id=1,
-        timeout=DEFAULT_MODBUS_TIMEOUT,
-        verbose=False,
-        auto_reconnect=False,
-        logger=_LOGGER,
-    )
+    connection = acquire_connection(host, port, int(serial))
     try:
-        modbus.read_holding_registers(
-            register_addr=CORE_REGISTER_BLOCKS[0][0], quantity=1
-        )
+        await connection.open()
+        async with connection.turn() as client:
+            client.mb_slave_id = slave_id
+            return (
+                await client.read_holding_registers(
+                    register_addr=DEVICE_TYPE_REGISTER, quantity=1
+                )
+            )[0]
     finally:
-        try:
-            modbus.disconnect()
-        except Exception:  # pragma: no cover - best-effort cleanup
-            pass
+        await connection.release()
+
+
+def read_response_payload(
+    frame: bytes, quantity: int, slave_id: Optional[int] = None
+) -> memoryview:
+    """Register bytes of a Read Holding Registers RTU response frame.
+
+    Returns a view into frame, so that the caller copies the words once,
+    into its RegisterImage. Raises the umodbus exception of a Modbus
+    exception response and ValueError for a malformed frame, or one from
+    another slave than slave_id. Trailing bytes (some loggers append a
+    second CRC) are ignored.
+    """
+    if slave_id is not None and frame and frame[0] != slave_id:
+        raise ValueError(f"Response from slave {frame[0]}, not {slave_id}")
+    if len(frame) >= 5 and frame[1] & 0x80 and get_crc(frame[:3]) == frame[3:5]:
+        raise error_code_to_exception_map.get(frame[2], ModbusError)()
+
+    count = 2 * quantity
+    if len(frame) < count + 5 or frame[1] != 0x03 or frame[2] != count:
+        raise ValueError(f"Unexpected response frame: {bytes(frame).hex()}")
+    if get_crc(frame[: count + 3]) != frame[count + 3 : count + 5]:
+        raise ValueError(f"CRC mismatch in response frame: {bytes(frame).hex()}")
+    return memoryview(frame)[3 : count + 3]
 
 
 class InverterData:
     """
-    Sends Modbus RTU over TCP requests to the inverter using PySolarmanV5,
-    which handles framing, unit id, and checksum internally.
+    Sends Modbus RTU over TCP requests to the inverter using PySolarmanV5Async,
+    which handles the Solarman V5 framing on the event loop. The client is
+    the logger's shared LoggerConnection, taken in turns with its other
+    users. Response frames are checked here and their register bytes copied
+    into a RegisterImage for parsing. Call connect() before the first
+    fetch_data() and close() when done.
+
+    client replaces the logger connection with a stand-in, such as a
+    FrameCapture.ReplayClient replaying a captured session.
     """
 
     def __init__(
@@ -57,78 +118,664 @@ class InverterData:
         serial: str = "1",
         hass=None,
         config_entry=None,
+        profile: str = DEFAULT_PROFILE,
+        read_gap: int = DEFAULT_READ_GAP,
+        client: Any = None,
+        slave_id: int = DEFAULT_SLAVE_ID,
     ):
         self._host = host
         self._port = port
         self._serial = int(serial)
         self._hass = hass
         self._config_entry = config_entry
+        # Consecutive polls with a core block failed, and whether the last
+        # poll failed altogether
         self._error_count = 0
         self._max_errors = 5
+        self._poll_failed = False
+        # Unit on the logger's RS485 bus; units behind one logger share
+        # its connection
+        self._slave_id = slave_id
+        # Unneeded registers a request may read to save another request
+        self._read_gap = read_gap
+        # Stream of the connection the once-per-connection tiers were read on
+        self._connection: Any = None
+        # Request counters and latency histograms, kept across reconnects
+        self.stats = LinkStats()
+        self._use_profile(profile)
+        # (bit, raised) for each alert bit that flipped in the last fetch
+        self.alert_transitions: List[Tuple[AlertBit, bool]] = []
+
+        # Frames sent and received are logged here while capturing
+        self._capture: Optional[FrameCapture] = None
 
+        # No socket until connect(); released by close()
+        self._shared: Optional[LoggerConnection] = (
+            acquire_connection(host, port, self._serial)
+            if client is None
+            else LoggerConnection((host, port, self._serial), client)
+        )
+        self._modbus = self._shared.client
+
+    async def connect(self) -> None:
+        """Open the connection to the logger.
+
+        Raises NoSocketAvailableError if it cannot be reached. A connection
+        the logger drops later is reopened by the next request.
+        """
+        await self._open()
+        self._connection = self._modbus.writer
+
+    async def _open(self) -> None:
         try:
-            self._modbus = PySolarmanV5(
-                self._host,
-                self._serial,
-                port=self._port,
-                mb_slave_id=1,
-                timeout=DEFAULT_MODBUS_TIMEOUT,
-                verbose=False,
-                auto_reconnect=True,
-                logger=_LOGGER,
-            )
+            await self._connection_in_use().open()
         except NoSocketAvailableError as e:
             _LOGGER.warning("No socket available when connecting to inverter: %s", e)
             raise
 
-    async def fetch_data(self) -> Dict[str, Any]:
-        """Reads the register blocks and returns the parsed dictionary."""
-        loop = asyncio.get_running_loop()
+    async def close(self) -> None:
+        """Stop using the connection to the logger.
 
-        def read_block(addr: int, length: int) -> list[int]:
-            return self._modbus.read_holding_registers(
-                register_addr=addr, quantity=length
-            )
+        It is closed once no other entry uses it either.
+        """
+        await self.stop_capture()
+        if self._shared is not None:
+            shared, self._shared = self._shared, None
+            await shared.release()
 
-        raw: List[Optional[int]] = []
+    def start_capture(
+        self,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        """Log every request and response frame to path (see FrameCapture).
+
+        The log is written after each fetch_data(). A developer tool, used
+        by benchmarks/replay.py: the integration never starts a capture.
+        """
+        self._capture = FrameCapture(path, max_bytes, backups)
+
+    async def stop_capture(self) -> None:
+        """Write what was captured and stop capturing."""
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            await asyncio.get_running_loop().run_in_executor(None, capture.flush)
 
+    def _connection_in_use(self) -> LoggerConnection:
+        if self._shared is None:
+            raise NoSocketAvailableError("Inverter client is closed")
+        return self._shared
+
+    async def fetch_data(self, budget: Optional[float] = None) -> Snapshot:
+        """Reads the register blocks and returns the parsed snapshot.
+
+        With a budget, the cycle ends within that many seconds: core reads
+        go first and time out at the deadline, and optional reads that no
+        longer fit are dropped and listed in the snapshot's skipped.
+        """
+        started = time.monotonic()
         try:
-            for start, end in CORE_REGISTER_BLOCKS:
-                length = end - start + 1
-                regs = await loop.run_in_executor(None, read_block, start, length)
-                _LOGGER.debug("Regs block 0x%04X (%d): %s", start, length, regs)
-                raw.extend(regs)
-                await asyncio.sleep(0.1)
-            self._error_count = 0  # Reset on success
-        except Exception as e:
-            _LOGGER.error("Error reading registers: %s", e)
-            self._error_count += 1
-            if self._error_count >= self._max_errors:
-                _LOGGER.error(
-                    "Max consecutive read errors reached (%d). Reloading integration.",
-                    self._max_errors,
+            snapshot = await self._fetch_data(budget)
+        except Exception:
+            self.stats.cycle_done(time.monotonic() - started, failed=True)
+            raise
+        finally:
+            if self._capture is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._capture.flush
+                )
+        self.stats.cycle_done(time.monotonic() - started, failed=False)
+        return snapshot
+
+    async def _fetch_data(self, budget: Optional[float]) -> Snapshot:
+        deadline = None if budget is None else time.monotonic() + budget
+
+        # Fail fast when the logger is gone: a connection the logger dropped
+        # is reopened with the short connect timeout, and after a failed
+        # poll one register is read with that timeout, on the connection
+        # already open, before waiting for the timeouts of every block
+        if self._modbus.writer is None:
+            try:
+                await self._open()
+            except NoSocketAvailableError as e:
+                raise await self._read_failed(e) from e
+        elif self._poll_failed and not await self._answers():
+            unreachable = NoSocketAvailableError(
+                f"Logger {self._host}:{self._port} is not reachable"
+            )
+            raise await self._read_failed(unreachable) from unreachable
+
+        shared = self._connection_in_use()
+        retries = DEFAULT_CYCLE_RETRIES
+
+        link = shared.link
+        stats = self.stats
+
+        async def read_block(addr: int, length: int) -> memoryview:
+            block = (addr, addr + length - 1)
+            # Requests from other users of the logger wait their turn; a
+            # connection dropped since the last request is reopened
+            async with shared.turn(connect=True) as client:
+                # Loggers drop requests that follow another too closely,
+                # whichever unit or entry sent it
+                paced = await shared.pace()
+                timeout = link.timeout
+                cut = False
+                if deadline is not None and deadline - time.monotonic() < timeout:
+                    timeout, cut = deadline - time.monotonic(), True
+                    if timeout <= 0:
+                        raise TimeoutError(
+                            f"Poll budget of {budget} s spent"
+                            f" before reading 0x{addr:04X}"
+                        )
+                request = rtu.read_holding_registers(self._slave_id, addr, length)
+                send = self._sender(client)
+                started = time.monotonic()
+                try:
+                    frame = await asyncio.wait_for(send(request), timeout)
+                except asyncio.TimeoutError as e:
+                    # A wait cut short by the deadline says nothing of the link
+                    link.failure(timed_out=not cut, paced=paced and not cut)
+                    stats.failed(block, len(request), timed_out=True)
+                    raise TimeoutError(
+                        f"No response reading 0x{addr:04X} within {timeout:.1f} s"
+                    ) from e
+                except Exception:
+                    link.failure(timed_out=False, paced=paced)
+                    stats.failed(block, len(request), timed_out=False)
+                    raise
+                finally:
+                    shared.last_request = time.monotonic()
+            rtt = time.monotonic() - started
+            try:
+                payload = read_response_payload(frame, length, self._slave_id)
+            except ModbusError:
+                # An exception response is an answer all the same
+                link.success(rtt)
+                stats.answered(block, len(request), len(frame), rtt, rejected=True)
+                raise
+            except ValueError:
+                link.failure(timed_out=False, paced=paced)
+                stats.failed(block, len(request), timed_out=False)
+                raise
+            link.success(rtt)
+            stats.answered(block, len(request), len(frame), rtt, rejected=False)
+            return payload
+
+        async def read_core_block(addr: int, length: int) -> memoryview:
+            # Transient failures are retried, within the per-block and
+            # per-cycle retry budgets and the deadline
+            nonlocal retries
+            attempt = 0
+            while True:
+                try:
+                    return await read_block(addr, length)
+                except DETERMINISTIC_ERRORS:
+                    raise
+                except Exception as e:
+                    if attempt >= DEFAULT_MODBUS_RETRIES or not retries or not fits():
+                        raise
+                    attempt += 1
+                    retries -= 1
+                    stats.retried((addr, addr + length - 1))
+                    _LOGGER.debug(
+                        "Retrying registers 0x%04X (%d) after: %s", addr, length, e
+                    )
+                    await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+
+        def fits() -> bool:
+            # Room left for one more request, with a margin for jitter
+            if deadline is None:
+                return True
+            needed = link.pause + 2 * link.estimate
+            return deadline - time.monotonic() >= needed
+
+        async def recover(start: int, end: int, error: Exception) -> bool:
+            # Bisect a request rejected BISECT_AFTER cycles in a row into
+            # the parts the logger serves; True if some registers were read
+            request = (start, end)
+            if not isinstance(error, REJECTIONS):
+                self._rejections.pop(request, None)
+                return False
+            rejections = self._rejections[request] = (
+                self._rejections.get(request, 0) + 1
+            )
+            if rejections < BISECT_AFTER:
+                return False
+
+            async def probe(first: int, last: int) -> bool:
+                if not fits():
+                    raise TimeoutError("Poll budget spent while bisecting")
+                try:
+                    payload = await read_block(first, last - first + 1)
+                except REJECTIONS:
+                    return False
+                store(first, payload)
+                return True
+
+            registers = sorted(r for r in self._needed if start <= r <= end)
+            try:
+                found = await bisect_reads(registers, probe)
+            except Exception as e:
+                _LOGGER.debug("Bisecting 0x%04X-0x%04X aborted: %s", start, end, e)
+                return False
+            del self._rejections[request]
+            if not found.readable:
+                return False
+            # Keep the finding only if the whole request is still rejected:
+            # it is planned around, and stored, for READ_MAP_RETRY
+            try:
+                if not fits():
+                    raise TimeoutError("Poll budget spent before confirming")
+                payload = await read_block(start, end - start + 1)
+            except REJECTIONS:
+                pass
+            except Exception as e:
+                _LOGGER.debug(
+                    "Bisection of 0x%04X-0x%04X not confirmed: %s", start, end, e
+                )
+                return True
+            else:
+                # Served in full after all: nothing to plan around
+                store(start, payload)
+                return True
+            for reg in found.unreadable:
+                image.invalidate(reg, 1)
+            read_map = self._read_map
+            self.seed_read_map(
+                ReadMap(
+                    read_map.unreadable | found.unreadable,
+                    read_map.splits | found.splits,
+                    time.time(),
+                )
+            )
+            _LOGGER.warning(
+                "Registers 0x%04X-0x%04X are rejected by the logger; "
+                "unreadable: %s, requests split at: %s",
+                start,
+                end,
+                [f"0x{reg:04X}" for reg in sorted(found.unreadable)],
+                [f"0x{reg:04X}" for reg in sorted(found.splits)],
+            )
+            return True
+
+        # The client replaces its stream on reconnect: a new connection
+        # re-reads the tiers read once per connection and retries the
+        # optional blocks that failed on the old one
+        connection = self._modbus.writer
+        if connection is not self._connection:
+            if self._connection is not None:
+                self.stats.reconnected()
+            self._connection = connection
+            for tier in self._profile.tiers:
+                if tier.interval is None:
+                    self._tier_read.pop(tier.name, None)
+            self._block_health.reconnected()
+
+        # Slower tiers are read when their interval has elapsed; their
+        # registers keep the last value read in the image meanwhile
+        now = time.monotonic()
+        due = frozenset(
+            tier.name
+            for tier in self._profile.tiers
+            if tier.name not in self._tier_read
+            or (
+                tier.interval is not None
+                and now - self._tier_read[tier.name] >= tier.interval
+            )
+        )
+        read_map = self._read_map
+        if (read_map.unreadable or read_map.splits) and (
+            time.time() - read_map.found_at >= READ_MAP_RETRY
+        ):
+            # Firmware may have changed: try the full requests again
+            _LOGGER.info("Probing again the registers the logger rejected")
+            self.seed_read_map(ReadMap())
+        core, optional = self._read_plan(due)
+        # Optional blocks that failed recently are not requested: a missing
+        # block would otherwise cost a timeout every cycle
+        health = self._block_health
+        optional = tuple(
+            request
+            for request in optional
+            if health.should_read(self._optional_block(request[0]), now)
+        )
+        image = self._image
+        # Registers read by this fetch
+        fresh = bytearray(image.size)
+
+        def store(start: int, payload: memoryview) -> None:
+            length = len(payload) // 2
+            image.write(start, payload)
+            self._read_at[start : start + length] = array("d", [time.time()]) * length
+            fresh[start : start + length] = b"\x01" * length
+
+        # A core block that still fails after its retries keeps its last
+        # values in the image, so its metrics carry over with their older
+        # read time while those of the other blocks are fresh, for up to
+        # MAX_METRIC_AGE. The cycle only fails if no core block could be
+        # read.
+        failed: List[Block] = []
+        error: Optional[Exception] = None
+        for start, end in core:
+            length = end - start + 1
+            try:
+                payload = await read_core_block(start, length)
+            except Exception as e:
+                _LOGGER.warning(
+                    "Error reading registers 0x%04X-0x%04X: %s", start, end, e
                 )
-                await self._trigger_reload()
-            raise ModbusReadError(str(e)) from e
+                if not await recover(start, end, e):
+                    failed.append((start, end))
+                    error = e
+                    self._drop_stale(start, end)
+                continue
+            _LOGGER.debug("Regs block 0x%04X (%d): %s", start, length, payload.hex())
+            store(start, payload)
+            self._rejections.pop((start, end), None)
+        if error is not None and len(failed) == len(core):
+            raise await self._read_failed(error) from error
+        self._poll_failed = False
+        if failed:
+            # A core block failing every cycle reaches the reload as well,
+            # rather than being hidden by the blocks still read
+            await self._count_error()
+        else:
+            self._error_count = 0  # Reset on success
 
-        # Optional blocks (device info, work mode): some devices do not
-        # expose them, so a failure only skips their metrics for this cycle.
-        for start, end in OPTIONAL_REGISTER_BLOCKS:
+        # Optional registers (device info, work mode): some devices do not
+        # expose them, so a failure only skips their metrics until the
+        # block is retried. Those the budget has no room for keep their
+        # last values and are read next cycle.
+        skipped: List[Block] = []
+        for start, end in optional:
             length = end - start + 1
+            block = self._optional_block(start)
+            if not fits():
+                skipped.append((start, end))
+                continue
             try:
-                regs = await loop.run_in_executor(None, read_block, start, length)
-                _LOGGER.debug("Regs block 0x%04X (%d): %s", start, length, regs)
-                raw.extend(regs)
+                payload = await read_block(start, length)
+                _LOGGER.debug(
+                    "Regs block 0x%04X (%d): %s", start, length, payload.hex()
+                )
+                store(start, payload)
+                self._rejections.pop((start, end), None)
+                health.succeeded(block)
             except Exception as e:
                 _LOGGER.debug(
                     "Optional register block 0x%04X unavailable: %s", start, e
                 )
-                raw.extend([None] * length)
-            await asyncio.sleep(0.1)
+                image.invalidate(start, length)
+                if await recover(start, end, e):
+                    health.succeeded(block)
+                elif health.failed(block, e, now):
+                    _LOGGER.info(
+                        "Registers 0x%04X-0x%04X not supported by the inverter, "
+                        "no longer read",
+                        *block,
+                    )
+
+        # A tier is up to date once all its readable registers were read,
+        # also when they only came along in a request made for others
+        unreadable = self._read_map.unreadable
+        for name, registers in self._tier_registers.items():
+            if all(fresh[r] or r in unreadable for r in registers):
+                self._tier_read[name] = now
+
+        if self._alerts is not None:
+            self.alert_transitions = self._alerts.update(
+                image.words(self._alerts.register, ALERT_WORDS)
+            )
+        if skipped:
+            _LOGGER.debug("Poll budget spent, optional reads skipped: %s", skipped)
+        snapshot = self._parser.parse_image(image, self._read_at)
+        snapshot.skipped = tuple(skipped)
+        snapshot.failed = tuple(failed)
+        return snapshot
+
+    @property
+    def profile(self) -> str:
+        """Name of the register profile this inverter is read with."""
+        return self._profile.name
+
+    @property
+    def identity(self) -> Dict[int, int]:
+        """Address -> word of the identity registers read so far."""
+        block = self._profile.identity_block
+        if block is None:
+            return {}
+        image = self._image
+        return {
+            reg: image.data[2 * reg] << 8 | image.data[2 * reg + 1]
+            for reg in range(block[0], block[1] + 1)
+            if image.valid[reg] and reg in self._needed
+        }
+
+    def identity_read_at(self) -> float:
+        """Wall-clock time the identity registers were read."""
+        identity = self.identity
+        return min((self._read_at[reg] for reg in identity), default=0.0)
+
+    def seed_identity(self, registers: Mapping[int, int], read_at: float) -> bool:
+        """Use identity registers cached from an earlier connection.
+
+        Their metrics are available right away, and the identity is not
+        read again until the connection is re-established. Returns False,
+        ignoring them, if they do not cover the profile's identity metrics.
+        """
+        block = self._profile.identity_block
+        if block is None:
+            return False
+        wanted = {reg for reg in self._needed if block[0] <= reg <= block[1]}
+        if not wanted or not wanted <= set(registers):
+            return False
+        for reg in wanted:
+            self._image.write(reg, struct.pack(">H", registers[reg] & 0xFFFF))
+            self._read_at[reg] = read_at
+        now = time.monotonic()
+        for name, tier_registers in self._tier_registers.items():
+            if tier_registers and tier_registers <= wanted:
+                self._tier_read[name] = now
+        return True
+
+    @property
+    def _link(self) -> LinkTuner:
+        # Learned round trip, timeout and pause between requests, shared by
+        # everything polling through the same logger connection
+        return self._connection_in_use().link
+
+    def link_state(self) -> Dict[str, Any]:
+        """Learned round trip, timeout and pacing of the logger link."""
+        return self._link.state()
+
+    def seed_link(self, state: Mapping[str, Any]) -> None:
+        """Start from link parameters learned by an earlier run."""
+        self._link.restore(state)
+
+    @property
+    def read_map(self) -> ReadMap:
+        """Unreadable registers and request splits found by bisection."""
+        return self._read_map
+
+    def seed_read_map(self, read_map: ReadMap) -> None:
+        """Plan requests around what an earlier run found unreadable."""
+        self._read_map = read_map
+        self._plans.clear()
+
+    @property
+    def unsupported_blocks(self) -> Dict[Block, float]:
+        """Optional blocks the inverter does not serve, with the wall-clock
+        time each was found unsupported."""
+        return self._block_health.unsupported
+
+    def seed_unsupported(self, blocks: Mapping[Block, float]) -> None:
+        """Skip optional blocks found unsupported by an earlier run."""
+        optional = set(self._profile.optional_blocks)
+        self._block_health.restore(
+            {block: at for block, at in blocks.items() if block in optional},
+            time.monotonic(),
+        )
+
+    def _sender(self, client: Any) -> Any:
+        """client's send_raw_modbus_frame, through the capture if one runs."""
+        send = client.send_raw_modbus_frame
+        if self._capture is not None:
+            send = functools.partial(self._capture.exchange, send)
+        return send
+
+    async def _answers(self) -> bool:
+        """Whether the logger answers a one-register read on our connection.
+
+        Any response counts, an exception response or a garbled frame too;
+        only silence within DEFAULT_CONNECT_TIMEOUT or a lost connection do
+        not. No second connection is opened: loggers take a single client.
+        """
+        shared = self._connection_in_use()
+        async with shared.turn() as client:
+            await shared.pace()
+            request = rtu.read_holding_registers(
+                self._slave_id, DEVICE_TYPE_REGISTER, 1
+            )
+            try:
+                await asyncio.wait_for(
+                    self._sender(client)(request), DEFAULT_CONNECT_TIMEOUT
+                )
+            except (asyncio.TimeoutError, OSError, NoSocketAvailableError):
+                return False
+            except Exception:  # An answer all the same
+                pass
+            finally:
+                shared.last_request = time.monotonic()
+        return True
 
-        _LOGGER.debug("RAW registers (total %d): %s", len(raw), raw)
+    async def detect_profile(self) -> str:
+        """Read the device type and switch to its register profile.
 
-        return parse_raw(raw)
+        Returns the profile name.
+        """
+        async with self._connection_in_use().turn() as client:
+            client.mb_slave_id = self._slave_id
+            device_type = (
+                await client.read_holding_registers(
+                    register_addr=DEVICE_TYPE_REGISTER, quantity=1
+                )
+            )[0]
+        profile = get_profile(profile_for_device_type(device_type))
+        _LOGGER.info(
+            "Device type 0x%04X: using register profile %s",
+            device_type,
+            profile.name,
+        )
+        if profile is not self._profile:
+            # Loading the definitions reads files: keep it off the loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, load_compiled_definitions, profile.name
+            )
+            self._use_profile(profile.name)
+        return profile.name
+
+    def _use_profile(self, name: str) -> None:
+        self._profile = get_profile(name)
+        self._parser = IncrementalParser(self._profile.name)
+        alert_register = self._profile.alert_register
+        self._alerts = AlertTracker(alert_register) if alert_register else None
+        self._needed = self._needed_registers()
+        self._tier_registers: Dict[str, FrozenSet[int]] = {
+            tier.name: frozenset(
+                reg
+                for reg in self._needed
+                if any(first <= reg <= last for first, last in tier.registers)
+            )
+            for tier in self._profile.tiers
+        }
+        # Due tier names -> read plan
+        self._plans: Dict[FrozenSet[str], ReadPlan] = {}
+        # Tier name -> monotonic time it was last read completely
+        self._tier_read: Dict[str, float] = {}
+        self._block_health = BlockHealth()
+        # Registers and splits the logger was found to reject, and the
+        # cycles in a row each request was rejected
+        self._read_map = ReadMap()
+        self._rejections: Dict[Block, int] = {}
+        space = self._profile.register_space
+        self._image: RegisterImage = RegisterImage(space)
+        # Wall-clock time each register was last read
+        self._read_at: "array[float]" = array("d", bytes(8 * space))
+
+    def _read_plan(self, due: FrozenSet[str]) -> ReadPlan:
+        """Requests reading every register except those of tiers not due."""
+        plan = self._plans.get(due)
+        if plan is None:
+            registers = set(self._needed)
+            for name, tier_registers in self._tier_registers.items():
+                if name not in due:
+                    registers -= tier_registers
+            plan = self._plans[due] = plan_profile_reads(
+                registers,
+                self._profile.core_blocks,
+                self._profile.optional_blocks,
+                max_gap=self._read_gap,
+                read_map=self._read_map,
+            )
+            _LOGGER.debug(
+                "Read plan of profile %s with tiers %s due: %s",
+                self._profile.name,
+                sorted(due),
+                plan,
+            )
+        return plan
+
+    def _optional_block(self, register: int) -> Block:
+        """The profile's optional block a register belongs to."""
+        for first, last in self._profile.optional_blocks:
+            if first <= register <= last:
+                return (first, last)
+        raise ValueError(f"Register 0x{register:04X} is not in an optional block")
+
+    def _needed_registers(self) -> Set[int]:
+        """Registers read by the profile's metrics and alert tracking."""
+        plan = load_compiled_definitions(self._profile.name).plan
+        registers = {reg for metric in plan.metrics for reg in metric.registers}
+        if self._alerts is not None:
+            first = self._alerts.register
+            registers.update(range(first, first + ALERT_WORDS))
+        if not registers:
+            # No usable definitions: read the whole blocks anyway
+            for first, last in self._profile.blocks:
+                registers.update(range(first, last + 1))
+        return registers
+
+    @property
+    def changed_metrics(self) -> Set[str]:
+        """Titles of the metrics whose value changed in the last fetch."""
+        return self._parser.changed
+
+    def _drop_stale(self, start: int, end: int) -> None:
+        """Drop the values of a failed block read over MAX_METRIC_AGE ago."""
+        oldest = time.time() - MAX_METRIC_AGE
+        image = self._image
+        for reg in range(start, end + 1):
+            if image.valid[reg] and self._read_at[reg] < oldest:
+                image.invalidate(reg, 1)
+
+    async def _read_failed(self, error: Exception) -> ModbusReadError:
+        """Count a failed read, reloading after too many; returns the error."""
+        _LOGGER.error("Error reading registers: %s", error)
+        self._poll_failed = True
+        await self._count_error()
+        return ModbusReadError(str(error))
+
+    async def _count_error(self) -> None:
+        """Count a poll with a failed core read, reloading after too many."""
+        self._error_count += 1
+        if self._error_count >= self._max_errors:
+            _LOGGER.error(
+                "Max consecutive read errors reached (%d). Reloading integration.",
+                self._max_errors,
+            )
+            await self._trigger_reload()
 
     async def _trigger_reload(self):
         if not self._hass or not self._config_entry:
@@ -1,32 +1,72 @@
+import hashlib
 import json
 import logging
+import marshal
+import os
+import struct
+import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import importlib.resources as pkg_resources
 
+from .RegisterImage import RegisterImage
+from .Snapshot import MISSING, Snapshot
 from .const import REGISTER_BLOCKS
+from .profiles import DEFAULT_PROFILE, get_profile
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _load_definitions() -> Union[Dict[str, Any], List[Any]]:
+# Compiled definitions cache; bump the version when its layout changes
+_CACHE_VERSION = 4
+_CACHE_DIR = Path(__file__).parent / "__pycache__"
+_CACHE_FILE = _CACHE_DIR / "DYRealTime.plan"
+
+_DEFAULT_DEFINITIONS = "DYRealTime.txt"
+
+
+def _read_definitions_text(filename: str = _DEFAULT_DEFINITIONS) -> Optional[str]:
     try:
-        data = (pkg_resources.files(__package__) / "DYRealTime.txt").read_text()
+        return (pkg_resources.files(__package__) / filename).read_text()
     except Exception:
-        fp = Path(__file__).parent / "DYRealTime.txt"
+        fp = Path(__file__).parent / filename
         try:
-            data = fp.read_text()
+            return fp.read_text()
         except Exception as e:
-            _LOGGER.error("Could not read DYRealTime.txt: %s", e)
-            return {}
+            _LOGGER.error("Could not read %s: %s", filename, e)
+            return None
+
+
+def _parse_definitions(
+    data: Optional[str], filename: str = _DEFAULT_DEFINITIONS
+) -> Union[Dict[str, Any], List[Any]]:
+    if data is None:
+        return {}
     try:
         return json.loads(data)
     except json.JSONDecodeError as e:
-        _LOGGER.error("Error parsing DYRealTime.txt: %s", e)
+        _LOGGER.error("Error parsing %s: %s", filename, e)
         return {}
 
 
+def _load_definitions(
+    filename: str = _DEFAULT_DEFINITIONS,
+) -> Union[Dict[str, Any], List[Any]]:
+    return _parse_definitions(_read_definitions_text(filename), filename)
+
+
 def register_index(reg: int) -> Optional[int]:
     """Map a register address to its index in the flat register list."""
     offset = 0
@@ -37,9 +77,6 @@ def register_index(reg: int) -> Optional[int]:
     return None
 
 
-_DEFINITIONS = _load_definitions()
-
-
 def _build_enum_mappings(
     definitions: Union[Dict[str, Any], List[Any]],
 ) -> Dict[Tuple[int, str], Dict[int, str]]:
@@ -82,9 +119,6 @@ def _build_enum_mappings(
     return mappings
 
 
-_ENUM_MAPPINGS = _build_enum_mappings(_DEFINITIONS)
-
-
 def combine_registers(
     registers: List[int], signed: bool = True, reverse: bool = False
 ) -> int:
@@ -135,10 +169,17 @@ def parse_gen_connected_status(value: int) -> str:
     return "On" if value == 1 else "Off"
 
 
-def parse_raw(raw: Sequence[Optional[int]]) -> Dict[str, Any]:
-    result: Dict[str, Any] = {}
+# Decoder kinds of a compiled metric, ordered by how common they are
+KIND_NUMERIC = 0
+KIND_TEMPERATURE = 1
+KIND_DECODER = 2
+KIND_ENUM = 3
+KIND_BITFIELD = 4
+KIND_ASCII = 5
 
-    REVERSED_FIELDS = {
+# 32-bit counters stored low word first
+REVERSED_FIELDS = frozenset(
+    {
         "Total Production",
         "Total Load Consumption",
         "Total Energy Sold",
@@ -147,118 +188,819 @@ def parse_raw(raw: Sequence[Optional[int]]) -> Dict[str, Any]:
         "Total Battery Charge",
         "Total Battery Discharge",
     }
+)
+
+
+class MetricPlan(NamedTuple):
+    """One metric, resolved from its DYRealTime.txt item."""
+
+    title: str
+    kind: int
+    indices: Tuple[int, ...]
+    signed: bool
+    reverse: bool
+    ratio: float
+    offset: float
+    # optionRanges of the item as {key: label}, if any
+    options: Optional[Dict[int, str]] = None
+    # Custom decoder (KIND_DECODER)
+    decoder: Optional["Decoder"] = None
+    # Register addresses, in the item's order
+    registers: Tuple[int, ...] = ()
+    # struct format reading the registers from RegisterImage.data, starting
+    # at the first one; None if they are not consecutive
+    fmt: Optional[str] = None
+    # fmt unpacks to the metric's integer value rather than to its words
+    direct: bool = False
+    # Position of the metric's value in a Snapshot; shared by its title
+    metric_id: int = 0
+
+
+# A decoder gets the item's register words, their combined value (signed
+# and word-ordered as for numeric metrics) and the metric; it returns the
+# published value.
+Decoder = Callable[[List[int], int, MetricPlan], Any]
+
+# (register or None, name) -> decoder; None matches any register
+_DECODERS: Dict[Tuple[Optional[int], str], Decoder] = {}
+
+
+def register_decoder(
+    name: str, register: Optional[int] = None
+) -> Callable[[Decoder], Decoder]:
+    """Register a decoder for items naming it in their "decoder" field.
+
+    A decoder registered for a specific register takes precedence over the
+    generic one of the same name, so model-specific variants can be added.
+    Decoders are resolved when the definitions are compiled.
+    """
+
+    def register_fn(decoder: Decoder) -> Decoder:
+        _DECODERS[(register, name)] = decoder
+        return decoder
+
+    return register_fn
+
+
+def resolve_decoder(register: int, name: str) -> Optional[Decoder]:
+    """The decoder for an item whose first register is register."""
+    return _DECODERS.get((register, name)) or _DECODERS.get((None, name))
+
+
+def _value_decoder(parse: Callable[[int], str]) -> Decoder:
+    return lambda block, value, metric: parse(value)
+
+
+register_decoder("battery_status")(_value_decoder(parse_battery_status))
+register_decoder("grid_status")(_value_decoder(parse_grid_status))
+register_decoder("smartload_status")(_value_decoder(parse_smartload_status))
+register_decoder("grid_connected_status")(_value_decoder(parse_grid_connected_status))
+register_decoder("gen_connected_status")(_value_decoder(parse_gen_connected_status))
+
+
+@register_decoder("work_mode")
+def _decode_work_mode(block: List[int], value: int, metric: MetricPlan) -> Any:
+    options = metric.options or {}
+    if len(block) != 2:
+        # Not the register pair: an enum if the item has options, else numeric
+        if options:
+            return options.get(value, f"Unknown ({value})")
+        return float(round(value * metric.ratio + metric.offset, 2))
+    # 0x00F4 = mode (0 selling first, 1 zero-export to load, 2 zero-export
+    # to home), 0x00F7 = solar sell flag. The optionRanges keys encode the
+    # pair: with solar sell the mode keeps its key, without it the key is
+    # shifted by 2.
+    mode, solar_sell = block
+    key = 0 if mode == 0 else (mode if solar_sell else mode + 2)
+    return options.get(key, f"Unknown ({mode}/{solar_sell})")
+
+
+# Decoders of items in definition files without a "decoder" field
+_LEGACY_DECODERS: Dict[Tuple[int, str], str] = {
+    (0x00F4, "Work Mode"): "work_mode",
+    (0x00BE, "Battery Status"): "battery_status",
+    (0x00A9, "Grid Status"): "grid_status",
+    (0x00C3, "SmartLoad Enable Status"): "smartload_status",
+    (0x00C2, "Grid-connected Status"): "grid_connected_status",
+    (0x00A6, "Gen-connected Status"): "gen_connected_status",
+}
+
+
+class ParsePlan(NamedTuple):
+    """Compiled definitions: the metrics in definition order."""
+
+    metrics: Tuple[MetricPlan, ...]
+    # Shortest flat register list that covers every metric
+    width: int
+    # Title -> metric id, the index shared by the plan's snapshots
+    ids: Dict[str, int]
+
+
+def _register_indices(
+    blocks: Sequence[Tuple[int, int]] = REGISTER_BLOCKS,
+) -> Dict[int, int]:
+    """Map every readable register address to its flat list index."""
+    indices: Dict[int, int] = {}
+    offset = 0
+    for start, end in blocks:
+        for reg in range(start, end + 1):
+            indices.setdefault(reg, offset + (reg - start))
+        offset += end - start + 1
+    return indices
+
 
-    if isinstance(_DEFINITIONS, dict):
-        sections: Sequence[Dict[str, Any]] = list(_DEFINITIONS.values())
-    elif isinstance(_DEFINITIONS, list):
-        sections = _DEFINITIONS  # type: ignore[assignment]
+def _compile_item(
+    item: Dict[str, Any],
+    reg_indices: Dict[int, int],
+    enum_mappings: Dict[Tuple[int, str], Dict[int, str]],
+) -> Optional[MetricPlan]:
+    """Resolve one definitions item, or None if it can never be decoded."""
+    title = item.get("titleEN")
+    if not title:
+        return None
+
+    try:
+        ratio = float(item.get("ratio", 1))
+        offset = float(item.get("offset", 0))
+        signed = bool(item.get("signed", True))
+        parser_rule = item.get("parserRule")
+        registers = item.get("registers", [])
+
+        if not registers:
+            return None
+
+        regs = [int(reg_hex, 16) for reg_hex in registers]
+    except Exception as e:
+        _LOGGER.debug("Error parsing %s: %s", title, e)
+        return None
+
+    # Registers outside the read blocks are dropped, as if never listed
+    kept = [r for r in regs if r in reg_indices]
+    if not kept:
+        return None
+
+    reg_key = regs[0]
+    options = enum_mappings.get((reg_key, title))
+    decoder_name = item.get("decoder") or _LEGACY_DECODERS.get((reg_key, title))
+    decoder = resolve_decoder(reg_key, decoder_name) if decoder_name else None
+    if decoder_name and decoder is None:
+        _LOGGER.warning("Unknown decoder %r for %s", decoder_name, title)
+
+    if parser_rule == 5:
+        kind = KIND_ASCII
+    elif decoder is not None:
+        kind = KIND_DECODER
+    elif options:
+        kind = KIND_ENUM
+    elif parser_rule == 6:
+        kind = KIND_BITFIELD
+    elif "Temperature" in title:
+        kind = KIND_TEMPERATURE
     else:
-        _LOGGER.error("Invalid definitions type: %s", type(_DEFINITIONS))
-        return result
+        kind = KIND_NUMERIC
+
+    reverse = title in REVERSED_FIELDS and len(kept) == 2
+    fmt, direct = _struct_format(kept, kind, signed, reverse)
+    return MetricPlan(
+        title=title,
+        kind=kind,
+        indices=tuple(reg_indices[r] for r in kept),
+        signed=signed,
+        reverse=reverse,
+        ratio=ratio,
+        offset=offset,
+        options=options,
+        decoder=decoder if kind == KIND_DECODER else None,
+        registers=tuple(kept),
+        fmt=fmt,
+        direct=direct,
+    )
+
+
+def _struct_format(
+    registers: List[int], kind: int, signed: bool, reverse: bool
+) -> Tuple[Optional[str], bool]:
+    """(fmt, direct) of a metric, see MetricPlan.
+
+    Numeric and enum values of one or two consecutive words, high word
+    first, are unpacked directly; other consecutive registers unpack to
+    their words and scattered ones are read one by one.
+    """
+    count = len(registers)
+    if registers != list(range(registers[0], registers[0] + count)):
+        return None, False
+    if kind in (KIND_NUMERIC, KIND_TEMPERATURE, KIND_ENUM) and count <= 2:
+        if not reverse:
+            code = "h" if count == 1 else "i"
+            return ">" + (code if signed else code.upper()), True
+    return f">{count}H", False
+
 
+def compile_plan(
+    definitions: Union[Dict[str, Any], List[Any]],
+    enum_mappings: Optional[Dict[Tuple[int, str], Dict[int, str]]] = None,
+    blocks: Sequence[Tuple[int, int]] = REGISTER_BLOCKS,
+) -> Optional[ParsePlan]:
+    """Compile the definitions into a ParsePlan; None if they are invalid.
+
+    All string parsing, register lookups and decoder selection happen here,
+    once, so parse_raw only indexes and converts.
+    """
+    if isinstance(definitions, dict):
+        sections: Sequence[Dict[str, Any]] = list(definitions.values())
+    elif isinstance(definitions, list):
+        sections = definitions
+    else:
+        _LOGGER.error("Invalid definitions type: %s", type(definitions))
+        return None
+
+    if enum_mappings is None:
+        enum_mappings = _build_enum_mappings(definitions)
+    reg_indices = _register_indices(blocks)
+
+    metrics: List[MetricPlan] = []
+    ids: Dict[str, int] = {}
+    for section in sections:
+        for item in section.get("items", []):
+            metric = _compile_item(item, reg_indices, enum_mappings)
+            if metric is not None:
+                metric_id = ids.setdefault(metric.title, len(ids))
+                metrics.append(metric._replace(metric_id=metric_id))
+
+    width = max((max(m.indices) + 1 for m in metrics), default=0)
+    return ParsePlan(metrics=tuple(metrics), width=width, ids=ids)
+
+
+def _registers_in_read_range(
+    registers: Sequence[str], blocks: Sequence[Tuple[int, int]] = REGISTER_BLOCKS
+) -> bool:
+    """True if every register of the item is covered by the read blocks."""
+    if not registers:
+        return False
+    try:
+        regs = [int(r, 16) for r in registers]
+    except (TypeError, ValueError):
+        return False
+    return all(any(start <= r <= end for start, end in blocks) for r in regs)
+
+
+def _sensor_items(
+    definitions: Union[Dict[str, Any], List[Any]],
+    blocks: Sequence[Tuple[int, int]] = REGISTER_BLOCKS,
+) -> Tuple[Tuple[str, str], ...]:
+    """(title, unit) of each item that gets a sensor entity.
+
+    The first item of each title wins; items with a register outside the
+    read blocks are skipped.
+    """
+    sections: Sequence[Dict[str, Any]] = (
+        list(definitions.values())
+        if isinstance(definitions, dict)
+        else definitions  # type: ignore[assignment]
+    )
+
+    items: List[Tuple[str, str]] = []
+    seen: set[str] = set()
     for section in sections:
         for item in section.get("items", []):
             title = item.get("titleEN")
-            if not title:
+            if not title or title in seen:
                 continue
+            if not _registers_in_read_range(item.get("registers", []), blocks):
+                continue
+            seen.add(title)
+            items.append((title, str(item.get("unit") or "")))
+    return tuple(items)
 
-            try:
-                ratio = float(item.get("ratio", 1))
-                offset = float(item.get("offset", 0))
-                signed = bool(item.get("signed", True))
-                parser_rule = item.get("parserRule")
-                registers = item.get("registers", [])
 
-                if not registers:
-                    continue
+class CompiledDefinitions(NamedTuple):
+    """Everything derived from DYRealTime.txt, as cached between restarts."""
 
-                indices = []
-                for reg_hex in registers:
-                    idx = register_index(int(reg_hex, 16))
-                    if idx is not None:
-                        indices.append(idx)
+    plan: ParsePlan
+    enum_mappings: Dict[Tuple[int, str], Dict[int, str]]
+    # (title, unit) of each metric exposed as a sensor
+    sensors: Tuple[Tuple[str, str], ...]
 
-                values = [raw[i] for i in indices if 0 <= i < len(raw)]
-                # None marks an optional block that could not be read
-                block = [v for v in values if v is not None]
-                if not block or len(block) != len(values):
-                    continue
 
-                # Rule 5: ASCII string
-                if parser_rule == 5:
-                    chars = []
-                    for word in block:
-                        chars.append((word >> 8) & 0xFF)
-                        chars.append(word & 0xFF)
-                    ascii_string = (
-                        bytearray(chars)
-                        .decode("ascii", errors="ignore")
-                        .strip("\x00")
-                        .strip()
-                    )
-                    if not ascii_string or any(ord(c) < 32 for c in ascii_string):
-                        value = "0x" + "".join(f"{b:02X}" for b in chars)
-                    else:
-                        value = ascii_string
-                    result[title] = value or None
-                    continue
+def compile_definitions(
+    definitions: Union[Dict[str, Any], List[Any]],
+    blocks: Sequence[Tuple[int, int]] = REGISTER_BLOCKS,
+) -> CompiledDefinitions:
+    """Compile parsed definitions into the plan, enum tables and sensors."""
+    if not isinstance(definitions, (dict, list)):
+        _LOGGER.error("Invalid definitions type: %s", type(definitions))
+        definitions = []
+    enum_mappings = _build_enum_mappings(definitions)
+    plan = compile_plan(definitions, enum_mappings, blocks)
+    assert plan is not None  # dict or list, checked above
+    return CompiledDefinitions(
+        plan=plan,
+        enum_mappings=enum_mappings,
+        sensors=_sensor_items(definitions, blocks),
+    )
 
-                reverse = title in REVERSED_FIELDS
-                raw_int = combine_registers(block, signed=signed, reverse=reverse)
-
-                # Custom logic overrides
-                reg_key = int(registers[0], 16)
-                if reg_key == 0x00F4 and title == "Work Mode" and len(block) == 2:
-                    # 0x00F4 = mode (0 selling first, 1 zero-export to load,
-                    # 2 zero-export to home), 0x00F7 = solar sell flag. The
-                    # optionRanges keys encode the pair: with solar sell the
-                    # mode keeps its key, without it the key is shifted by 2.
-                    mode, solar_sell = block
-                    key = 0 if mode == 0 else (mode if solar_sell else mode + 2)
-                    wm_mapping = _ENUM_MAPPINGS.get((reg_key, title), {})
-                    result[title] = wm_mapping.get(
-                        key, f"Unknown ({mode}/{solar_sell})"
-                    )
-                    continue
-                if reg_key == 0x00BE and title == "Battery Status":
-                    result[title] = parse_battery_status(raw_int)
-                    continue
-                if reg_key == 0x00A9 and title == "Grid Status":
-                    result[title] = parse_grid_status(raw_int)
-                    continue
-                if reg_key == 0x00C3 and title == "SmartLoad Enable Status":
-                    result[title] = f"{parse_smartload_status(raw_int)}"
-                    continue
-                if reg_key == 0x00C2 and title == "Grid-connected Status":
-                    result[title] = f"{parse_grid_connected_status(raw_int)}"
-                    continue
-                if reg_key == 0x00A6 and title == "Gen-connected Status":
-                    result[title] = f"{parse_gen_connected_status(raw_int)}"
-                    continue
 
-                # Enum mapping by (register, title)
-                mapping = _ENUM_MAPPINGS.get((reg_key, title))
-                if mapping and raw_int in mapping:
-                    result[title] = mapping[raw_int]
+# Position of MetricPlan.decoder, stored by registry key in the cache
+_DECODER_FIELD = MetricPlan._fields.index("decoder")
+
+
+def _cache_key(text: str, blocks: Sequence[Tuple[int, int]] = REGISTER_BLOCKS) -> str:
+    """Content hash of everything the compiled definitions depend on."""
+    decoders = sorted(_DECODERS, key=repr)
+    key = (
+        f"{_CACHE_VERSION}:{sys.implementation.cache_tag}:{list(blocks)}:"
+        f"{decoders}:"
+    )
+    return hashlib.sha256((key + text).encode()).hexdigest()
+
+
+def _read_cache(cache_file: Path, key: str) -> Optional[CompiledDefinitions]:
+    """Load the compiled definitions stored under key, if the cache has them."""
+    try:
+        version, cached_key, payload = marshal.loads(cache_file.read_bytes())
+        if version != _CACHE_VERSION or cached_key != key:
+            return None
+        metrics, width, ids, enum_mappings, sensors = payload
+        decoded = []
+        for fields in metrics:
+            fields = list(fields)
+            if fields[_DECODER_FIELD]:
+                fields[_DECODER_FIELD] = _DECODERS[fields[_DECODER_FIELD]]
+            decoded.append(MetricPlan._make(fields))
+        plan = ParsePlan(metrics=tuple(decoded), width=width, ids=ids)
+        return CompiledDefinitions(plan, enum_mappings, sensors)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        _LOGGER.debug("Ignoring unreadable definitions cache %s: %s", cache_file, e)
+        return None
+
+
+def _write_cache(cache_file: Path, key: str, compiled: CompiledDefinitions) -> None:
+    """Store the compiled definitions; best-effort, the cache is optional."""
+    # marshal only takes plain tuples; decoders are stored by registry key
+    registry_keys = {decoder: key for key, decoder in _DECODERS.items()}
+    metrics = []
+    for metric in compiled.plan.metrics:
+        fields: List[Any] = list(metric)
+        if metric.decoder:
+            fields[_DECODER_FIELD] = registry_keys[metric.decoder]
+        metrics.append(tuple(fields))
+    payload: Any = (
+        tuple(metrics),
+        compiled.plan.width,
+        compiled.plan.ids,
+        compiled.enum_mappings,
+        compiled.sensors,
+    )
+    tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(exist_ok=True)
+        tmp.write_bytes(marshal.dumps((_CACHE_VERSION, key, payload)))
+        os.replace(tmp, cache_file)
+    except Exception as e:
+        _LOGGER.debug("Could not write definitions cache %s: %s", cache_file, e)
+        tmp.unlink(missing_ok=True)
+
+
+def _load_compiled(
+    cache_file: Optional[Path] = None, profile: str = DEFAULT_PROFILE
+) -> CompiledDefinitions:
+    """Compile a profile's definitions, or load them from the cache if unchanged."""
+    register_profile = get_profile(profile)
+    filename = register_profile.definitions
+    blocks = register_profile.blocks
+    if cache_file is None:
+        cache_file = _CACHE_DIR / f"{Path(filename).stem}.plan"
+
+    text = _read_definitions_text(filename)
+    if text is None:
+        return compile_definitions({}, blocks)
+
+    key = _cache_key(text, blocks)
+    compiled = _read_cache(cache_file, key)
+    if compiled is not None:
+        return compiled
+
+    definitions = _parse_definitions(text, filename)
+    compiled = compile_definitions(definitions, blocks)
+    if definitions:
+        _write_cache(cache_file, key, compiled)
+    return compiled
+
+
+# Profile name -> compiled definitions, shared by every entry using it
+_COMPILED: Dict[str, CompiledDefinitions] = {}
+
+
+def load_compiled_definitions(profile: str = DEFAULT_PROFILE) -> CompiledDefinitions:
+    """Return a profile's compiled definitions, loading them on first use.
+
+    Blocking: the first call reads the definitions file and the compiled
+    cache. The integration calls it from an executor during setup, so that
+    later calls (parsing, building sensor descriptions) do no file I/O.
+    """
+    compiled = _COMPILED.get(profile)
+    if compiled is None:
+        compiled = _COMPILED[profile] = _load_compiled(profile=profile)
+    return compiled
+
+
+def _current_plan(profile: str = DEFAULT_PROFILE) -> Optional[ParsePlan]:
+    """The plan to parse with: the profile's compiled definitions."""
+    return load_compiled_definitions(profile).plan
+
+
+def _decode_ascii(block: List[int]) -> str:
+    chars = []
+    for word in block:
+        chars.append((word >> 8) & 0xFF)
+        chars.append(word & 0xFF)
+    ascii_string = (
+        bytearray(chars).decode("ascii", errors="ignore").strip("\x00").strip()
+    )
+    if not ascii_string or any(ord(c) < 32 for c in ascii_string):
+        return "0x" + "".join(f"{b:02X}" for b in chars)
+    return ascii_string
+
+
+def _image_from_registers(raw: Sequence[Optional[int]], profile: str) -> RegisterImage:
+    register_profile = get_profile(profile)
+    return RegisterImage.from_registers(
+        raw, register_profile.blocks, register_profile.register_space
+    )
+
+
+def parse_raw(
+    raw: Sequence[Optional[int]],
+    profile: str = DEFAULT_PROFILE,
+    plan: Optional[ParsePlan] = None,
+) -> Snapshot:
+    """Decode a flat register list laid out by the profile's blocks.
+
+    None entries mark registers that could not be read. plan, if given
+    (see compile_plan), is decoded instead of the profile's definitions.
+    """
+    return parse_image(_image_from_registers(raw, profile), profile, plan)
+
+
+def parse_image(
+    image: RegisterImage,
+    profile: str = DEFAULT_PROFILE,
+    plan: Optional[ParsePlan] = None,
+) -> Snapshot:
+    """Decode every metric whose registers are all valid in image."""
+    if plan is None:
+        plan = _current_plan(profile)
+    if plan is None:
+        return Snapshot([], {})
+
+    values = [MISSING] * len(plan.ids)
+    _decode_metrics(plan.metrics, image, values)
+    return Snapshot(values, plan.ids)
+
+
+def _decode_metrics(
+    metrics: Sequence[MetricPlan],
+    image: RegisterImage,
+    values: List[Any],
+) -> None:
+    """Decode metrics from the register image into values, by metric id."""
+    data = image.data
+    valid = image.valid
+    unpack_from = struct.unpack_from
+    block: List[Any]
+    options: Any
+    decoder: Any
+
+    for metric in metrics:
+        (
+            title,
+            kind,
+            _,
+            signed,
+            reverse,
+            ratio,
+            offset,
+            options,
+            decoder,
+            registers,
+            fmt,
+            direct,
+            metric_id,
+        ) = metric
+        first = registers[0]
+
+        try:
+            # Metrics with a register that could not be read are skipped
+            if fmt is None:
+                if not all(valid[r] for r in registers):
                     continue
-                elif mapping:
-                    result[title] = f"Unknown ({raw_int})"
+                block = [unpack_from(">H", data, 2 * r)[0] for r in registers]
+            else:
+                if len(registers) == 1:
+                    if not valid[first]:
+                        continue
+                elif valid.find(0, first, first + len(registers)) != -1:
                     continue
+                if direct:
+                    raw_int = unpack_from(fmt, data, 2 * first)[0]
+                else:
+                    block = list(unpack_from(fmt, data, 2 * first))
 
-                # Alert/bitfields: store as hex string to stay JSON-serializable
-                if parser_rule == 6:
-                    result[title] = "0x" + "".join(f"{w:04X}" for w in block)
+            if not direct:
+                if kind == KIND_ASCII:
+                    values[metric_id] = _decode_ascii(block)
                     continue
 
-                # Default: numeric
-                if "Temperature" in title:
-                    val = raw_int * ratio - 100 + offset
+                if len(block) == 1:
+                    raw_int = block[0]
+                    if signed and raw_int & 0x8000:
+                        raw_int -= 0x10000
                 else:
-                    val = raw_int * ratio + offset
-                result[title] = float(round(val, 2))
+                    raw_int = combine_registers(block, signed=signed, reverse=reverse)
+
+            if kind == KIND_NUMERIC:
+                values[metric_id] = float(round(raw_int * ratio + offset, 2))
+            elif kind == KIND_TEMPERATURE:
+                values[metric_id] = float(round(raw_int * ratio - 100 + offset, 2))
+            elif kind == KIND_DECODER:
+                values[metric_id] = decoder(block, raw_int, metric)
+            elif kind == KIND_ENUM:
+                label = options.get(raw_int)
+                values[metric_id] = f"Unknown ({raw_int})" if label is None else label
+            else:
+                # KIND_BITFIELD: hex string to stay JSON-serializable
+                values[metric_id] = "0x" + "".join(f"{w:04X}" for w in block)
 
-            except Exception as e:
-                _LOGGER.debug("Error parsing %s: %s", title, e)
+        except Exception as e:
+            _LOGGER.debug("Error parsing %s: %s", title, e)
+            continue
+
+
+# Registers compared per slice when looking for changes
+_DIFF_PAGE = 16
+
+
+class IncrementalParser:
+    """parse_image for a stream of register images from one inverter.
+
+    Keeps the previous register image and values, and re-decodes only the
+    metrics whose registers changed; all other values are carried over.
+    After each parse, changed holds the titles whose value changed.
+    """
+
+    def __init__(self, profile: str = DEFAULT_PROFILE) -> None:
+        self._profile = profile
+        self._plan: Optional[ParsePlan] = None
+        self._data = b""
+        self._valid = b""
+        self._result = Snapshot([], {})
+        # Values of _result, by metric id
+        self._values: List[Any] = []
+        # Register address -> positions of the metrics reading it
+        self._dependents: Dict[int, Tuple[int, ...]] = {}
+        # Metric id -> title, and the registers its metrics read
+        self._titles: Tuple[str, ...] = ()
+        self._id_registers: Tuple[Tuple[int, ...], ...] = ()
+        self.changed: Set[str] = set()
+
+    def _use_plan(self, plan: ParsePlan) -> None:
+        """Build the register -> metrics reverse index of a new plan."""
+        by_title: Dict[str, List[int]] = {}
+        for pos, metric in enumerate(plan.metrics):
+            by_title.setdefault(metric.title, []).append(pos)
+
+        dependents: Dict[int, Set[int]] = {}
+        for metric in plan.metrics:
+            # Re-decode every metric of a title together, so that the
+            # last one that decodes still wins as in parse_image
+            positions = by_title[metric.title]
+            for reg in metric.registers:
+                dependents.setdefault(reg, set()).update(positions)
+
+        self._plan = plan
+        self._dependents = {r: tuple(sorted(p)) for r, p in dependents.items()}
+        self._titles = tuple(plan.ids)
+        id_registers: List[Set[int]] = [set() for _ in plan.ids]
+        for metric in plan.metrics:
+            id_registers[metric.metric_id].update(metric.registers)
+        self._id_registers = tuple(tuple(sorted(r)) for r in id_registers)
+
+    def _dirty_registers(self, data: bytes, valid: bytes) -> List[int]:
+        """Addresses of the registers that differ from the previous image."""
+        old_data, old_valid = self._data, self._valid
+        if data == old_data and valid == old_valid:
+            return []
+        dirty: List[int] = []
+        size = len(valid)
+        for start in range(0, size, _DIFF_PAGE):
+            end = min(start + _DIFF_PAGE, size)
+            if (
+                data[2 * start : 2 * end] == old_data[2 * start : 2 * end]
+                and valid[start:end] == old_valid[start:end]
+            ):
                 continue
+            dirty.extend(
+                r
+                for r in range(start, end)
+                if valid[r] != old_valid[r]
+                or data[2 * r : 2 * r + 2] != old_data[2 * r : 2 * r + 2]
+            )
+        return dirty
+
+    def parse(
+        self, raw: Sequence[Optional[int]], plan: Optional[ParsePlan] = None
+    ) -> Snapshot:
+        """Decode a flat register list; returns a new snapshot like parse_raw."""
+        return self.parse_image(_image_from_registers(raw, self._profile), plan=plan)
+
+    def parse_image(
+        self,
+        image: RegisterImage,
+        read_at: Optional[Sequence[float]] = None,
+        plan: Optional[ParsePlan] = None,
+    ) -> Snapshot:
+        """Decode a register image; returns a new snapshot like parse_image.
+
+        read_at, if given, holds when each register was last read; a
+        metric's read time is that of its oldest register. A plan other
+        than the previous one is decoded in full.
+        """
+        data = bytes(image.data)
+        valid = bytes(image.valid)
+        previous = self._result
+
+        if plan is None:
+            plan = _current_plan(self._profile)
+        if plan is None:
+            self._plan, self._data, self._valid = None, b"", b""
+            self._values = []
+            self._result = Snapshot(self._values, {})
+            self.changed = set(previous)
+            return self._result
+
+        if plan is not self._plan or len(valid) != len(self._valid):
+            self._use_plan(plan)
+            values = [MISSING] * len(plan.ids)
+            _decode_metrics(plan.metrics, image, values)
+            result = Snapshot(values, plan.ids, read_at=self._read_times(read_at))
+            self.changed = {
+                t
+                for t in set(result) | set(previous)
+                if result.get(t, MISSING) != previous.get(t, MISSING)
+            }
+        else:
+            positions: Set[int] = set()
+            for reg in self._dirty_registers(data, valid):
+                positions.update(self._dependents.get(reg, ()))
+            metrics = [plan.metrics[pos] for pos in sorted(positions)]
+
+            # Snapshots are never modified once returned, so decode into
+            # a copy of the previous values
+            old_values = self._values
+            values = old_values.copy()
+            ids = {metric.metric_id for metric in metrics}
+            for metric_id in ids:
+                values[metric_id] = MISSING
+            _decode_metrics(metrics, image, values)
+            result = Snapshot(values, plan.ids, read_at=self._read_times(read_at))
+            titles = self._titles
+            self.changed = {titles[i] for i in ids if values[i] != old_values[i]}
+
+        self._data = data
+        self._valid = valid
+        self._values = values
+        self._result = result
+        return result
+
+    def _read_times(self, read_at: Optional[Sequence[float]]) -> Optional[List[float]]:
+        """Read time of each metric id, from the registers' read times."""
+        if read_at is None:
+            return None
+        return [min(read_at[r] for r in regs) for regs in self._id_registers]
+
+
+def _combine_columns(np: Any, words: Any, signed: bool, reverse: bool) -> Any:
+    """Vectorized combine_registers over the rows of an N x k word matrix."""
+    count = words.shape[1]
+    if reverse and count == 2:
+        words = words[:, ::-1]
+    # Values of four or more words do not fit in int64
+    if count >= 4:
+        words = words.astype(object)
+    value = words[:, 0]
+    for i in range(1, count):
+        value = (value << 16) | words[:, i]
+    if signed:
+        bits = 16 * count
+        value = np.where(value & (1 << (bits - 1)), value - (1 << bits), value)
+    return value
+
+
+def _lookup_column(np: Any, keys: Any, decode: Callable[..., Any]) -> Any:
+    """Apply decode once per distinct key (or key row) instead of per row."""
+    if keys.ndim == 1:
+        uniques, inverse = np.unique(keys, return_inverse=True)
+        labels = [decode(int(key)) for key in uniques]
+    else:
+        uniques, inverse = np.unique(keys, axis=0, return_inverse=True)
+        labels = [decode(*(int(k) for k in row)) for row in uniques]
+    table = np.empty(len(labels), dtype=object)
+    table[:] = labels
+    return table[inverse.reshape(-1)]
+
+
+def _decode_column(np: Any, metric: MetricPlan, words: Any) -> Any:
+    """Decode one metric for every row; the batch twin of _decode_metrics."""
+    options: Any
+    decoder: Any
+    title, kind, indices, signed, reverse, ratio, offset, options, decoder = metric[:9]
+    block = words[:, list(indices)]
+
+    if kind == KIND_ASCII:
+        return _lookup_column(np, block, lambda *row: _decode_ascii(list(row)))
+    if kind == KIND_BITFIELD:
+        return _lookup_column(
+            np, block, lambda *row: "0x" + "".join(f"{w:04X}" for w in row)
+        )
+    if kind == KIND_DECODER:
+
+        def decode(*row: int) -> Any:
+            value = combine_registers(
+                [w & 0xFFFF for w in row], signed=signed, reverse=reverse
+            )
+            return decoder(list(row), value, metric)
+
+        return _lookup_column(np, block, decode)
+
+    value = _combine_columns(np, block & 0xFFFF, signed, reverse)
+
+    if kind == KIND_NUMERIC:
+        return np.round(value * ratio + offset, 2)
+    if kind == KIND_TEMPERATURE:
+        return np.round(value * ratio - 100 + offset, 2)
+    # KIND_ENUM
+    return _lookup_column(np, value, lambda key: options.get(key, f"Unknown ({key})"))
+
+
+def parse_raw_batch(
+    raw_matrix: Any,
+    profile: str = DEFAULT_PROFILE,
+    plan: Optional[ParsePlan] = None,
+) -> Dict[str, Any]:
+    """Decode an N x R matrix of register images into one column per metric.
+
+    Each row is a flat register list as passed to parse_raw, with None for
+    registers of blocks that could not be read. Numeric metrics come back as
+    float64 arrays with NaN where parse_raw would omit the metric; status,
+    enum, bitfield and ASCII metrics as object arrays with None. Row i of
+    the columns equals parse_raw(raw_matrix[i]), plan included.
+
+    Meant for offline work (backfills, fleets, burst captures): numpy is only
+    imported here, so the integration itself does not depend on it.
+    """
+    import numpy as np
+
+    if plan is None:
+        plan = _current_plan(profile)
+    if plan is None:
+        return {}
 
-    return result
+    matrix = np.asarray(raw_matrix)
+    if matrix.ndim != 2 or matrix.shape[1] < plan.width:
+        raise ValueError(
+            f"Expected an N x {plan.width} register matrix, got shape {matrix.shape}"
+        )
+
+    if matrix.dtype == object:
+        present = matrix != None  # noqa: E711 (elementwise)
+        words = np.where(present, matrix, 0).astype(np.int64)
+    else:
+        present = np.ones(matrix.shape, dtype=bool)
+        words = matrix.astype(np.int64)
+
+    columns: Dict[str, Any] = {}
+    for metric in plan.metrics:
+        try:
+            column = _decode_column(np, metric, words)
+        except Exception as e:
+            _LOGGER.debug("Error parsing %s: %s", metric.title, e)
+            continue
+
+        valid = present[:, list(metric.indices)].all(axis=1)
+        if column.dtype == object:
+            missing: Any = None
+        else:
+            column = column.astype(np.float64)
+            missing = np.nan
+        if not valid.all():
+            column[~valid] = missing
+
+        # A later item with the same title wins only where it decoded
+        previous = columns.get(metric.title)
+        if previous is not None and not valid.all():
+            column = np.where(valid, column, previous)
+        columns[metric.title] = column
+
+    return columns
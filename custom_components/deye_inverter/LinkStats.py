@@ -0,0 +1,185 @@
+"""Counters and latency histograms of the requests sent to a logger."""
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ReadPlanner import Block
+
+# Upper bounds of the latency histogram buckets, in seconds; a last bucket
+# holds anything slower
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0, 15.0)
+# Upper bounds of the poll duration buckets, in seconds
+CYCLE_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 25.0, 30.0)
+
+
+class Histogram:
+    """Counts of values per bucket, in constant memory."""
+
+    __slots__ = ("bounds", "counts", "total", "sum", "min", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.min = value if not self.total else min(self.min, value)
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate of the q quantile, interpolated inside its bucket.
+
+        The bucket's values are taken as spread evenly between its bounds,
+        narrowed to the smallest and largest value seen (which bound the
+        open last bucket).
+        """
+        if not self.total:
+            return None
+        rank = q * self.total
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                low = min(max(lower, self.min), self.max)
+                high = max(min(upper, self.max), low)
+                return low + (high - low) * max(rank - seen, 0) / count
+            seen += count
+            if index < len(self.bounds):
+                lower = self.bounds[index]
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        buckets = {str(bound): count for bound, count in zip(self.bounds, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {"count": self.total, "sum": self.sum, "buckets": buckets}
+
+
+class RequestStats:
+    """Outcomes of the requests for one register range.
+
+    Bytes are those of the Modbus RTU frames, without the V5 framing.
+    """
+
+    __slots__ = (
+        "requests",
+        "answered",
+        "rejected",
+        "timeouts",
+        "errors",
+        "retries",
+        "bytes_sent",
+        "bytes_received",
+        "latency",
+    )
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.answered = 0
+        # Modbus exception responses
+        self.rejected = 0
+        self.timeouts = 0
+        # Bad frames and lost connections
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = Histogram()
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            name: getattr(self, name) for name in self.__slots__[:-1]
+        }
+        stats["latency"] = self.latency.as_dict()
+        return stats
+
+
+class LinkStats:
+    """Request and poll statistics of one logger link, since start-up.
+
+    Kept per request (register range) and for the whole link; recording is
+    a few counter increments, so it is always on.
+    """
+
+    def __init__(self) -> None:
+        self.blocks: Dict[Block, RequestStats] = {}
+        self.link = RequestStats()
+        self.reconnects = 0
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.last_cycle: Optional[float] = None
+        self.cycle = Histogram(CYCLE_BUCKETS)
+
+    def _targets(self, block: Block) -> List[RequestStats]:
+        stats = self.blocks.get(block)
+        if stats is None:
+            stats = self.blocks[block] = RequestStats()
+        return [stats, self.link]
+
+    def answered(
+        self, block: Block, sent: int, received: int, rtt: float, rejected: bool
+    ) -> None:
+        """Record a response, received rtt seconds after the request."""
+        for stats in self._targets(block):
+            stats.requests += 1
+            stats.answered += 1
+            stats.rejected += rejected
+            stats.bytes_sent += sent
+            stats.bytes_received += received
+            stats.latency.add(rtt)
+
+    def failed(self, block: Block, sent: int, timed_out: bool) -> None:
+        """Record a request that got no usable response."""
+        for stats in self._targets(block):
+            stats.requests += 1
+            stats.bytes_sent += sent
+            if timed_out:
+                stats.timeouts += 1
+            else:
+                stats.errors += 1
+
+    def retried(self, block: Block) -> None:
+        for stats in self._targets(block):
+            stats.retries += 1
+
+    def reconnected(self) -> None:
+        self.reconnects += 1
+
+    def cycle_done(self, duration: float, failed: bool) -> None:
+        """Record a poll that took duration seconds."""
+        self.cycles += 1
+        self.failed_cycles += failed
+        self.last_cycle = duration
+        self.cycle.add(duration)
+
+    @property
+    def success_ratio(self) -> Optional[float]:
+        """Share of requests answered with register values."""
+        link = self.link
+        if not link.requests:
+            return None
+        return (link.answered - link.rejected) / link.requests
+
+    def summary(self) -> Dict[str, Any]:
+        """All statistics as plain data, e.g. for diagnostics."""
+        return {
+            "latency_p50": self.link.latency.quantile(0.5),
+            "latency_p95": self.link.latency.quantile(0.95),
+            "success_ratio": self.success_ratio,
+            "last_cycle": self.last_cycle,
+            "cycles": self.cycles,
+            "failed_cycles": self.failed_cycles,
+            "reconnects": self.reconnects,
+            "link": self.link.as_dict(),
+            "cycle": self.cycle.as_dict(),
+            "blocks": {
+                f"0x{first:04X}-0x{last:04X}": stats.as_dict()
+                for (first, last), stats in sorted(self.blocks.items())
+            },
+        }
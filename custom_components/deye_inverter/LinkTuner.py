@@ -0,0 +1,112 @@
+"""Learned latency of the link to a logger, and the timeout and pause it needs."""
+
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional
+
+from .const import DEFAULT_MODBUS_TIMEOUT, MAX_REQUEST_PAUSE, MIN_REQUEST_PAUSE
+
+# Round trips kept for the percentiles
+SAMPLE_WINDOW = 64
+# Round trips needed before the timeout is derived from them
+MIN_SAMPLES = 8
+# Shortest derived timeout, in seconds: loggers answer in bursts
+MIN_TIMEOUT = 2.0
+# The timeout also covers this multiple of the 95th percentile round trip
+P95_FACTOR = 2.0
+# Pause before the first round trip is timed, and the step it is lowered by
+# after each request that went through
+INITIAL_PAUSE = 0.1
+PAUSE_STEP = 0.01
+# Seconds a request is assumed to take until one has been timed
+INITIAL_ESTIMATE = 1.0
+
+
+class LinkTuner:
+    """Round-trip statistics of one logger link.
+
+    The smoothed round trip and its variation follow TCP's estimator (RFC
+    6298); the timeout is the larger of srtt + 4 * rttvar and a multiple
+    of the recent 95th percentile, doubled after each timeout in a row.
+    The pause between requests is lowered a step after each success and
+    doubled when a request sent after another fails, within min_pause and
+    max_pause.
+    """
+
+    def __init__(
+        self,
+        min_pause: float = MIN_REQUEST_PAUSE,
+        max_pause: float = MAX_REQUEST_PAUSE,
+        max_timeout: float = DEFAULT_MODBUS_TIMEOUT,
+    ) -> None:
+        self._min_pause = min_pause
+        self._max_pause = max_pause
+        self._max_timeout = max_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.pause = min(max(INITIAL_PAUSE, min_pause), max_pause)
+        self._samples: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        # Consecutive timeouts
+        self._backoff = 0
+
+    @property
+    def estimate(self) -> float:
+        """Expected duration of a request."""
+        return INITIAL_ESTIMATE if self.srtt is None else self.srtt
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Recent round trip below which a fraction q of them fall."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    @property
+    def timeout(self) -> float:
+        """Seconds to wait for the next response."""
+        p95 = self.percentile(0.95)
+        if self.srtt is None or p95 is None or len(self._samples) < MIN_SAMPLES:
+            return self._max_timeout
+        timeout = max(self.srtt + 4 * self.rttvar, P95_FACTOR * p95, MIN_TIMEOUT)
+        return min(timeout * 2**self._backoff, self._max_timeout)
+
+    def success(self, rtt: float) -> None:
+        """Record a request answered after rtt seconds."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar += (abs(self.srtt - rtt) - self.rttvar) / 4
+            self.srtt += (rtt - self.srtt) / 8
+        self._samples.append(rtt)
+        self._backoff = 0
+        self.pause = max(self._min_pause, self.pause - PAUSE_STEP)
+
+    def failure(self, timed_out: bool, paced: bool) -> None:
+        """Record a request that got no usable answer.
+
+        paced: it followed another request, so it may have come too soon.
+        """
+        if timed_out:
+            # Past a few doublings the timeout is at max_timeout anyway
+            self._backoff = min(self._backoff + 1, 8)
+        if paced:
+            self.pause = min(self._max_pause, max(2 * self.pause, PAUSE_STEP))
+
+    def state(self) -> Dict[str, Any]:
+        """Learned parameters, to be restored by restore()."""
+        return {
+            "srtt": self.srtt,
+            "rttvar": self.rttvar,
+            "pause": self.pause,
+            "samples": list(self._samples),
+        }
+
+    def restore(self, state: Mapping[str, Any]) -> None:
+        """Start from parameters learned earlier on the same link."""
+        srtt = state.get("srtt")
+        self.srtt = None if srtt is None else float(srtt)
+        self.rttvar = float(state.get("rttvar", 0.0))
+        pause = float(state.get("pause", self.pause))
+        self.pause = min(max(pause, self._min_pause), self._max_pause)
+        self._samples.clear()
+        self._samples.extend(float(rtt) for rtt in state.get("samples", ()))
@@ -0,0 +1,175 @@
+"""One shared, serialized connection per physical logger."""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from pysolarmanv5 import PySolarmanV5Async
+
+from .const import (
+    CONNECTION_LINGER,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MODBUS_TIMEOUT,
+    MAX_REQUEST_PAUSE,
+)
+from .LinkTuner import LinkTuner
+
+_LOGGER = logging.getLogger(__name__)
+
+# (host, port, logger serial)
+ConnectionKey = Tuple[str, int, int]
+
+# Connections in use or lingering, shared by the whole process
+_CONNECTIONS: Dict[ConnectionKey, "LoggerConnection"] = {}
+
+
+async def open_client(modbus: PySolarmanV5Async) -> None:
+    """Connect the client, waiting DEFAULT_CONNECT_TIMEOUT at most.
+
+    The client's socket_timeout covers both the connect and the wait for
+    responses; it is DEFAULT_MODBUS_TIMEOUT again once connected.
+    """
+    modbus.socket_timeout = DEFAULT_CONNECT_TIMEOUT
+    try:
+        await modbus.connect()
+    finally:
+        modbus.socket_timeout = DEFAULT_MODBUS_TIMEOUT
+
+
+def acquire_connection(host: str, port: int, serial: int) -> "LoggerConnection":
+    """The connection to a logger, created on first use.
+
+    Each call takes a reference, to be given back with release().
+    """
+    key = (host, port, serial)
+    connection = _CONNECTIONS.get(key)
+    if connection is None:
+        connection = _CONNECTIONS[key] = LoggerConnection(key)
+    connection.users += 1
+    connection.cancel_expiry()
+    return connection
+
+
+async def close_idle_connections() -> None:
+    """Close the connections no one uses, without waiting for them to expire."""
+    for connection in list(_CONNECTIONS.values()):
+        if not connection.users:
+            await connection.close()
+
+
+class LoggerConnection:
+    """A PySolarmanV5Async client shared by everything talking to one logger.
+
+    Loggers serve a single TCP client, so config entries, reloads and the
+    config flow pointing at the same logger share this connection instead
+    of knocking each other off it. Requests take turns through a lock,
+    which asyncio hands over in arrival order. When the last user releases
+    it, the connection is kept open for CONNECTION_LINGER seconds, so that
+    a reload or the entry set up after the config flow picks it up again.
+
+    The client does not reconnect by itself: its reconnect task would race
+    the reopening done here and could leave two sockets to a logger that
+    serves one. A dropped connection is reopened by the next turn instead.
+
+    Timing belongs to the link, not to its users: the learned timeout and
+    pause, and the pause between two requests, apply to every request on
+    the connection, whichever unit or entry sends it.
+    """
+
+    def __init__(self, key: ConnectionKey, client: Any = None) -> None:
+        """client: a stand-in for the PySolarmanV5Async client, e.g. a
+        FrameCapture.ReplayClient; such a connection is not shared."""
+        self.key = key
+        host, port, serial = key
+        self.users = 0
+        if client is None:
+            client = PySolarmanV5Async(
+                host,
+                serial,
+                port=port,
+                mb_slave_id=1,
+                socket_timeout=DEFAULT_MODBUS_TIMEOUT,
+                verbose=False,
+                auto_reconnect=False,
+                logger=_LOGGER,
+            )
+        self.client = client
+        self.link = LinkTuner()
+        # Monotonic time the last request on the connection was done with
+        self.last_request: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._expiry: Optional[asyncio.TimerHandle] = None
+        # The close started when the linger expired; the loop only holds
+        # tasks weakly
+        self._closing: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def turn(self, connect: bool = False) -> AsyncIterator[PySolarmanV5Async]:
+        """Exclusive use of the client, for one request or connect.
+
+        With connect, a connection the logger dropped is opened again first,
+        raising NoSocketAvailableError if the logger cannot be reached.
+        """
+        async with self._lock:
+            if connect and self.client.writer is None:
+                await open_client(self.client)
+            yield self.client
+
+    async def open(self) -> None:
+        """Connect, unless another user already has.
+
+        Raises NoSocketAvailableError if the logger cannot be reached.
+        """
+        async with self.turn(connect=True):
+            pass
+
+    async def pace(self) -> bool:
+        """Wait out the learned pause after the previous request.
+
+        To be called in a turn, before sending. Returns whether the request
+        follows another closely enough to be dropped for it.
+        """
+        if self.last_request is None:
+            return False
+        wait = self.last_request + self.link.pause - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return time.monotonic() - self.last_request < MAX_REQUEST_PAUSE
+
+    async def release(self) -> None:
+        """Give back a reference taken by acquire_connection()."""
+        self.users -= 1
+        if self.users > 0:
+            return
+        if (
+            CONNECTION_LINGER <= 0
+            or self.client.writer is None
+            or _CONNECTIONS.get(self.key) is not self
+        ):
+            await self.close()
+            return
+        self._expiry = asyncio.get_running_loop().call_later(
+            CONNECTION_LINGER, self._expire
+        )
+
+    def cancel_expiry(self) -> None:
+        if self._expiry is not None:
+            self._expiry.cancel()
+            self._expiry = None
+
+    def _expire(self) -> None:
+        self._expiry = None
+        if not self.users:
+            self._closing = asyncio.get_running_loop().create_task(self.close())
+
+    async def close(self) -> None:
+        """Disconnect and forget the connection."""
+        self.cancel_expiry()
+        if _CONNECTIONS.get(self.key) is self:
+            del _CONNECTIONS[self.key]
+        try:
+            await self.client.disconnect()
+        except Exception as e:  # pragma: no cover - best-effort cleanup
+            _LOGGER.debug("Error closing the connection to %s: %s", self.key, e)
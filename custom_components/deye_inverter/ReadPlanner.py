@@ -0,0 +1,161 @@
+"""Planning of the Modbus requests that read a set of registers."""
+
+from typing import FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# (first, last) inclusive, as in const.py
+Block = Tuple[int, int]
+
+# Modbus limit of one Read Holding Registers request
+MAX_READ_REGISTERS = 125
+# Unneeded registers read to bridge two needed ones rather than sending a
+# second request: a round trip costs far more than a few extra words
+DEFAULT_READ_GAP = 32
+
+
+class ReadPlan(NamedTuple):
+    """Requests of one read cycle, as (first, last) blocks."""
+
+    # Must all succeed
+    core: Tuple[Block, ...]
+    # Best-effort
+    optional: Tuple[Block, ...]
+
+
+class ReadMap(NamedTuple):
+    """What a device was found unable to serve, beyond its profile."""
+
+    # Registers that fail even when read alone
+    unreadable: FrozenSet[int] = frozenset()
+    # Addresses no request may span: ranges that fail as one request but
+    # read fine as two, split here
+    splits: FrozenSet[int] = frozenset()
+    # Wall-clock time the map last grew
+    found_at: float = 0.0
+
+
+def plan_reads(
+    registers: Iterable[int],
+    max_registers: int = MAX_READ_REGISTERS,
+    max_gap: int = DEFAULT_READ_GAP,
+    readable: Optional[Sequence[Block]] = None,
+    splits: Iterable[int] = (),
+) -> Tuple[Block, ...]:
+    """Fewest requests reading every register, in address order.
+
+    A request spans at most max_registers and bridges at most max_gap
+    unneeded registers between two needed ones. If readable blocks are
+    given, requests only read registers inside them. No request reads both
+    split - 1 and split for any of the splits. Among the plans with the
+    fewest requests the one reading the fewest registers wins.
+    """
+    if max_registers < 1:
+        raise ValueError(f"max_registers must be positive, got {max_registers}")
+    regs = sorted(set(registers))
+    if not regs:
+        return ()
+
+    # readable_upto[i]: readable addresses below regs[0] + i
+    base = regs[0]
+    span = regs[-1] - base + 1
+    flags = bytearray(span)
+    if readable is None:
+        flags[:] = b"\x01" * span
+    else:
+        for first, last in readable:
+            lo, hi = max(first, base), min(last, regs[-1])
+            if lo <= hi:
+                flags[lo - base : hi - base + 1] = b"\x01" * (hi - lo + 1)
+    readable_upto = [0]
+    for flag in flags:
+        readable_upto.append(readable_upto[-1] + flag)
+    # splits_upto[i]: splits at addresses below regs[0] + i
+    split_flags = bytearray(span)
+    for split in splits:
+        if base < split < base + span:
+            split_flags[split - base] = 1
+    splits_upto = [0]
+    for flag in split_flags:
+        splits_upto.append(splits_upto[-1] + flag)
+
+    # best[i]: (requests, registers read) covering regs[:i]; start[i]: index
+    # in regs of the first register of the last of those requests
+    best: List[Tuple[int, int]] = [(0, 0)]
+    start: List[int] = [0]
+    for i in range(1, len(regs) + 1):
+        last = regs[i - 1]
+        if not flags[last - base]:
+            raise ValueError(f"Register 0x{last:04X} is not readable")
+        choice: Optional[Tuple[int, int]] = None
+        for j in range(i - 1, -1, -1):
+            first = regs[j]
+            length = last - first + 1
+            if length > max_registers:
+                break
+            if j < i - 1 and regs[j + 1] - first - 1 > max_gap:
+                break
+            covered = readable_upto[last - base + 1] - readable_upto[first - base]
+            if covered != length:
+                break
+            if splits_upto[last - base + 1] != splits_upto[first - base + 1]:
+                break
+            cost = (best[j][0] + 1, best[j][1] + length)
+            if choice is None or cost < choice:
+                choice = cost
+                start_index = j
+        assert choice is not None  # regs[i - 1] alone always fits
+        best.append(choice)
+        start.append(start_index)
+
+    blocks: List[Block] = []
+    i = len(regs)
+    while i:
+        j = start[i]
+        blocks.append((regs[j], regs[i - 1]))
+        i = j
+    return tuple(reversed(blocks))
+
+
+def plan_profile_reads(
+    registers: Iterable[int],
+    core_blocks: Sequence[Block],
+    optional_blocks: Sequence[Block],
+    max_registers: int = MAX_READ_REGISTERS,
+    max_gap: int = DEFAULT_READ_GAP,
+    read_map: ReadMap = ReadMap(),
+) -> ReadPlan:
+    """Plan the core and optional requests of a profile separately.
+
+    Registers are core or optional by the block they fall in; the blocks,
+    less the read map's unreadable registers, are also the only registers
+    known to be readable. Registers outside them are not read.
+    """
+    core: List[int] = []
+    optional: List[int] = []
+    for reg in registers:
+        if reg in read_map.unreadable:
+            continue
+        if any(first <= reg <= last for first, last in core_blocks):
+            core.append(reg)
+        elif any(first <= reg <= last for first, last in optional_blocks):
+            optional.append(reg)
+    core_readable = _without(core_blocks, read_map.unreadable)
+    optional_readable = _without(optional_blocks, read_map.unreadable)
+    return ReadPlan(
+        core=plan_reads(core, max_registers, max_gap, core_readable, read_map.splits),
+        optional=plan_reads(
+            optional, max_registers, max_gap, optional_readable, read_map.splits
+        ),
+    )
+
+
+def _without(blocks: Sequence[Block], registers: FrozenSet[int]) -> List[Block]:
+    """blocks with registers cut out of them."""
+    result: List[Block] = []
+    for first, last in blocks:
+        for reg in sorted(r for r in registers if first <= r <= last):
+            if first < reg:
+                result.append((first, reg - 1))
+            first = reg + 1
+        if first <= last:
+            result.append((first, last))
+    return result
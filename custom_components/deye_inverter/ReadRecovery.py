@@ -0,0 +1,63 @@
+"""Bisection of register ranges the logger rejects, down to what it serves."""
+
+from typing import Awaitable, Callable, NamedTuple, Sequence, Set
+
+from umodbus.exceptions import IllegalDataValueError
+
+from .BlockHealth import DETERMINISTIC_ERRORS
+
+# Answers that depend on the registers or the size of the request rather
+# than on the link: Modbus address/quantity exceptions. Corrupt frames are
+# link noise and never start a bisection.
+REJECTIONS = DETERMINISTIC_ERRORS + (IllegalDataValueError,)
+# Cycles in a row a request must be rejected before it is bisected
+BISECT_AFTER = 2
+# Seconds a read map is planned around before the full requests are tried
+# again, to notice new firmware (as BlockHealth does for unsupported blocks)
+READ_MAP_RETRY = 86400.0
+
+
+class Bisection(NamedTuple):
+    """Outcome of bisecting a rejected request."""
+
+    # Registers read fine, in requests of their own or together
+    readable: int
+    unreadable: Set[int]
+    splits: Set[int]
+
+
+async def bisect_reads(
+    registers: Sequence[int], read: Callable[[int, int], Awaitable[bool]]
+) -> Bisection:
+    """Find out why a request for registers is rejected.
+
+    registers are the sorted addresses the request was for; read(first,
+    last) requests a range and returns False if it is rejected, keeping
+    the values otherwise. The range is halved until every part reads or is
+    a single register: such a register is unreadable. A failing range
+    whose halves both read in full gets a split between them. Anything
+    else read raises (a timeout, say) aborts the bisection.
+    """
+    unreadable: Set[int] = set()
+    splits: Set[int] = set()
+    readable = 0
+
+    async def probe(regs: Sequence[int], rejected: bool) -> None:
+        nonlocal readable
+        if not rejected and await read(regs[0], regs[-1]):
+            readable += len(regs)
+            return
+        if len(regs) == 1:
+            unreadable.add(regs[0])
+            return
+        found = len(unreadable)
+        half = len(regs) // 2
+        await probe(regs[:half], False)
+        await probe(regs[half:], False)
+        if len(unreadable) == found:
+            # Each half reads; only the two together are rejected
+            splits.add(regs[half])
+
+    if registers:
+        await probe(registers, True)
+    return Bisection(readable, unreadable, splits)
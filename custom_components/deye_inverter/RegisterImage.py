@@ -0,0 +1,84 @@
+"""Holding registers of one inverter, indexed by register address."""
+
+import struct
+from typing import Optional, Sequence, Tuple, Union, cast
+
+from .const import REGISTER_BLOCKS
+
+# One past the highest register any read block covers
+REGISTER_SPACE = max(end for _, end in REGISTER_BLOCKS) + 1
+
+
+class RegisterImage:
+    """Register words as big-endian bytes, plus a validity map.
+
+    data holds register n at bytes 2n..2n+1, exactly as it arrives in a
+    Modbus response, so a block is stored with one slice copy and decoders
+    read words straight from it with struct. valid[n] is 1 once register n
+    has been read; registers of blocks that failed stay 0.
+    """
+
+    __slots__ = ("data", "valid")
+
+    def __init__(self, size: int = REGISTER_SPACE) -> None:
+        self.data = bytearray(2 * size)
+        self.valid = bytearray(size)
+
+    @property
+    def size(self) -> int:
+        return len(self.valid)
+
+    def write(self, address: int, payload: Union[bytes, bytearray, memoryview]) -> None:
+        """Store the big-endian payload of a read starting at address."""
+        count = len(payload) // 2
+        if address + count > len(self.valid):
+            raise ValueError(
+                f"Registers 0x{address:04X}+{count} exceed the image "
+                f"(0x{len(self.valid):04X} registers)"
+            )
+        self.data[2 * address : 2 * (address + count)] = payload
+        self.valid[address : address + count] = b"\x01" * count
+
+    def invalidate(self, address: int, count: int) -> None:
+        """Mark registers as unread, e.g. after a failed block read."""
+        self.valid[address : address + count] = bytes(count)
+
+    def word(self, address: int) -> Optional[int]:
+        """Unsigned value of one register, or None if it was not read."""
+        if address >= len(self.valid) or not self.valid[address]:
+            return None
+        return struct.unpack_from(">H", self.data, 2 * address)[0]
+
+    def words(self, address: int, count: int) -> Optional[Tuple[int, ...]]:
+        """Unsigned values of count registers, or None if any was not read."""
+        end = address + count
+        if end > len(self.valid) or self.valid.find(0, address, end) != -1:
+            return None
+        return struct.unpack_from(f">{count}H", self.data, 2 * address)
+
+    @classmethod
+    def from_registers(
+        cls,
+        raw: Sequence[Optional[int]],
+        blocks: Sequence[Tuple[int, int]] = REGISTER_BLOCKS,
+        size: int = REGISTER_SPACE,
+    ) -> "RegisterImage":
+        """Build an image from a flat register list laid out by blocks.
+
+        None entries, and registers past the end of raw, stay invalid.
+        """
+        image = cls(size)
+        offset = 0
+        for start, end in blocks:
+            values = raw[offset : offset + end - start + 1]
+            offset += end - start + 1
+            if values and None not in values:
+                words = cast(Sequence[int], values)
+                image.write(
+                    start, struct.pack(f">{len(words)}H", *(v & 0xFFFF for v in words))
+                )
+                continue
+            for i, value in enumerate(values):
+                if value is not None:
+                    image.write(start + i, struct.pack(">H", value & 0xFFFF))
+        return image
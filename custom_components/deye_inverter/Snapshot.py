@@ -0,0 +1,98 @@
+"""Parsed metric values of one read cycle."""
+
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Value of a metric that could not be decoded in the cycle
+MISSING: Any = object()
+
+
+class Snapshot(Mapping[str, Any]):
+    """Metric values indexed by metric id, with a read-only view by title.
+
+    values[i] is the value of metric id i, or MISSING. The title -> id
+    index belongs to the parse plan and is shared by all its snapshots,
+    so a snapshot only holds one list and a timestamp. As a Mapping it
+    behaves like the title-keyed dict the parser used to return.
+
+    Values of slowly polled registers are carried over from earlier reads;
+    read_at, if known, holds when each metric's registers were last read.
+    A cycle cut short by its time budget lists the (first, last) register
+    blocks it did not read in skipped; failed lists the blocks whose read
+    failed, whose metrics keep their values of an earlier read.
+    """
+
+    __slots__ = ("_values", "_ids", "_read_at", "timestamp", "skipped", "failed")
+
+    def __init__(
+        self,
+        values: List[Any],
+        ids: Dict[str, int],
+        timestamp: Optional[float] = None,
+        read_at: Optional[List[float]] = None,
+    ) -> None:
+        self._values = values
+        self._ids = ids
+        self._read_at = read_at
+        # Wall-clock time of the read
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.skipped: Tuple[Tuple[int, int], ...] = ()
+        self.failed: Tuple[Tuple[int, int], ...] = ()
+
+    @property
+    def partial(self) -> bool:
+        """Whether some blocks were not read fresh in the cycle."""
+        return bool(self.skipped or self.failed)
+
+    def value(self, metric_id: int) -> Any:
+        """Value of a metric by id; None if it is missing."""
+        value = self._values[metric_id]
+        return None if value is MISSING else value
+
+    def read_at(self, title: str) -> Optional[float]:
+        """Wall-clock time the metric was read; None if missing or unknown."""
+        metric_id = self._ids.get(title)
+        if (
+            metric_id is None
+            or self._read_at is None
+            or self._values[metric_id] is MISSING
+        ):
+            return None
+        return self._read_at[metric_id]
+
+    def age(self, title: str) -> Optional[float]:
+        """Seconds between the metric's read and the snapshot."""
+        read_at = self.read_at(title)
+        return None if read_at is None else self.timestamp - read_at
+
+    def metric_id(self, title: str) -> Optional[int]:
+        """Id of the metric called title, if the plan has one."""
+        return self._ids.get(title)
+
+    def __getitem__(self, title: str) -> Any:
+        value = self._values[self._ids[title]]
+        if value is MISSING:
+            raise KeyError(title)
+        return value
+
+    def get(self, title: str, default: Any = None) -> Any:
+        metric_id = self._ids.get(title)
+        if metric_id is None:
+            return default
+        value = self._values[metric_id]
+        return default if value is MISSING else value
+
+    def __contains__(self, title: object) -> bool:
+        metric_id = self._ids.get(title)  # type: ignore[call-overload]
+        return metric_id is not None and self._values[metric_id] is not MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        values = self._values
+        return (title for title, i in self._ids.items() if values[i] is not MISSING)
+
+    def __len__(self) -> int:
+        return len(self._values) - self._values.count(MISSING)
+
+    def __repr__(self) -> str:
+        return f"Snapshot({dict(self)!r}, timestamp={self.timestamp!r})"
@@ -6,8 +6,17 @@ from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN, CONF_HOST, CONF_PORT, CONF_SERIAL, CONF_INSTALLED_POWER
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_SERIAL,
+    CONF_INSTALLED_POWER,
+    CONF_PROFILE,
+)
 from .coordinator import DeyeDataUpdateCoordinator
+from .InverterDataParser import load_compiled_definitions
+from .profiles import DEFAULT_PROFILE
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,6 +46,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up the integration from a config entry."""
     installed_power = entry.data[CONF_INSTALLED_POWER]
 
+    # Load the register definitions off the event loop (file I/O). Entries
+    # without a stored profile get theirs when the coordinator connects.
+    await hass.async_add_executor_job(
+        load_compiled_definitions, entry.data.get(CONF_PROFILE, DEFAULT_PROFILE)
+    )
+
     coordinator = DeyeDataUpdateCoordinator(
         hass=hass,
         config_entry=entry,
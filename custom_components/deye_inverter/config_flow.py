@@ -1,10 +1,21 @@
 import logging
+from typing import List
 
 import voluptuous as vol
 from homeassistant import config_entries
 
-from .const import DOMAIN, CONF_HOST, CONF_PORT, CONF_SERIAL, CONF_INSTALLED_POWER
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_SERIAL,
+    CONF_INSTALLED_POWER,
+    CONF_PROFILE,
+    CONF_SLAVE_IDS,
+    DEFAULT_SLAVE_ID,
+)
 from .InverterData import test_connection
+from .profiles import profile_for_device_type
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -14,10 +25,24 @@ DATA_SCHEMA = vol.Schema(
         vol.Required(CONF_PORT, default=8899): int,
         vol.Required(CONF_SERIAL): str,
         vol.Required(CONF_INSTALLED_POWER): int,
+        vol.Optional(CONF_SLAVE_IDS, default=str(DEFAULT_SLAVE_ID)): str,
     }
 )
 
 
+def parse_slave_ids(text: str) -> List[int]:
+    """Slave IDs from a comma-separated list such as "1, 2, 3".
+
+    Raises ValueError unless they are distinct Modbus addresses (1-247).
+    """
+    slave_ids = [int(part) for part in text.replace(" ", "").split(",") if part]
+    if not slave_ids or len(set(slave_ids)) != len(slave_ids):
+        raise ValueError(f"Invalid slave IDs: {text!r}")
+    if any(not 1 <= slave_id <= 247 for slave_id in slave_ids):
+        raise ValueError(f"Slave IDs must be 1-247: {text!r}")
+    return slave_ids
+
+
 class DeyeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Config flow for Deye Inverter."""
 
@@ -31,23 +56,41 @@ class DeyeConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             await self.async_set_unique_id(user_input[CONF_SERIAL])
             self._abort_if_unique_id_configured()
 
+            slave_ids = [DEFAULT_SLAVE_ID]
+            try:
+                if CONF_SLAVE_IDS in user_input:
+                    slave_ids = parse_slave_ids(str(user_input[CONF_SLAVE_IDS]))
+            except ValueError:
+                errors[CONF_SLAVE_IDS] = "invalid_slave_ids"
             if not user_input[CONF_SERIAL].strip().isdigit():
                 errors[CONF_SERIAL] = "invalid_serial"
-            else:
+            if not errors:
                 try:
-                    await self.hass.async_add_executor_job(
-                        test_connection,
-                        user_input[CONF_HOST],
-                        user_input[CONF_PORT],
-                        user_input[CONF_SERIAL],
-                    )
+                    # Every unit must answer; the first one's model picks
+                    # the register map of all of them
+                    device_types = [
+                        await test_connection(
+                            user_input[CONF_HOST],
+                            user_input[CONF_PORT],
+                            user_input[CONF_SERIAL],
+                            slave_id,
+                        )
+                        for slave_id in slave_ids
+                    ]
                 except Exception as err:
                     _LOGGER.warning("Cannot connect to inverter: %s", err)
                     errors["base"] = "cannot_connect"
                 else:
+                    # The register map follows the model; storing it here
+                    # spares the probe on every startup
+                    data = {
+                        **user_input,
+                        CONF_PROFILE: profile_for_device_type(device_types[0]),
+                    }
+                    if CONF_SLAVE_IDS in user_input:
+                        data[CONF_SLAVE_IDS] = slave_ids
                     return self.async_create_entry(
-                        title=user_input[CONF_SERIAL],
-                        data=user_input,
+                        title=user_input[CONF_SERIAL], data=data
                     )
 
         return self.async_show_form(
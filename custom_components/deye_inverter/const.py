@@ -3,17 +3,55 @@
 DOMAIN = "deye_inverter"
 DEFAULT_SCAN_INTERVAL = 30  # segundos
 DEFAULT_MODBUS_TIMEOUT = 15  # segundos de timeout en lecturas Modbus
+# Seconds to wait for the logger to accept a TCP connection: an offline
+# logger is noticed this fast instead of after read timeouts
+DEFAULT_CONNECT_TIMEOUT = 1.5
 DEFAULT_MODBUS_RETRIES = 2  # reintentos al leer registros
+DEFAULT_CYCLE_RETRIES = 4  # reintentos por ciclo de lectura, entre todos los bloques
+# Seconds one poll may take, so that a slow poll ends before the next is due
+DEFAULT_POLL_BUDGET = DEFAULT_SCAN_INTERVAL - 5
+# Seconds the values of a core block that keeps failing are carried over
+# before its metrics are dropped (unavailable)
+MAX_METRIC_AGE = 5 * DEFAULT_SCAN_INTERVAL
+# Seconds a logger connection stays open after its last user releases it,
+# so that a reload or a new entry reuses it instead of reconnecting
+CONNECTION_LINGER = 10
+# Bounds of the learned pause between two requests to the logger, seconds
+MIN_REQUEST_PAUSE = 0.0
+MAX_REQUEST_PAUSE = 1.0
 
 CONF_HOST = "host"
 CONF_PORT = "port"
 CONF_SERIAL = "serial"
 CONF_INSTALLED_POWER = "installed_power"
+# Register profile (see profiles.py), detected from the device type
+CONF_PROFILE = "profile"
+# Modbus slave IDs of the inverters behind the logger (parallel units on
+# its RS485 bus); the first is the primary unit
+CONF_SLAVE_IDS = "slave_ids"
+DEFAULT_SLAVE_ID = 1
 
-# Holding-register blocks read on every update, as (first, last) inclusive.
-# Core blocks must succeed or the whole read fails; optional blocks are read
-# best-effort (some devices may not expose them). Order defines the layout of
-# the flat register list passed to the parser, so only append new blocks.
+# Fired when an alert bit is raised or cleared; data: serial, slave_id,
+# code, description, severity ("warning"/"fault") and active (bool)
+EVENT_ALERT = f"{DOMAIN}_alert"
+
+# Inverter ID, board versions and the optional register blocks the
+# inverter does not serve, stored per logger serial
+IDENTITY_STORAGE_KEY = f"{DOMAIN}.identity"
+IDENTITY_STORAGE_VERSION = 1
+# Learned latency, timeout and pacing of the link to each logger, saved at
+# most every LINK_SAVE_INTERVAL seconds and on unload
+LINK_STORAGE_KEY = f"{DOMAIN}.link"
+LINK_STORAGE_VERSION = 1
+LINK_SAVE_INTERVAL = 600
+
+# Holding-register blocks of single-phase hybrids (the default profile, see
+# profiles.py), as (first, last) inclusive. The registers the metrics need
+# are read in as few requests as possible within these blocks (see
+# ReadPlanner.py). Core registers must be read or the whole read fails;
+# optional ones are read best-effort (some devices may not expose them).
+# Order defines the layout of the flat register list passed to the parser,
+# so only append new blocks.
 CORE_REGISTER_BLOCKS = [
     (0x003B, 0x0070),  # daily/total counters, temperatures, alerts
     (0x0096, 0x00C3),  # grid, battery, load, PV real-time values
@@ -1,23 +1,48 @@
+import asyncio
 import logging
+import time
 from datetime import timedelta
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from pysolarmanv5.pysolarmanv5 import NoSocketAvailableError
 
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
+from .const import (
+    CONF_PROFILE,
+    CONF_SLAVE_IDS,
+    DOMAIN,
+    DEFAULT_POLL_BUDGET,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLAVE_ID,
+    EVENT_ALERT,
+    IDENTITY_STORAGE_KEY,
+    IDENTITY_STORAGE_VERSION,
+    LINK_SAVE_INTERVAL,
+    LINK_STORAGE_KEY,
+    LINK_STORAGE_VERSION,
+)
+from .entity_descriptions import site_metrics
 from .InverterData import InverterData
+from .LinkStats import LinkStats
+from .profiles import DEFAULT_PROFILE
+from .ReadPlanner import ReadMap
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class DeyeDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
+class DeyeDataUpdateCoordinator(DataUpdateCoordinator[Mapping[str, Any]]):
     """
     Asynchronous coordinator for inverter data.
     Uses InverterData which requires host, port, and serial.
+
+    One coordinator polls one unit (Modbus slave ID) behind the logger.
+    The entry's coordinator polls the first unit and drives the followers
+    created for the others, which have no schedule of their own.
     """
 
     def __init__(
@@ -25,6 +50,7 @@ class DeyeDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
         hass: HomeAssistant,
         config_entry: ConfigEntry,
         installed_power: float,
+        slave_id: Optional[int] = None,
     ) -> None:
         assert config_entry is not None  # ✅ for mypy
 
@@ -34,52 +60,327 @@ class DeyeDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
         self._host = config_entry.data["host"]
         self._port = config_entry.data.get("port", 8899)
         self.serial = config_entry.data["serial"]
-        self._last_known_data: Dict[str, Any] = {}
-        # Created lazily in _async_update_data: the constructor opens a
-        # socket, which must not run in the event loop.
+        slave_ids: List[int] = list(
+            config_entry.data.get(CONF_SLAVE_IDS) or [DEFAULT_SLAVE_ID]
+        )
+        primary = slave_id is None or slave_id == slave_ids[0]
+        self.slave_id: int = slave_ids[0] if slave_id is None else slave_id
+        # Identifies the unit's device, entities and storage; the first
+        # unit keeps the serial, as before parallel units were supported
+        self.unit_id: str = self.serial if primary else f"{self.serial}_{self.slave_id}"
+        self.followers: List["DeyeDataUpdateCoordinator"] = (
+            [
+                DeyeDataUpdateCoordinator(hass, config_entry, installed_power, unit)
+                for unit in slave_ids[1:]
+            ]
+            if primary
+            else []
+        )
+        # Sums over all units of the power and energy metrics, once every
+        # unit has a value for them
+        self.site_data: Dict[str, float] = {}
+        self._last_known_data: Mapping[str, Any] = {}
+        # Register profile; entries created before profiles existed have
+        # none stored and get it detected on the first connection
+        self.profile: str = config_entry.data.get(CONF_PROFILE, DEFAULT_PROFILE)
+        self._profile_detected = False
+        # Metrics whose value changed in the last update
+        self.changed_metrics: Set[str] = set()
+        # Identity registers (address -> word), unsupported optional blocks
+        # and read map as last stored, and the device registry fields
+        # derived from the identity
+        self._identity_store: Store[Dict[str, Any]] = Store(
+            hass, IDENTITY_STORAGE_VERSION, f"{IDENTITY_STORAGE_KEY}.{self.unit_id}"
+        )
+        self._identity: Optional[Dict[int, int]] = None
+        self._unsupported: Dict[Tuple[int, int], float] = {}
+        self._read_map = ReadMap()
+        self.device_identity: Dict[str, str] = {}
+        # Learned link timing, and the monotonic time it was last saved;
+        # the units behind the logger share its link, which the first one
+        # restores and saves
+        self._link_store: Optional[Store[Dict[str, Any]]] = (
+            Store(hass, LINK_STORAGE_VERSION, f"{LINK_STORAGE_KEY}.{self.serial}")
+            if primary
+            else None
+        )
+        self._link_saved = 0.0
+        # Created and connected lazily in _async_update_data
         self.inverter: InverterData | None = None
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            update_interval=(
+                timedelta(seconds=DEFAULT_SCAN_INTERVAL) if primary else None
+            ),
         )
         # The base class may reset config_entry from context; keep ours.
         self.config_entry = config_entry
 
-    def _create_inverter(self) -> InverterData:
-        """Create the InverterData client (blocking: opens a socket)."""
-        return InverterData(
+    async def _async_create_inverter(self) -> InverterData:
+        """Create and connect the InverterData client.
+
+        Also detects the register profile if the entry has none.
+        """
+        inverter = InverterData(
             host=self._host,
             port=self._port,
             serial=self.serial,
             hass=self.hass,
             config_entry=self.config_entry,
+            profile=self.profile,
+            slave_id=self.slave_id,
+        )
+        try:
+            await inverter.connect()
+        except Exception:
+            # Give back its share of the logger's connection
+            await inverter.close()
+            raise
+        if CONF_PROFILE not in self.config_entry.data:
+            try:
+                self.profile = await inverter.detect_profile()
+                self._profile_detected = True
+            except Exception as e:
+                _LOGGER.warning(
+                    "Could not read the device type, using register profile %s: %s",
+                    self.profile,
+                    e,
+                )
+        await self._async_restore_identity(inverter)
+        await self._async_restore_link(inverter)
+        return inverter
+
+    async def _async_restore_link(self, inverter: InverterData) -> None:
+        """Start the inverter with the link timing learned by an earlier run."""
+        if self._link_store is None:
+            return
+        try:
+            stored = await self._link_store.async_load()
+        except Exception as e:
+            _LOGGER.debug("Could not load the stored link timing: %s", e)
+            return
+        if stored:
+            inverter.seed_link(stored)
+        self._link_saved = time.monotonic()
+
+    def _schedule_link_save(self) -> None:
+        """Save the learned link timing every LINK_SAVE_INTERVAL seconds.
+
+        The store writes it on Home Assistant stop as well.
+        """
+        assert self.inverter is not None
+        now = time.monotonic()
+        if (
+            self._link_store is not None
+            and now - self._link_saved >= LINK_SAVE_INTERVAL
+        ):
+            self._link_saved = now
+            self._link_store.async_delay_save(self.inverter.link_state)
+
+    async def _async_restore_identity(self, inverter: InverterData) -> None:
+        """Seed the inverter with the identity, unsupported blocks and read
+        map stored by an earlier run."""
+        try:
+            stored = await self._identity_store.async_load()
+        except Exception as e:
+            _LOGGER.debug("Could not load the stored inverter identity: %s", e)
+            return
+        if not stored or stored.get("profile") != self.profile:
+            return
+        registers = {int(reg): int(word) for reg, word in stored["registers"]}
+        if inverter.seed_identity(registers, float(stored.get("read_at", 0.0))):
+            self._identity = registers
+        self._unsupported = {
+            (int(first), int(last)): float(found_at)
+            for first, last, found_at in stored.get("unsupported", ())
+        }
+        inverter.seed_unsupported(self._unsupported)
+        read_map = stored.get("read_map") or {}
+        self._read_map = ReadMap(
+            frozenset(int(reg) for reg in read_map.get("unreadable", ())),
+            frozenset(int(reg) for reg in read_map.get("splits", ())),
+            float(read_map.get("found_at", 0.0)),
+        )
+        if self._read_map != ReadMap():
+            inverter.seed_read_map(self._read_map)
+
+    async def _async_store_identity(self, data: Mapping[str, Any]) -> None:
+        """Save the identity registers, unsupported blocks and read map when
+        they differ from the stored ones."""
+        assert self.inverter is not None
+        self.device_identity = _device_identity(data) or self.device_identity
+        identity = self.inverter.identity or self._identity
+        unsupported = self.inverter.unsupported_blocks
+        read_map = self.inverter.read_map
+        if (
+            identity == self._identity
+            and unsupported == self._unsupported
+            and read_map == self._read_map
+        ):
+            return
+        changed = self._identity is not None and identity != self._identity
+        self._identity = identity
+        self._unsupported = unsupported
+        self._read_map = read_map
+        await self._identity_store.async_save(
+            {
+                "profile": self.profile,
+                "registers": sorted((identity or {}).items()),
+                "read_at": self.inverter.identity_read_at(),
+                "unsupported": [
+                    [first, last, found_at]
+                    for (first, last), found_at in sorted(unsupported.items())
+                ],
+                "read_map": {
+                    "unreadable": sorted(read_map.unreadable),
+                    "splits": sorted(read_map.splits),
+                    "found_at": read_map.found_at,
+                },
+            }
+        )
+        if changed:
+            # New firmware: the device was registered with the old version
+            _LOGGER.info(
+                "Inverter %s identity changed: %s", self.unit_id, self.device_identity
+            )
+            registry = dr.async_get(self.hass)
+            device = registry.async_get_device(identifiers={(DOMAIN, self.unit_id)})
+            if device is not None:
+                registry.async_update_device(device.id, **self.device_identity)
+
+    def _store_profile(self) -> None:
+        """Save the detected profile, so later startups skip the probe."""
+        self.hass.config_entries.async_update_entry(
+            self.config_entry,
+            data={**self.config_entry.data, CONF_PROFILE: self.profile},
         )
+        self._profile_detected = False
 
-    async def _async_update_data(self) -> Dict[str, Any]:
+    async def _async_update_data(self) -> Mapping[str, Any]:
         """
         Periodic call: fetch data and handle errors.
         Returns last known data on failure to avoid sensor 'unavailable'.
         """
+        if not self.followers:
+            return await self._async_update_unit()
+        # All units poll at once; their requests take turns on the shared
+        # connection, so a slow unit delays the others by one request at
+        # a time rather than by a whole poll
+        results = await asyncio.gather(
+            self._async_update_unit(),
+            *(follower.async_refresh() for follower in self.followers),
+            return_exceptions=True,
+        )
+        own = results[0]
+        self.site_data = self._site_sums(
+            [
+                self._last_known_data,
+                *(follower.data or {} for follower in self.followers),
+            ]
+        )
+        if isinstance(own, BaseException):
+            raise own
+        return own
+
+    def _site_sums(self, units: List[Mapping[str, Any]]) -> Dict[str, float]:
+        """Sum of each power and energy metric over the units.
+
+        A metric missing on any unit has no sum: a partial one would show
+        as a drop, and as a reset of the energy totals.
+        """
+        sums: Dict[str, float] = {}
+        for title in site_metrics(self.profile):
+            total = 0.0
+            for data in units:
+                value = data.get(title)
+                if not isinstance(value, (int, float)):
+                    break
+                total += value
+            else:
+                sums[title] = round(total, 3)
+        return sums
+
+    async def _async_update_unit(self) -> Mapping[str, Any]:
+        """Poll this coordinator's unit."""
         if self.inverter is None:
             try:
-                self.inverter = await self.hass.async_add_executor_job(
-                    self._create_inverter
-                )
+                self.inverter = await self._async_create_inverter()
             except NoSocketAvailableError as e:
                 _LOGGER.warning("Inverter unreachable: %s", e)
+                self.changed_metrics = set()
                 if self._last_known_data:
                     return self._last_known_data
                 raise UpdateFailed(f"Inverter unreachable: {e}")
+            if self._profile_detected and self.unit_id == self.serial:
+                self._store_profile()
 
         try:
-            data = await self.inverter.fetch_data()
+            data = await self.inverter.fetch_data(budget=DEFAULT_POLL_BUDGET)
             self._last_known_data = data
-            return data
+            self.changed_metrics = self.inverter.changed_metrics
+            self._fire_alert_events()
         except Exception as err:
             _LOGGER.warning("Modbus read failed, using last known data: %s", err)
+            self.changed_metrics = set()
             if self._last_known_data:
                 return self._last_known_data
             raise UpdateFailed("Initial Modbus read failed with no backup: %s" % err)
+        await self._async_store_identity(data)
+        self._schedule_link_save()
+        return data
+
+    @property
+    def link_stats(self) -> Optional[LinkStats]:
+        """Request statistics of the link to the logger, once connected."""
+        return None if self.inverter is None else self.inverter.stats
+
+    def _fire_alert_events(self) -> None:
+        """Fire one event per alert bit raised or cleared in the last read."""
+        assert self.inverter is not None
+        for bit, raised in self.inverter.alert_transitions:
+            _LOGGER.info(
+                "Inverter %s %s %s: %s",
+                bit.severity,
+                bit.code,
+                "raised" if raised else "cleared",
+                bit.description,
+            )
+            self.hass.bus.async_fire(
+                EVENT_ALERT,
+                {
+                    "serial": self.serial,
+                    "slave_id": self.slave_id,
+                    "code": bit.code,
+                    "description": bit.description,
+                    "severity": bit.severity,
+                    "active": raised,
+                },
+            )
+
+    async def async_shutdown(self) -> None:
+        """Stop updating and close the connection to the logger."""
+        await super().async_shutdown()
+        for follower in self.followers:
+            await follower.async_shutdown()
+        if self.inverter is not None:
+            if self._link_store is not None:
+                await self._link_store.async_save(self.inverter.link_state())
+            await self.inverter.close()
+            self.inverter = None
+
+
+def _device_identity(data: Mapping[str, Any]) -> Dict[str, str]:
+    """Device registry fields from the identity metrics."""
+    identity: Dict[str, str] = {}
+    inverter_id = data.get("Inverter ID")
+    if inverter_id:
+        identity["serial_number"] = str(inverter_id)
+    control = data.get("Control Board Version No.")
+    communication = data.get("Communication Board Version No.")
+    if isinstance(control, (int, float)) and isinstance(communication, (int, float)):
+        # Control board / communication board firmware, as shown by Deye
+        identity["sw_version"] = f"{int(control):04X}/{int(communication):04X}"
+    return identity
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -19,11 +19,13 @@ from homeassistant.const import (
     UnitOfFrequency,
     UnitOfPower,
     UnitOfTemperature,
+    UnitOfTime,
 )
 from homeassistant.util import slugify
 
-from .const import REGISTER_BLOCKS
-from .InverterDataParser import _DEFINITIONS
+from .InverterDataParser import load_compiled_definitions
+from .LinkStats import LinkStats
+from .profiles import DEFAULT_PROFILE
 
 _UNIT_METADATA: Dict[str, Dict[str, Any]] = {
     "w": {
@@ -71,55 +73,121 @@ class DeyeSensorDescription(SensorEntityDescription):
     metric_title: str = ""
 
 
-def _registers_in_read_range(registers: Sequence[str]) -> bool:
-    """True if every register of the item is covered by the read blocks."""
-    if not registers:
-        return False
-    try:
-        regs = [int(r, 16) for r in registers]
-    except (TypeError, ValueError):
-        return False
-    return all(any(start <= r <= end for start, end in REGISTER_BLOCKS) for r in regs)
-
+@dataclass(frozen=True, kw_only=True)
+class DeyeLinkSensorDescription(SensorEntityDescription):
+    """Sensor description of a statistic of the link to the logger."""
+
+    value_fn: Callable[[LinkStats], Optional[float]]
+
+
+def _milliseconds(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000)
+
+
+def _percent(ratio: Optional[float]) -> Optional[float]:
+    return None if ratio is None else round(ratio * 100, 1)
+
+
+# Link quality, to find slow or flaky loggers; disabled until needed
+LINK_SENSOR_DESCRIPTIONS: Tuple[DeyeLinkSensorDescription, ...] = (
+    DeyeLinkSensorDescription(
+        key="link_latency_p50",
+        name="Link Latency p50",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: _milliseconds(stats.link.latency.quantile(0.5)),
+    ),
+    DeyeLinkSensorDescription(
+        key="link_latency_p95",
+        name="Link Latency p95",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: _milliseconds(stats.link.latency.quantile(0.95)),
+    ),
+    DeyeLinkSensorDescription(
+        key="link_success_ratio",
+        name="Link Success Ratio",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=PERCENTAGE,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: _percent(stats.success_ratio),
+    ),
+    DeyeLinkSensorDescription(
+        key="last_update_duration",
+        name="Last Update Duration",
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda stats: (
+            None if stats.last_cycle is None else round(stats.last_cycle, 2)
+        ),
+    ),
+)
 
-def build_descriptions() -> List[DeyeSensorDescription]:
-    """Build one sensor description per usable DYRealTime.txt item."""
-    sections: Sequence[Dict[str, Any]] = (
-        list(_DEFINITIONS.values())
-        if isinstance(_DEFINITIONS, dict)
-        else _DEFINITIONS  # type: ignore[assignment]
-    )
 
+# Units whose values add up across parallel inverters: power and energy
+_ADDITIVE_UNITS = ("w", "kwh")
+
+
+def site_metrics(profile: str = DEFAULT_PROFILE) -> List[str]:
+    """Titles of the metrics summed over the units of a site."""
+    return [
+        title
+        for title, unit in load_compiled_definitions(profile).sensors
+        if unit.strip().lower() in _ADDITIVE_UNITS
+    ]
+
+
+def build_site_descriptions(
+    profile: str = DEFAULT_PROFILE,
+) -> List[DeyeSensorDescription]:
+    """One sensor description per site sum, named "Site <metric>"."""
+    summed = set(site_metrics(profile))
+    return [
+        DeyeSensorDescription(
+            key=f"site_{description.key}",
+            name=f"Site {description.name}",
+            metric_title=description.metric_title,
+            device_class=description.device_class,
+            state_class=description.state_class,
+            native_unit_of_measurement=description.native_unit_of_measurement,
+        )
+        for description in build_descriptions(profile)
+        if description.metric_title in summed
+    ]
+
+
+def build_descriptions(profile: str = DEFAULT_PROFILE) -> List[DeyeSensorDescription]:
+    """Build one sensor description per usable item of the profile's map."""
     descriptions: List[DeyeSensorDescription] = []
-    seen: set[str] = set()
-
-    for section in sections:
-        for item in section.get("items", []):
-            title = item.get("titleEN")
-            if not title or title in seen:
-                continue
-            if not _registers_in_read_range(item.get("registers", [])):
-                continue
-            seen.add(title)
-
-            unit = str(item.get("unit") or "").strip().lower()
-            meta = _UNIT_METADATA.get(unit)
-
-            # Unit-less metrics are statuses, device info, or bitfields
-            category: Optional[EntityCategory] = (
-                EntityCategory.DIAGNOSTIC if meta is None else None
-            )
 
-            descriptions.append(
-                DeyeSensorDescription(
-                    key=slugify(title),
-                    name=title,
-                    metric_title=title,
-                    device_class=meta["device_class"] if meta else None,
-                    state_class=meta["state_class"] if meta else None,
-                    native_unit_of_measurement=meta["unit"] if meta else None,
-                    entity_category=category,
-                )
+    for title, unit in load_compiled_definitions(profile).sensors:
+        meta = _UNIT_METADATA.get(unit.strip().lower())
+
+        # Unit-less metrics are statuses, device info, or bitfields
+        category: Optional[EntityCategory] = (
+            EntityCategory.DIAGNOSTIC if meta is None else None
+        )
+
+        descriptions.append(
+            DeyeSensorDescription(
+                key=slugify(title),
+                name=title,
+                metric_title=title,
+                device_class=meta["device_class"] if meta else None,
+                state_class=meta["state_class"] if meta else None,
+                native_unit_of_measurement=meta["unit"] if meta else None,
+                entity_category=category,
             )
+        )
 
     return descriptions
@@ -0,0 +1,117 @@
+"""Register profiles: the register map and read blocks of each inverter model."""
+
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .const import CORE_REGISTER_BLOCKS, OPTIONAL_REGISTER_BLOCKS
+
+_LOGGER = logging.getLogger(__name__)
+
+Blocks = Tuple[Tuple[int, int], ...]
+
+
+class PollTier(NamedTuple):
+    """Registers that are read less often than every update."""
+
+    name: str
+    # Seconds between reads; None reads once per connection
+    interval: Optional[float]
+    registers: Blocks
+
+
+class RegisterProfile(NamedTuple):
+    """One inverter family: its definitions file and register blocks."""
+
+    name: str
+    description: str
+    # Definitions file shipped in the package
+    definitions: str
+    # As in const.py: core blocks must be read, optional ones are best-effort
+    core_blocks: Blocks
+    optional_blocks: Blocks
+    # First of the six alert registers (see AlertDecoder), if any
+    alert_register: Optional[int] = None
+    # Slower polling tiers; every other register is read on each update
+    tiers: Tuple[PollTier, ...] = ()
+    # Inverter ID and board versions, cached across restarts
+    identity_block: Optional[Tuple[int, int]] = None
+
+    @property
+    def blocks(self) -> Blocks:
+        """All blocks, in the order of the flat register list."""
+        return self.core_blocks + self.optional_blocks
+
+    @property
+    def register_space(self) -> int:
+        """Size of a RegisterImage covering every block."""
+        return max(end for _, end in self.blocks) + 1
+
+
+DEFAULT_PROFILE = "hybrid_single_phase"
+
+# Inverter ID (0x0003-0x0007) and board versions (0x000D-0x000E): they
+# only change with a firmware update, so they are read once per connection.
+# Counters are not tiered: they share their requests with the status, PV
+# and alert registers, so skipping them would not save a round trip.
+IDENTITY_BLOCK = (0x0003, 0x000E)
+_IDENTITY_TIER = PollTier("identity", None, (IDENTITY_BLOCK,))
+
+PROFILES: Dict[str, RegisterProfile] = {
+    profile.name: profile
+    for profile in (
+        RegisterProfile(
+            name="hybrid_single_phase",
+            description="Single-phase hybrid (SUN-SG01LP1/SG03LP1)",
+            definitions="DYRealTime.txt",
+            core_blocks=tuple(CORE_REGISTER_BLOCKS),
+            optional_blocks=tuple(OPTIONAL_REGISTER_BLOCKS),
+            alert_register=0x0065,
+            tiers=(_IDENTITY_TIER, PollTier("settings", 300, ((0x00F4, 0x00F8),))),
+            identity_block=IDENTITY_BLOCK,
+        ),
+        RegisterProfile(
+            name="hybrid_three_phase",
+            description="Three-phase hybrid (SUN-SG04LP3/SG01HP3)",
+            definitions="DYRealTime3P.txt",
+            core_blocks=(
+                (0x01F4, 0x0230),  # status, energy counters, alerts
+                (0x024A, 0x02A7),  # battery, grid, load, PV real-time values
+            ),
+            optional_blocks=((0x0003, 0x000E),),  # device info
+            alert_register=0x0229,
+            tiers=(_IDENTITY_TIER,),
+            identity_block=IDENTITY_BLOCK,
+        ),
+    )
+}
+
+# Register 0x0000 holds the device type on every Deye model
+DEVICE_TYPE_REGISTER = 0x0000
+_DEVICE_TYPES: Dict[int, str] = {
+    0x0003: "hybrid_single_phase",
+    0x0005: "hybrid_three_phase",  # low-voltage battery
+    0x0006: "hybrid_three_phase",  # high-voltage battery
+}
+
+
+def get_profile(name: Optional[str]) -> RegisterProfile:
+    """The profile called name; the default one for None or unknown names."""
+    profile = PROFILES.get(name) if name else None
+    if profile is None:
+        if name:
+            _LOGGER.warning("Unknown register profile %r, using the default", name)
+        profile = PROFILES[DEFAULT_PROFILE]
+    return profile
+
+
+def profile_for_device_type(device_type: int) -> str:
+    """Name of the profile for the value of the device type register."""
+    name = _DEVICE_TYPES.get(device_type)
+    if name is None:
+        _LOGGER.warning(
+            "No register profile for device type 0x%04X, using %s",
+            device_type,
+            DEFAULT_PROFILE,
+        )
+        name = DEFAULT_PROFILE
+    return name
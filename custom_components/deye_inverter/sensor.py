@@ -9,29 +9,51 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import PERCENTAGE, UnitOfPower
+from homeassistant.core import callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import DeyeDataUpdateCoordinator
-from .entity_descriptions import DeyeSensorDescription, build_descriptions
+from .entity_descriptions import (
+    LINK_SENSOR_DESCRIPTIONS,
+    DeyeLinkSensorDescription,
+    DeyeSensorDescription,
+    build_descriptions,
+    build_site_descriptions,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 ATTRIBUTION = "Data provided by Deye inverter via Modbus TCP"
 
 
+def _unit_id(coordinator: DeyeDataUpdateCoordinator) -> str:
+    """The serial for the first unit, serial_slave for parallel units."""
+    serial = getattr(coordinator, "serial", "unknown")
+    return getattr(coordinator, "unit_id", None) or serial
+
+
 def _inverter_device_info(coordinator: DeyeDataUpdateCoordinator) -> DeviceInfo:
     """Device info shared by all entities of one inverter."""
     serial = getattr(coordinator, "serial", "unknown")
-    return DeviceInfo(
-        identifiers={(DOMAIN, serial)},
+    unit_id = _unit_id(coordinator)
+    # Read from the inverter, or from the identity cache until then
+    identity = getattr(coordinator, "device_identity", None) or {}
+    info = DeviceInfo(
+        identifiers={(DOMAIN, unit_id)},
         name=f"Deye Inverter {serial}",
         manufacturer="Deye",
         model="Hybrid Inverter",
-        sw_version="1.0.0",
+        sw_version=identity.get("sw_version"),
+        serial_number=identity.get("serial_number"),
     )
+    if unit_id != serial:
+        # A parallel unit: a sub-device of the first one
+        info["name"] = f"Deye Inverter {serial} unit {coordinator.slave_id}"
+        info["via_device"] = (DOMAIN, serial)
+    return info
 
 
 async def async_setup_entry(
@@ -44,8 +66,23 @@ async def async_setup_entry(
         entities.append(DeyeProductionPercentSensor(coordinator))
     entities.extend(
         DeyeMetricSensor(coordinator, description)
-        for description in build_descriptions()
+        for description in build_descriptions(coordinator.profile)
     )
+    for unit in [coordinator, *coordinator.followers]:
+        if unit is not coordinator:
+            entities.extend(
+                DeyeMetricSensor(unit, description)
+                for description in build_descriptions(unit.profile)
+            )
+        entities.extend(
+            DeyeLinkSensor(unit, description)
+            for description in LINK_SENSOR_DESCRIPTIONS
+        )
+    if coordinator.followers:
+        entities.extend(
+            DeyeSiteSensor(coordinator, description)
+            for description in build_site_descriptions(coordinator.profile)
+        )
     async_add_entities(entities, update_before_add=False)
 
 
@@ -140,8 +177,22 @@ class DeyeMetricSensor(CoordinatorEntity[DeyeDataUpdateCoordinator], SensorEntit
         """Initialize the metric sensor from its description."""
         super().__init__(coordinator)
         self.entity_description = description
-        serial = getattr(coordinator, "serial", "unknown")
-        self._attr_unique_id = f"{serial}_{description.key}"
+        self._attr_unique_id = f"{_unit_id(coordinator)}_{description.key}"
+        self._written_available: Optional[bool] = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this metric or its availability changed."""
+        available = self.available
+        changed = getattr(self.coordinator, "changed_metrics", None)
+        if (
+            changed is not None
+            and available == self._written_available
+            and self.entity_description.metric_title not in changed
+        ):
+            return
+        self._written_available = available
+        super()._handle_coordinator_update()
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -161,3 +212,72 @@ class DeyeMetricSensor(CoordinatorEntity[DeyeDataUpdateCoordinator], SensorEntit
         """Return the parsed value for this metric, or None if missing."""
         data = self.coordinator.data or {}
         return data.get(self.entity_description.metric_title)
+
+
+class DeyeLinkSensor(CoordinatorEntity[DeyeDataUpdateCoordinator], SensorEntity):
+    """Diagnostic statistic of the link to the datalogger."""
+
+    _attr_has_entity_name = True
+    entity_description: DeyeLinkSensorDescription
+
+    def __init__(
+        self,
+        coordinator: DeyeDataUpdateCoordinator,
+        description: DeyeLinkSensorDescription,
+    ) -> None:
+        """Initialize the link sensor from its description."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{_unit_id(coordinator)}_{description.key}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info for the Deye inverter."""
+        return _inverter_device_info(self.coordinator)
+
+    @property
+    def available(self) -> bool:
+        """Available once connected, also while updates fail."""
+        return getattr(self.coordinator, "link_stats", None) is not None
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the statistic, or None until there is data for it."""
+        stats = getattr(self.coordinator, "link_stats", None)
+        if stats is None:
+            return None
+        return self.entity_description.value_fn(stats)
+
+
+class DeyeSiteSensor(CoordinatorEntity[DeyeDataUpdateCoordinator], SensorEntity):
+    """A power or energy metric summed over the parallel units."""
+
+    _attr_has_entity_name = True
+    entity_description: DeyeSensorDescription
+
+    def __init__(
+        self,
+        coordinator: DeyeDataUpdateCoordinator,
+        description: DeyeSensorDescription,
+    ) -> None:
+        """Initialize the site sensor from its description."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{_unit_id(coordinator)}_{description.key}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info for the first inverter, which the site is on."""
+        return _inverter_device_info(self.coordinator)
+
+    @property
+    def available(self) -> bool:
+        """Available once every unit has reported the metric."""
+        if not super().available:
+            return False
+        return self.entity_description.metric_title in self.coordinator.site_data
+
+    @property
+    def native_value(self) -> Optional[float]:
+        """Return the sum, or None while a unit lacks the metric."""
+        return self.coordinator.site_data.get(self.entity_description.metric_title)
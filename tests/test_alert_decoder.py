@@ -0,0 +1,50 @@
+from custom_components.deye_inverter.AlertDecoder import AlertTracker
+
+
+def test_tracker_reports_only_transitions():
+    tracker = AlertTracker()
+    tracker.update([0] * 6)
+
+    raised = tracker.update([0x0001, 0, 0x0000, 0, 0, 0x8000])
+    assert [(bit.code, active) for bit, active in raised] == [
+        ("W01", True),
+        ("F64", True),
+    ]
+    assert raised[1][0].description == "Heatsink high temperature"
+    assert raised[1][0].register == 0x006A
+    assert set(tracker.active) == {"W01", "F64"}
+
+    # Nothing changed: no transitions
+    assert tracker.update([0x0001, 0, 0x0000, 0, 0, 0x8000]) == []
+
+    changed = tracker.update([0x0001, 0, 0x0041, 0, 0, 0x0000])
+    assert [(bit.code, active) for bit, active in changed] == [
+        ("F01", True),
+        ("F07", True),
+        ("F64", False),
+    ]
+    assert set(tracker.active) == {"W01", "F01", "F07"}
+    assert tracker.active["F01"].description == "Fault F01"
+
+
+def test_tracker_keeps_state_when_not_read():
+    tracker = AlertTracker()
+    tracker.update([0] * 6)
+    tracker.update([0, 0x0002, 0, 0, 0, 0])
+
+    assert tracker.update(None) == []
+    assert set(tracker.active) == {"W18"}
+    cleared = tracker.update([0] * 6)
+    assert [(bit.code, active) for bit, active in cleared] == [("W18", False)]
+
+
+def test_alerts_active_at_startup_are_not_reported():
+    tracker = AlertTracker()
+
+    assert tracker.update(None) == []
+    # First read: the state the inverter is already in, not new alerts
+    assert tracker.update([0x0001, 0, 0x0010, 0, 0, 0]) == []
+    assert set(tracker.active) == {"W01", "F05"}
+
+    cleared = tracker.update([0x0001, 0, 0, 0, 0, 0])
+    assert [(bit.code, active) for bit, active in cleared] == [("F05", False)]
@@ -3,17 +3,24 @@ from unittest.mock import MagicMock
 
 from custom_components.deye_inverter.sensor import (
     DeyeInverterSensor,
+    DeyeLinkSensor,
     DeyeMetricSensor,
     DeyeProductionPercentSensor,
+    DeyeSiteSensor,
     async_setup_entry,
 )
-from custom_components.deye_inverter.entity_descriptions import build_descriptions
+from custom_components.deye_inverter.entity_descriptions import (
+    LINK_SENSOR_DESCRIPTIONS,
+    build_descriptions,
+    build_site_descriptions,
+)
 from custom_components.deye_inverter.const import DOMAIN
+from custom_components.deye_inverter.profiles import DEFAULT_PROFILE
 
 
 @pytest.mark.asyncio
 async def test_async_setup_entry_adds_entities():
-    """Setup adds the aggregate sensor plus one entity per metric description."""
+    """Setup adds the aggregate sensor, one entity per metric and the link sensors."""
     hass = MagicMock()
     added = []
 
@@ -23,6 +30,7 @@ async def test_async_setup_entry_adds_entities():
     mock_coordinator = MagicMock()
     mock_coordinator.serial = "ABC123"
     mock_coordinator.installed_power = 5
+    mock_coordinator.followers = []
     hass.data = {
         DOMAIN: {
             "mock_entry_id": mock_coordinator
@@ -34,7 +42,32 @@ async def test_async_setup_entry_adds_entities():
 
     await async_setup_entry(hass, mock_entry, async_add_entities)
 
-    assert len(added) == 2 + len(build_descriptions())
+    metrics = len(build_descriptions())
+    assert len(added) == 2 + metrics + len(LINK_SENSOR_DESCRIPTIONS)
     assert isinstance(added[0], DeyeInverterSensor)
     assert isinstance(added[1], DeyeProductionPercentSensor)
-    assert all(isinstance(e, DeyeMetricSensor) for e in added[2:])
+    assert all(isinstance(e, DeyeMetricSensor) for e in added[2 : 2 + metrics])
+    assert all(isinstance(e, DeyeLinkSensor) for e in added[2 + metrics :])
+
+
+@pytest.mark.asyncio
+async def test_async_setup_entry_adds_parallel_units():
+    """Followers get metric and link sensors; the site sums go on the first."""
+    hass = MagicMock()
+    added = []
+    coordinator = MagicMock(serial="ABC123", installed_power=5)
+    coordinator.profile = DEFAULT_PROFILE
+    follower = MagicMock(serial="ABC123", unit_id="ABC123_2", profile=DEFAULT_PROFILE)
+    coordinator.followers = [follower]
+    hass.data = {DOMAIN: {"mock_entry_id": coordinator}}
+    entry = MagicMock(entry_id="mock_entry_id")
+
+    await async_setup_entry(hass, entry, lambda entities, **kwargs: added.extend(entities))
+
+    metrics = len(build_descriptions())
+    links = len(LINK_SENSOR_DESCRIPTIONS)
+    sites = [e for e in added if isinstance(e, DeyeSiteSensor)]
+    assert len(added) == 2 + 2 * (metrics + links) + len(sites)
+    assert len(sites) == len(build_site_descriptions()) > 0
+    assert all(e.coordinator is coordinator for e in sites)
+    assert sum(e.coordinator is follower for e in added) == metrics + links
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+from umodbus.exceptions import IllegalDataAddressError, ServerDeviceBusyError
+
+from custom_components.deye_inverter.BlockHealth import (
+    MAX_RETRY_DELAY,
+    RETRY_DELAY,
+    UNSUPPORTED_RETRY,
+    BlockHealth,
+)
+
+BLOCK = (0x00F4, 0x00F8)
+
+
+def test_failures_back_off_exponentially():
+    health = BlockHealth()
+    assert health.should_read(BLOCK, 0.0)
+
+    assert not health.failed(BLOCK, TimeoutError(), 0.0)
+    assert not health.should_read(BLOCK, RETRY_DELAY - 1)
+    assert health.should_read(BLOCK, RETRY_DELAY)
+
+    health.failed(BLOCK, ServerDeviceBusyError(), 100.0)
+    assert not health.should_read(BLOCK, 100.0 + 2 * RETRY_DELAY - 1)
+    assert health.should_read(BLOCK, 100.0 + 2 * RETRY_DELAY)
+
+    for _ in range(20):
+        health.failed(BLOCK, TimeoutError(), 200.0)
+    assert health.should_read(BLOCK, 200.0 + MAX_RETRY_DELAY)
+
+    health.succeeded(BLOCK)
+    assert health.should_read(BLOCK, 200.0)
+
+
+def test_reconnect_retries_only_transient_failures():
+    health = BlockHealth()
+    other = (0x0003, 0x000E)
+    health.failed(other, TimeoutError(), 0.0)
+    with patch("custom_components.deye_inverter.BlockHealth.time") as clock:
+        clock.time.return_value = 5000.0
+        assert not health.failed(BLOCK, IllegalDataAddressError(), 0.0)
+        assert health.failed(BLOCK, IllegalDataAddressError(), 1.0)
+        assert not health.failed(BLOCK, IllegalDataAddressError(), 2.0)
+    assert health.unsupported == {BLOCK: 5000.0}
+
+    health.reconnected()
+    assert health.should_read(other, 3.0)
+    assert not health.should_read(BLOCK, 3.0)
+    assert health.should_read(BLOCK, 2.0 + UNSUPPORTED_RETRY)
+
+
+def test_timeout_between_illegal_addresses_is_not_deterministic():
+    health = BlockHealth()
+    health.failed(BLOCK, IllegalDataAddressError(), 0.0)
+    health.failed(BLOCK, TimeoutError(), 1.0)
+    health.failed(BLOCK, IllegalDataAddressError(), 2.0)
+    assert health.unsupported == {}
+
+
+def test_restore_expires_old_verdicts():
+    health = BlockHealth()
+    other = (0x0003, 0x000E)
+    with patch("custom_components.deye_inverter.BlockHealth.time") as clock:
+        clock.time.return_value = 100000.0
+        health.restore({BLOCK: 99000.0, other: 100000.0 - UNSUPPORTED_RETRY}, 10.0)
+
+    assert health.unsupported == {BLOCK: 99000.0}
+    assert not health.should_read(BLOCK, 10.0)
+    assert health.should_read(BLOCK, 10.0 + UNSUPPORTED_RETRY - 1000.0)
+    assert health.should_read(other, 10.0)
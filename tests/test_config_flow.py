@@ -1,11 +1,15 @@
 from unittest.mock import patch
 
+import pytest
+
 from custom_components.deye_inverter.const import (
     DOMAIN,
     CONF_HOST,
     CONF_PORT,
     CONF_SERIAL,
     CONF_INSTALLED_POWER,
+    CONF_PROFILE,
+    CONF_SLAVE_IDS,
 )
 
 USER_INPUT = {
@@ -30,7 +34,8 @@ async def test_show_config_form(hass):
 async def test_create_entry_from_user_input(hass):
     """A successful connection test creates the entry."""
     with patch(
-        "custom_components.deye_inverter.config_flow.test_connection"
+        "custom_components.deye_inverter.config_flow.test_connection",
+        return_value=0x0005,  # three-phase hybrid
     ) as mock_test:
         result = await hass.config_entries.flow.async_init(
             DOMAIN,
@@ -40,8 +45,8 @@ async def test_create_entry_from_user_input(hass):
 
     assert result["type"] == "create_entry"
     assert result["title"] == "123456789"
-    assert result["data"] == USER_INPUT
-    mock_test.assert_called_once_with("192.168.1.100", 8899, "123456789")
+    assert result["data"] == {**USER_INPUT, CONF_PROFILE: "hybrid_three_phase"}
+    mock_test.assert_called_once_with("192.168.1.100", 8899, "123456789", 1)
 
 
 async def test_cannot_connect_shows_error(hass):
@@ -90,3 +95,36 @@ async def test_duplicate_serial_aborts(hass):
 
     assert second["type"] == "abort"
     assert second["reason"] == "already_configured"
+
+
+async def test_parallel_units_are_tested_and_stored(hass):
+    """Every slave ID is probed; the entry keeps them as a list."""
+    with patch(
+        "custom_components.deye_inverter.config_flow.test_connection",
+        return_value=0x0005,
+    ) as mock_test:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": "user"},
+            data={**USER_INPUT, CONF_SLAVE_IDS: "1, 2,3"},
+        )
+
+    assert result["type"] == "create_entry"
+    assert result["data"][CONF_SLAVE_IDS] == [1, 2, 3]
+    assert [call.args[3] for call in mock_test.call_args_list] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("slave_ids", ["1,1", "0", "1,x", "248", ""])
+async def test_invalid_slave_ids_show_error(hass, slave_ids):
+    """Duplicate or out-of-range slave IDs are rejected before connecting."""
+    with patch(
+        "custom_components.deye_inverter.config_flow.test_connection"
+    ) as mock_test:
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": "user"},
+            data={**USER_INPUT, CONF_SLAVE_IDS: slave_ids},
+        )
+
+    assert result["errors"] == {CONF_SLAVE_IDS: "invalid_slave_ids"}
+    mock_test.assert_not_called()
@@ -3,7 +3,9 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import UpdateFailed
 
+from custom_components.deye_inverter.const import DEFAULT_POLL_BUDGET
 from custom_components.deye_inverter.coordinator import DeyeDataUpdateCoordinator
+from custom_components.deye_inverter.ReadPlanner import ReadMap
 
 
 class MockConfigEntry:
@@ -16,10 +18,8 @@ class MockConfigEntry:
 @pytest.fixture
 def mock_hass():
     hass = MagicMock(spec=HomeAssistant)
-    # Run executor jobs inline so lazy inverter creation works in tests
-    hass.async_add_executor_job = AsyncMock(
-        side_effect=lambda func, *args: func(*args)
-    )
+    # Run executor jobs inline
+    hass.async_add_executor_job = AsyncMock(side_effect=lambda func, *args: func(*args))
     return hass
 
 
@@ -32,10 +32,36 @@ def mock_config_entry():
             "port": 502,
             "serial": "ABC123",
             "installed_power": 5000,
-        }
+            "profile": "hybrid_single_phase",
+        },
     )
 
 
+@pytest.fixture(autouse=True)
+def stores():
+    """Storage by key prefix, empty unless a test fills it."""
+    stores = {}
+    for key in ("deye_inverter.identity", "deye_inverter.link"):
+        store = stores[key] = MagicMock()
+        store.async_load = AsyncMock(return_value=None)
+        store.async_save = AsyncMock()
+    with patch(
+        "custom_components.deye_inverter.coordinator.Store",
+        side_effect=lambda hass, version, key: stores[key.rsplit(".", 1)[0]],
+    ):
+        yield stores
+
+
+@pytest.fixture
+def identity_store(stores):
+    return stores["deye_inverter.identity"]
+
+
+@pytest.fixture
+def link_store(stores):
+    return stores["deye_inverter.link"]
+
+
 @pytest.fixture
 def mock_inverter_data():
     mock = AsyncMock()
@@ -43,12 +69,19 @@ def mock_inverter_data():
         0x00BA: 500,
         0x00BB: 300,
     }
+    mock.identity = {}
+    mock.unsupported_blocks = {}
+    mock.read_map = ReadMap()
+    mock.link_state = MagicMock(return_value={"srtt": 0.2})
+    mock.seed_link = MagicMock()
     return mock
 
 
 @patch("custom_components.deye_inverter.coordinator.InverterData")
 @pytest.mark.asyncio
-async def test_update_success(mock_inverter_class, mock_hass, mock_config_entry, mock_inverter_data):
+async def test_update_success(
+    mock_inverter_class, mock_hass, mock_config_entry, mock_inverter_data
+):
     """Test successful data update."""
     mock_inverter_class.return_value = mock_inverter_data
 
@@ -60,12 +93,15 @@ async def test_update_success(mock_inverter_class, mock_hass, mock_config_entry,
 
     data = await coordinator._async_update_data()
     assert data == {0x00BA: 500, 0x00BB: 300}
-    mock_inverter_data.fetch_data.assert_awaited_once()
+    mock_inverter_data.fetch_data.assert_awaited_once_with(budget=DEFAULT_POLL_BUDGET)
+    assert coordinator.changed_metrics is mock_inverter_data.changed_metrics
 
 
 @patch("custom_components.deye_inverter.coordinator.InverterData")
 @pytest.mark.asyncio
-async def test_update_failure_no_cache(mock_inverter_class, mock_hass, mock_config_entry):
+async def test_update_failure_no_cache(
+    mock_inverter_class, mock_hass, mock_config_entry
+):
     """Test that UpdateFailed is raised if no cache is available on failure."""
     mock_inverter = AsyncMock()
     mock_inverter.fetch_data.side_effect = Exception("connection error")
@@ -83,7 +119,9 @@ async def test_update_failure_no_cache(mock_inverter_class, mock_hass, mock_conf
 
 @patch("custom_components.deye_inverter.coordinator.InverterData")
 @pytest.mark.asyncio
-async def test_update_failure_with_cache(mock_inverter_class, mock_hass, mock_config_entry):
+async def test_update_failure_with_cache(
+    mock_inverter_class, mock_hass, mock_config_entry
+):
     """Test that last known data is returned on failure."""
     mock_inverter = AsyncMock()
     mock_inverter.fetch_data.side_effect = Exception("temporary failure")
@@ -96,9 +134,11 @@ async def test_update_failure_with_cache(mock_inverter_class, mock_hass, mock_co
     )
 
     coordinator._last_known_data = {"PV1 Power": 500}
+    coordinator.changed_metrics = {"PV1 Power"}
 
     result = await coordinator._async_update_data()
     assert result == {"PV1 Power": 500}
+    assert coordinator.changed_metrics == set()
 
 
 @patch("custom_components.deye_inverter.coordinator.InverterData")
@@ -141,3 +181,264 @@ async def test_unreachable_inverter_with_cache(
 
     result = await coordinator._async_update_data()
     assert result == {"PV1 Power": 500}
+
+
+@patch("custom_components.deye_inverter.coordinator.InverterData")
+@pytest.mark.asyncio
+async def test_update_fires_alert_events(
+    mock_inverter_class, mock_hass, mock_config_entry, mock_inverter_data
+):
+    """One event per alert bit raised or cleared in the read."""
+    from custom_components.deye_inverter.AlertDecoder import AlertTracker
+
+    tracker = AlertTracker()
+    tracker.update([0] * 6)
+    mock_inverter_data.alert_transitions = tracker.update([0, 0, 1 << 12, 0, 0, 0])
+    mock_inverter_class.return_value = mock_inverter_data
+    mock_hass.bus = MagicMock()
+
+    coordinator = DeyeDataUpdateCoordinator(
+        hass=mock_hass,
+        config_entry=mock_config_entry,
+        installed_power=5000,
+    )
+    await coordinator._async_update_data()
+
+    mock_hass.bus.async_fire.assert_called_once_with(
+        "deye_inverter_alert",
+        {
+            "serial": "ABC123",
+            "slave_id": 1,
+            "code": "F13",
+            "description": "Working mode change",
+            "severity": "fault",
+            "active": True,
+        },
+    )
+
+
+@patch("custom_components.deye_inverter.coordinator.InverterData")
+@pytest.mark.asyncio
+async def test_profile_detected_and_stored(mock_inverter_class, mock_hass):
+    """An entry without a profile gets it detected once and saved."""
+    entry = MockConfigEntry(
+        domain="deye_inverter",
+        data={"host": "192.168.1.100", "serial": "ABC123", "installed_power": 5},
+    )
+    mock_inverter = AsyncMock()
+    mock_inverter.detect_profile = AsyncMock(return_value="hybrid_three_phase")
+    mock_inverter.fetch_data.return_value = {}
+    mock_inverter.alert_transitions = []
+    mock_inverter.identity = {}
+    mock_inverter.unsupported_blocks = {}
+    mock_inverter.read_map = ReadMap()
+    mock_inverter.seed_link = MagicMock()
+    mock_inverter_class.return_value = mock_inverter
+    mock_hass.config_entries = MagicMock()
+
+    coordinator = DeyeDataUpdateCoordinator(
+        hass=mock_hass, config_entry=entry, installed_power=5
+    )
+    assert coordinator.profile == "hybrid_single_phase"
+    await coordinator._async_update_data()
+
+    assert coordinator.profile == "hybrid_three_phase"
+    mock_inverter.connect.assert_awaited_once()
+    mock_inverter.detect_profile.assert_awaited_once()
+    mock_hass.config_entries.async_update_entry.assert_called_once_with(
+        entry, data={**entry.data, "profile": "hybrid_three_phase"}
+    )
+
+
+@patch("custom_components.deye_inverter.coordinator.InverterData")
+@pytest.mark.asyncio
+async def test_connect_failure_retried_next_update(
+    mock_inverter_class, mock_hass, mock_config_entry, mock_inverter_data
+):
+    """A logger that refuses the connection is connected again next time."""
+    from pysolarmanv5 import NoSocketAvailableError
+
+    mock_inverter_data.connect.side_effect = [NoSocketAvailableError("refused"), None]
+    mock_inverter_class.return_value = mock_inverter_data
+
+    coordinator = DeyeDataUpdateCoordinator(
+        hass=mock_hass,
+        config_entry=mock_config_entry,
+        installed_power=5000,
+    )
+    with pytest.raises(UpdateFailed):
+        await coordinator._async_update_data()
+    assert coordinator.inverter is None
+
+    assert await coordinator._async_update_data() == {0x00BA: 500, 0x00BB: 300}
+    assert mock_inverter_data.connect.await_count == 2
+
+    await coordinator.async_shutdown()
+    # The client that failed to connect was closed as well
+    assert mock_inverter_data.close.await_count == 2
+    assert coordinator.inverter is None
+
+
+@patch("custom_components.deye_inverter.coordinator.InverterData")
+@pytest.mark.asyncio
+async def test_identity_restored_and_stored(
+    mock_inverter_class,
+    mock_hass,
+    mock_config_entry,
+    mock_inverter_data,
+    identity_store,
+):
+    """Stored identity seeds the inverter; a changed one is saved again."""
+    identity_store.async_load.return_value = {
+        "profile": "hybrid_single_phase",
+        "registers": [[0x0D, 0x3115], [0x0E, 0x1234]],
+        "read_at": 50.0,
+        "unsupported": [[0xF4, 0xF8, 40.0]],
+        "read_map": {"unreadable": [0xF6], "splits": [0xB0], "found_at": 45.0},
+    }
+    mock_inverter_data.read_map = ReadMap(frozenset({0xF6}), frozenset({0xB0}), 45.0)
+    mock_inverter_data.seed_read_map = MagicMock()
+    mock_inverter_data.seed_identity = MagicMock(return_value=True)
+    mock_inverter_data.seed_unsupported = MagicMock()
+    mock_inverter_data.unsupported_blocks = {(0xF4, 0xF8): 40.0}
+    mock_inverter_data.identity = {0x0D: 0x3115, 0x0E: 0x1234}
+    mock_inverter_data.identity_read_at = MagicMock(return_value=50.0)
+    mock_inverter_data.fetch_data.return_value = {
+        "Inverter ID": "2305131234",
+        "Control Board Version No.": 0x3115,
+        "Communication Board Version No.": 0x1234,
+    }
+    mock_inverter_class.return_value = mock_inverter_data
+
+    coordinator = DeyeDataUpdateCoordinator(
+        hass=mock_hass,
+        config_entry=mock_config_entry,
+        installed_power=5000,
+    )
+    await coordinator._async_update_data()
+
+    mock_inverter_data.seed_identity.assert_called_once_with(
+        {0x0D: 0x3115, 0x0E: 0x1234}, 50.0
+    )
+    mock_inverter_data.seed_unsupported.assert_called_once_with({(0xF4, 0xF8): 40.0})
+    mock_inverter_data.seed_read_map.assert_called_once_with(
+        ReadMap(frozenset({0xF6}), frozenset({0xB0}), 45.0)
+    )
+    identity_store.async_save.assert_not_awaited()  # unchanged
+    assert coordinator.device_identity == {
+        "serial_number": "2305131234",
+        "sw_version": "3115/1234",
+    }
+
+    # New firmware: stored again and pushed to the device registry
+    mock_inverter_data.identity = {0x0D: 0x3116, 0x0E: 0x1234}
+    mock_inverter_data.fetch_data.return_value = {
+        "Inverter ID": "2305131234",
+        "Control Board Version No.": 0x3116,
+        "Communication Board Version No.": 0x1234,
+    }
+    with patch(
+        "custom_components.deye_inverter.coordinator.dr.async_get"
+    ) as registry_get:
+        await coordinator._async_update_data()
+
+    identity_store.async_save.assert_awaited_once_with(
+        {
+            "profile": "hybrid_single_phase",
+            "registers": [(0x0D, 0x3116), (0x0E, 0x1234)],
+            "read_at": 50.0,
+            "unsupported": [[0xF4, 0xF8, 40.0]],
+            "read_map": {"unreadable": [0xF6], "splits": [0xB0], "found_at": 45.0},
+        }
+    )
+    registry = registry_get.return_value
+    registry.async_update_device.assert_called_once_with(
+        registry.async_get_device.return_value.id,
+        serial_number="2305131234",
+        sw_version="3116/1234",
+    )
+
+
+@patch("custom_components.deye_inverter.coordinator.InverterData")
+@pytest.mark.asyncio
+async def test_link_timing_restored_and_saved(
+    mock_inverter_class, mock_hass, mock_config_entry, mock_inverter_data, link_store
+):
+    """Learned link timing is restored at connect and saved periodically."""
+    link_store.async_load.return_value = {"srtt": 0.3, "pause": 0.0}
+    mock_inverter_class.return_value = mock_inverter_data
+
+    coordinator = DeyeDataUpdateCoordinator(
+        hass=mock_hass,
+        config_entry=mock_config_entry,
+        installed_power=5000,
+    )
+    with patch("custom_components.deye_inverter.coordinator.time") as clock:
+        clock.monotonic.return_value = 1000.0
+        await coordinator._async_update_data()
+        mock_inverter_data.seed_link.assert_called_once_with(
+            {"srtt": 0.3, "pause": 0.0}
+        )
+        link_store.async_delay_save.assert_not_called()
+
+        clock.monotonic.return_value = 1600.0
+        await coordinator._async_update_data()
+        link_store.async_delay_save.assert_called_once_with(
+            mock_inverter_data.link_state
+        )
+
+    await coordinator.async_shutdown()
+    link_store.async_save.assert_awaited_once_with({"srtt": 0.2})
+
+
+def _unit_inverter(data):
+    inverter = AsyncMock()
+    inverter.fetch_data.return_value = data
+    inverter.identity = {}
+    inverter.unsupported_blocks = {}
+    inverter.read_map = ReadMap()
+    inverter.link_state = MagicMock(return_value={})
+    inverter.seed_link = MagicMock()
+    return inverter
+
+
+@patch("custom_components.deye_inverter.coordinator.InverterData")
+@pytest.mark.asyncio
+async def test_parallel_units_polled_with_the_first(
+    mock_inverter_class, mock_hass, mock_config_entry
+):
+    """Followers poll with the first unit, and the site sums need every unit."""
+    mock_config_entry.data["slave_ids"] = [1, 3]
+    inverters = {
+        1: _unit_inverter({"PV1 Power": 500, "Battery SOC": 80}),
+        3: _unit_inverter({"PV1 Power": 700, "Battery SOC": 60}),
+    }
+    mock_inverter_class.side_effect = lambda **kwargs: inverters[kwargs["slave_id"]]
+
+    coordinator = DeyeDataUpdateCoordinator(
+        hass=mock_hass,
+        config_entry=mock_config_entry,
+        installed_power=5000,
+    )
+    (follower,) = coordinator.followers
+    assert (coordinator.unit_id, follower.unit_id) == ("ABC123", "ABC123_3")
+    assert follower.slave_id == 3
+    assert follower.update_interval is None
+    # The link timing belongs to the logger, saved by the first unit
+    assert follower._link_store is None
+    assert not follower.followers
+
+    data = await coordinator._async_update_data()
+    assert data["PV1 Power"] == 500
+    assert follower.data["PV1 Power"] == 700
+    # Power adds up across units, a state of charge does not
+    assert coordinator.site_data == {"PV1 Power": 1200}
+
+    # A unit without the metric: no sum rather than a partial one
+    inverters[3].fetch_data.return_value = {"Battery SOC": 60}
+    await coordinator._async_update_data()
+    assert coordinator.site_data == {}
+
+    await coordinator.async_shutdown()
+    inverters[1].close.assert_awaited_once()
+    inverters[3].close.assert_awaited_once()
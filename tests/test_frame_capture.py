@@ -0,0 +1,169 @@
+import asyncio
+import os
+import struct
+
+import pytest
+from umodbus.client.serial import rtu
+from umodbus.client.serial.redundancy_check import get_crc
+
+from custom_components.deye_inverter.FrameCapture import (
+    ERROR,
+    MAGIC,
+    Exchange,
+    RESPONSE,
+    TIMEOUT,
+    FrameCapture,
+    ReplayClient,
+    capture_files,
+    read_exchanges,
+    read_records,
+)
+from custom_components.deye_inverter.InverterData import InverterData
+
+
+def _response(request, value=1):
+    slave, _, _, quantity = struct.unpack(">BBHH", request[:6])
+    body = bytes([slave, 0x03, 2 * quantity])
+    body += struct.pack(f">{quantity}H", *([value] * quantity))
+    return body + get_crc(body)
+
+
+class FakeClient:
+    """Logger whose registers all hold value, answering after delay."""
+
+    def __init__(self, value=1, delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.writer = None
+        self.socket_timeout = 0.0
+
+    async def connect(self):
+        self.writer = object()
+
+    async def disconnect(self):
+        self.writer = None
+
+    async def send_raw_modbus_frame(self, frame):
+        await asyncio.sleep(self.delay)
+        return _response(frame, self.value)
+
+
+@pytest.mark.asyncio
+async def test_exchanges_are_captured_with_their_outcome(tmp_path):
+    path = str(tmp_path / "session.cap")
+    capture = FrameCapture(path)
+    client = FakeClient(delay=0.01)
+    request = rtu.read_holding_registers(1, 0x003B, 54)
+
+    frame = await capture.exchange(client.send_raw_modbus_frame, request)
+    client.delay = 1.0
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            capture.exchange(client.send_raw_modbus_frame, request), 0.01
+        )
+
+    async def refuse(request):
+        raise ConnectionResetError("reset by peer")
+
+    with pytest.raises(ConnectionResetError):
+        await capture.exchange(refuse, request)
+    capture.flush()
+
+    with open(path, "rb") as file:
+        assert file.read().startswith(MAGIC)
+    answered, timed_out, failed = read_exchanges(path)
+    assert answered.request == request
+    assert (answered.outcome, answered.data) == (RESPONSE, frame)
+    assert 0.01 <= answered.delay < 0.5
+    assert timed_out.outcome == TIMEOUT
+    assert (failed.outcome, failed.data) == (ERROR, b"reset by peer")
+
+
+def test_capture_rotates_by_size(tmp_path):
+    path = str(tmp_path / "session.cap")
+    capture = FrameCapture(path, max_bytes=100, backups=2)
+    for index in range(20):
+        capture.add(RESPONSE, bytes([index]) * 20)
+        capture.flush()
+
+    files = capture_files(path)
+    assert files == [f"{path}.2", f"{path}.1", path]
+    assert all(os.path.getsize(name) <= 100 for name in files)
+    # The oldest records were dropped with the oldest file
+    indexes = [record.data[0] for record in read_records(path)]
+    assert indexes == list(range(20 - len(indexes), 20))
+
+
+@pytest.mark.asyncio
+async def test_captured_session_replays_to_the_same_snapshots(tmp_path):
+    path = str(tmp_path / "session.cap")
+    live = InverterData("192.0.2.1", serial="1", client=FakeClient(value=7))
+    await live.connect()
+    live.start_capture(path)
+    captured = [dict(await live.fetch_data()) for _ in range(3)]
+    await live.close()
+
+    client = ReplayClient(read_exchanges(path), speed=0)
+    replayed = InverterData("192.0.2.1", serial="1", client=client)
+    await replayed.connect()
+    for snapshot in captured:
+        assert dict(await replayed.fetch_data()) == snapshot
+    assert client.remaining == 0
+    with pytest.raises(Exception, match="No captured exchange"):
+        await replayed.fetch_data()
+    await replayed.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_reproduces_timeouts_at_speed():
+    request = rtu.read_holding_registers(1, 0x003B, 54)
+    exchanges = [
+        Exchange(request, RESPONSE, _response(request), 0.2),
+        Exchange(request, TIMEOUT, b"", 0.4),
+    ]
+    client = ReplayClient(exchanges, speed=10)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await client.send_raw_modbus_frame(request) == _response(request)
+    with pytest.raises(TimeoutError):
+        await client.send_raw_modbus_frame(request)
+    assert 0.05 <= loop.time() - started < 0.5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("speed", [1, 2])
+async def test_replay_keeps_the_captured_timing_between_polls(tmp_path, speed):
+    path = str(tmp_path / "session.cap")
+    live = InverterData("192.0.2.1", serial="1", client=FakeClient(delay=0.02))
+    await live.connect()
+    live.start_capture(path)
+    await live.fetch_data()
+    await asyncio.sleep(0.4)
+    await live.fetch_data()
+    await live.close()
+    records = list(read_records(path))
+    captured = records[-1].time - records[0].time
+
+    client = ReplayClient(read_exchanges(path), speed=speed)
+    replayed = InverterData("192.0.2.1", serial="1", client=client)
+    await replayed.connect()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    while client.remaining:
+        await client.wait_next()
+        await replayed.fetch_data()
+    elapsed = loop.time() - started
+    await replayed.close()
+
+    assert captured > 0.4
+    assert elapsed == pytest.approx(captured / speed, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_replay_answers_register_reads():
+    request = rtu.read_holding_registers(1, 0x0000, 1)
+    client = ReplayClient([Exchange(request, RESPONSE, _response(request, 3), 0.0)])
+    assert await client.read_holding_registers(register_addr=0, quantity=1) == [3]
+    with pytest.raises(EOFError):
+        await client.read_holding_registers(register_addr=0, quantity=1)
@@ -8,6 +8,9 @@ from custom_components.deye_inverter import (
     async_setup,
 )
 from custom_components.deye_inverter.const import DOMAIN
+from custom_components.deye_inverter.InverterDataParser import (
+    load_compiled_definitions,
+)
 
 
 @pytest.mark.asyncio
@@ -24,6 +27,7 @@ async def test_async_setup_entry():
 
     hass = MagicMock()
     hass.data = {}
+    hass.async_add_executor_job = AsyncMock()
     hass.config_entries.async_forward_entry_setups = AsyncMock()
 
     with patch(
@@ -39,6 +43,9 @@ async def test_async_setup_entry():
         assert DOMAIN in hass.data
         assert "test_entry" in hass.data[DOMAIN]
         mock_coordinator.async_config_entry_first_refresh.assert_awaited_once()
+        hass.async_add_executor_job.assert_awaited_once_with(
+            load_compiled_definitions, "hybrid_single_phase"
+        )
         hass.config_entries.async_forward_entry_setups.assert_awaited_once_with(mock_entry, ["sensor"])
 
 
@@ -1,23 +1,78 @@
+import asyncio
+import time
+
 import pytest
+import struct
 from unittest.mock import AsyncMock, MagicMock, patch
 import logging
-
-from custom_components.deye_inverter.InverterData import InverterData
-from custom_components.deye_inverter.const import DOMAIN
+from collections.abc import Mapping
+
+from umodbus.client.serial import rtu
+from umodbus.client.serial.redundancy_check import get_crc
+from umodbus.exceptions import IllegalDataAddressError
+
+from custom_components.deye_inverter.InverterData import (
+    InverterData,
+    read_response_payload,
+)
+from custom_components.deye_inverter.const import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MODBUS_RETRIES,
+    DEFAULT_MODBUS_TIMEOUT,
+    DOMAIN,
+    MAX_METRIC_AGE,
+)
 from custom_components.deye_inverter.InverterData import ModbusReadError
+from custom_components.deye_inverter.LoggerConnection import close_idle_connections
+from custom_components.deye_inverter.ReadPlanner import ReadMap
+from custom_components.deye_inverter.ReadRecovery import READ_MAP_RETRY
 
 
 @pytest.fixture(autouse=True)
 def patch_pysolarmanv5():
-    with patch("custom_components.deye_inverter.InverterData.PySolarmanV5") as mock_class:
+    with patch(
+        "custom_components.deye_inverter.LoggerConnection.PySolarmanV5Async"
+    ) as mock_class, patch.dict(
+        "custom_components.deye_inverter.LoggerConnection._CONNECTIONS", clear=True
+    ):
         mock_instance = MagicMock()
-        mock_instance.read_holding_registers = MagicMock()
+        mock_instance.writer = None
+
+        def connect():
+            mock_instance.writer = MagicMock()
+
+        mock_instance.connect = AsyncMock(side_effect=connect)
+        mock_instance.disconnect = AsyncMock()
+        mock_instance.read_holding_registers = AsyncMock()
+        mock_instance.send_raw_modbus_frame = AsyncMock()
         mock_class.return_value = mock_instance
         yield
 
 
+def _response(request, value=1):
+    """RTU response to a Read Holding Registers request, every word = value."""
+    slave, _, _, quantity = struct.unpack(">BBHH", request[:6])
+    body = bytes([slave, 0x03, 2 * quantity])
+    body += struct.pack(f">{quantity}H", *([value] * quantity))
+    return body + get_crc(body)
+
+
+def _exception_response(request, code=0x02):
+    body = bytes([request[0], 0x83, code])
+    return body + get_crc(body)
+
+
+@pytest.fixture
+def no_sleep():
+    """Pauses and retry backoffs of failing reads take no time."""
+    with patch(
+        "custom_components.deye_inverter.InverterData.asyncio.sleep", AsyncMock()
+    ) as sleep:
+        yield sleep
+
+
 @pytest.mark.asyncio
-async def test_trigger_reload_after_max_errors():
+async def test_trigger_reload_after_max_errors(no_sleep):
     """Test that integration reload is triggered after max consecutive read errors."""
     hass = MagicMock()
 
@@ -32,7 +87,7 @@ async def test_trigger_reload_after_max_errors():
         config_entry=config_entry,
     )
 
-    inverter._modbus.read_holding_registers.side_effect = RuntimeError("Mock failure")
+    inverter._modbus.send_raw_modbus_frame.side_effect = RuntimeError("Mock failure")
 
     for _ in range(5):
         with pytest.raises(Exception):
@@ -43,7 +98,7 @@ async def test_trigger_reload_after_max_errors():
 
 
 @pytest.mark.asyncio
-async def test_no_reload_before_threshold():
+async def test_no_reload_before_threshold(no_sleep):
     """Ensure reload is not triggered before reaching the threshold."""
     hass = MagicMock()
     hass.services.async_call = AsyncMock()
@@ -58,7 +113,7 @@ async def test_no_reload_before_threshold():
         config_entry=config_entry,
     )
 
-    inverter._modbus.read_holding_registers.side_effect = RuntimeError("Mock failure")
+    inverter._modbus.send_raw_modbus_frame.side_effect = RuntimeError("Mock failure")
 
     for _ in range(3):  # fewer than max_errors
         with pytest.raises(Exception):
@@ -68,10 +123,12 @@ async def test_no_reload_before_threshold():
 
 
 @pytest.mark.asyncio
-async def test_fetch_data_logs_error_and_raises(caplog):
+async def test_fetch_data_logs_error_and_raises(caplog, no_sleep):
     """Test that fetch_data logs the error and raises ModbusReadError."""
     inverter = InverterData(host="localhost", port=8899, serial="1")
-    inverter._modbus.read_holding_registers = MagicMock(side_effect=RuntimeError("Test failure"))
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(
+        side_effect=RuntimeError("Test failure")
+    )
 
     with caplog.at_level(logging.ERROR):
         with pytest.raises(ModbusReadError):
@@ -84,18 +141,19 @@ async def test_fetch_data_logs_error_and_raises(caplog):
 async def test_fetch_data_success_returns_parsed():
     """Test that fetch_data returns parsed result correctly."""
     inverter = InverterData(host="localhost", port=8899, serial="1")
-    inverter._modbus.read_holding_registers = MagicMock(return_value=[0] * 100)
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(
+        side_effect=lambda request: _response(request, 0)
+    )
 
     result = await inverter.fetch_data()
-    assert isinstance(result, dict)
+    assert isinstance(result, Mapping)
+
 
 @pytest.mark.asyncio
 async def test_fetch_data_reads_optional_blocks():
     """All four blocks read fine: device-info metrics are parsed."""
     inverter = InverterData(host="localhost", port=8899, serial="1")
-    inverter._modbus.read_holding_registers = MagicMock(
-        side_effect=lambda register_addr, quantity: [1] * quantity
-    )
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=_response)
 
     result = await inverter.fetch_data()
 
@@ -110,13 +168,15 @@ async def test_fetch_data_optional_blocks_best_effort():
     inverter = InverterData(host="localhost", port=8899, serial="1")
     calls = {"n": 0}
 
-    def read(register_addr, quantity):
+    def read(request):
         calls["n"] += 1
         if calls["n"] <= 2:  # core blocks succeed
-            return [1] * quantity
+            return _response(request)
+        if calls["n"] == 3:
+            return _exception_response(request)
         raise RuntimeError("unsupported block")
 
-    inverter._modbus.read_holding_registers = MagicMock(side_effect=read)
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
 
     result = await inverter.fetch_data()
 
@@ -130,10 +190,13 @@ async def test_fetch_data_optional_blocks_best_effort():
 async def test_fetch_data_without_hass_or_entry():
     """Ensure fetch_data works standalone without hass/config_entry (no reload logic)."""
     inverter = InverterData(host="localhost", port=8899, serial="1")
-    inverter._modbus.read_holding_registers = MagicMock(return_value=[0] * 100)
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(
+        side_effect=lambda request: _response(request, 0)
+    )
 
     result = await inverter.fetch_data()
-    assert isinstance(result, dict)
+    assert isinstance(result, Mapping)
+
 
 @pytest.mark.asyncio
 async def test_fetch_data_success_no_reload_trigger():
@@ -150,13 +213,45 @@ async def test_fetch_data_success_no_reload_trigger():
         hass=hass,
         config_entry=config_entry,
     )
-    inverter._modbus.read_holding_registers = MagicMock(return_value=[0] * 100)
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(
+        side_effect=lambda request: _response(request, 0)
+    )
 
     result = await inverter.fetch_data()
 
-    assert isinstance(result, dict)
+    assert isinstance(result, Mapping)
     hass.config_entries.async_reload.assert_not_called()
 
+
+@pytest.mark.asyncio
+async def test_fetch_data_rejects_corrupt_frame(no_sleep):
+    """A core block with a bad CRC fails the update."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(
+        side_effect=lambda request: _response(request)[:-1] + b"\x00"
+    )
+
+    with pytest.raises(ModbusReadError, match="CRC"):
+        await inverter.fetch_data()
+
+
+def test_read_response_payload():
+    frame = _response(bytes.fromhex("0103003b0002"), 0x1234)
+    assert bytes(read_response_payload(frame, 2)) == bytes.fromhex("12341234")
+    # Double CRC appended by some loggers
+    assert bytes(read_response_payload(frame + b"\x00\x00", 2)) == (
+        bytes.fromhex("12341234")
+    )
+
+    with pytest.raises(ValueError):
+        read_response_payload(frame, 3)
+    with pytest.raises(IllegalDataAddressError):
+        read_response_payload(_exception_response(b"\x01"), 2)
+    # An answer from another unit on the logger's bus
+    with pytest.raises(ValueError, match="slave 1"):
+        read_response_payload(frame, 2, slave_id=2)
+
+
 @pytest.mark.asyncio
 async def test_trigger_reload_logs_error_if_missing_parts(caplog):
     """Ensure reload logs an error and exits if hass or config_entry is missing."""
@@ -168,3 +263,649 @@ async def test_trigger_reload_logs_error_if_missing_parts(caplog):
         await inverter._trigger_reload()
 
     assert "Cannot reload: 'hass' or 'config_entry' is missing." in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_reports_alert_transitions():
+    """Alert bits are reported once when raised, not on every fetch."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    fault = 0
+
+    def read(request):
+        frame = _response(request, 0)
+        if request[2:4] == b"\x00\x3b":  # block holding the alert registers
+            words = bytearray(frame[3:-2])
+            words[2 * (0x0067 - 0x003B) + 1] = fault
+            body = frame[:3] + bytes(words)
+            frame = body + get_crc(body)
+        return frame
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    await inverter.fetch_data()
+    assert inverter.alert_transitions == []
+    fault = 0x10  # F05
+    await inverter.fetch_data()
+    assert [(bit.code, raised) for bit, raised in inverter.alert_transitions] == [
+        ("F05", True)
+    ]
+    await inverter.fetch_data()
+    assert inverter.alert_transitions == []
+
+
+@pytest.mark.asyncio
+async def test_alert_active_at_startup_fires_nothing():
+    """A fault already present on the first read is not a new fault."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+
+    def read(request):
+        frame = _response(request, 0)
+        if request[2:4] == b"\x00\x3b":
+            words = bytearray(frame[3:-2])
+            words[2 * (0x0067 - 0x003B) + 1] = 0x10  # F05
+            body = frame[:3] + bytes(words)
+            frame = body + get_crc(body)
+        return frame
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    await inverter.fetch_data()
+    assert inverter.alert_transitions == []
+    assert set(inverter._alerts.active) == {"F05"}
+
+
+@pytest.mark.asyncio
+async def test_detect_profile_switches_register_map():
+    """The device type selects the blocks that are read."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    inverter._modbus.read_holding_registers = AsyncMock(return_value=[0x0005])
+    requests = []
+
+    def read(request):
+        requests.append(struct.unpack(">HH", request[2:6]))
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    assert await inverter.detect_profile() == "hybrid_three_phase"
+    inverter._modbus.read_holding_registers.assert_called_once_with(
+        register_addr=0x0000, quantity=1
+    )
+    result = await inverter.fetch_data()
+
+    assert requests == [(0x01F4, 59), (0x024A, 94), (0x0003, 12)]
+    assert "Grid Voltage L3" in result
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_polls_slow_tiers_on_their_interval():
+    """Device info and work mode are re-read only when their tier is due."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+
+    def read(request):
+        requests.append(struct.unpack(">H", request[2:4])[0])
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    with patch("custom_components.deye_inverter.InverterData.time") as clock:
+        clock.monotonic.return_value = 1000.0
+        clock.time.return_value = 5000.0
+        first = await inverter.fetch_data()
+        assert requests == [0x003B, 0x0096, 0x0003, 0x00F4]
+
+        requests.clear()
+        clock.monotonic.return_value = 1030.0
+        clock.time.return_value = 5030.0
+        second = await inverter.fetch_data()
+        assert requests == [0x003B, 0x0096]
+
+        requests.clear()
+        clock.monotonic.return_value = 1300.0
+        await inverter.fetch_data()
+        assert requests == [0x003B, 0x0096, 0x00F4]
+
+    # Slow values are carried over, with the time they were read
+    assert second["Inverter ID"] == first["Inverter ID"]
+    assert second["Work Mode"] == first["Work Mode"]
+    assert second.read_at("Inverter ID") == 5000.0
+    assert second.read_at("PV1 Power") == 5030.0
+
+
+@pytest.mark.asyncio
+async def test_failed_optional_block_is_backed_off():
+    """A failed optional block is skipped, then retried after a delay."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+    fail = {0x0003}
+
+    def read(request):
+        start = struct.unpack(">H", request[2:4])[0]
+        requests.append(start)
+        if start in fail:
+            return _exception_response(request, code=0x04)
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    with patch("custom_components.deye_inverter.InverterData.time") as clock:
+        clock.monotonic.return_value = 1000.0
+        clock.time.return_value = 5000.0
+        result = await inverter.fetch_data()
+        assert "Inverter ID" not in result
+
+        requests.clear()
+        clock.monotonic.return_value = 1030.0
+        result = await inverter.fetch_data()
+        assert requests == [0x003B, 0x0096]
+        assert "Inverter ID" not in result
+
+        # Second failure: the delay doubles
+        clock.monotonic.return_value = 1060.0
+        await inverter.fetch_data()
+        requests.clear()
+        clock.monotonic.return_value = 1150.0
+        await inverter.fetch_data()
+        assert 0x0003 not in requests
+
+        requests.clear()
+        fail.clear()
+        clock.monotonic.return_value = 1180.0
+        result = await inverter.fetch_data()
+        assert requests == [0x003B, 0x0096, 0x0003]
+        assert "Inverter ID" in result
+        assert inverter.unsupported_blocks == {}
+
+
+@pytest.mark.asyncio
+async def test_illegal_address_marks_block_unsupported():
+    """Blocks answered with an illegal address stay skipped across reconnects."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+
+    def read(request):
+        start = struct.unpack(">H", request[2:4])[0]
+        requests.append(start)
+        if 0x00F4 <= start <= 0x00F8:
+            return _exception_response(request)
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    with patch("custom_components.deye_inverter.InverterData.time") as clock:
+        clock.monotonic.return_value = 1000.0
+        clock.time.return_value = 5000.0
+        await inverter.fetch_data()
+        assert inverter.unsupported_blocks == {}
+        clock.monotonic.return_value = 1060.0
+        await inverter.fetch_data()
+        assert (0x00F4, 0x00F8) in inverter.unsupported_blocks
+
+        # Reconnecting retries timed-out blocks, not unsupported ones
+        requests.clear()
+        inverter._modbus.writer = MagicMock()
+        clock.monotonic.return_value = 2000.0
+        await inverter.fetch_data()
+        assert 0x00F4 not in requests
+
+    restored = InverterData(host="localhost", port=8899, serial="1")
+    restored.seed_unsupported(inverter.unsupported_blocks)
+    restored._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+    requests.clear()
+    await restored.fetch_data()
+    assert requests == [0x003B, 0x0096, 0x0003]
+
+
+@pytest.mark.asyncio
+async def test_seeded_identity_read_again_after_reconnect():
+    """Cached identity registers are used until the connection changes."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+
+    def read(request):
+        requests.append(struct.unpack(">H", request[2:4])[0])
+        return _response(request, 0x3030)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+    await inverter.connect()
+
+    registers = {reg: 0x4142 for reg in range(0x0003, 0x000F)}
+    assert inverter.seed_identity(registers, 42.0)
+    assert not inverter.seed_identity({0x0003: 1}, 42.0)  # incomplete
+
+    result = await inverter.fetch_data()
+    assert 0x0003 not in requests
+    assert result["Inverter ID"] == "ABABABABAB"
+    assert result.read_at("Inverter ID") == 42.0
+
+    # The client reconnected: the identity is read again
+    requests.clear()
+    inverter._modbus.writer = MagicMock()
+    result = await inverter.fetch_data()
+    assert 0x0003 in requests
+    assert result["Inverter ID"] == "0000000000"
+    assert inverter.identity[0x000D] == 0x3030
+
+
+@pytest.mark.asyncio
+async def test_budget_drops_optional_reads_that_do_not_fit():
+    """Core reads go first; optional ones the budget has no room for are skipped."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+
+    def read(request):
+        requests.append(struct.unpack(">H", request[2:4])[0])
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+    inverter._link.srtt = 10.0
+
+    result = await inverter.fetch_data(budget=10.0)
+    assert requests == [0x003B, 0x0096]
+    assert result.partial
+    assert result.skipped == ((0x0003, 0x000E), (0x00F4, 0x00F8))
+    assert "PV1 Power" in result and "Inverter ID" not in result
+
+    # Skipped tiers stay due
+    requests.clear()
+    result = await inverter.fetch_data()
+    assert requests == [0x003B, 0x0096, 0x0003, 0x00F4]
+    assert not result.partial
+
+
+@pytest.mark.asyncio
+async def test_budget_bounds_a_hanging_core_read():
+    """A logger that never answers fails the cycle at the deadline."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+
+    async def hang(request):
+        await asyncio.sleep(60)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=hang)
+
+    started = time.monotonic()
+    with pytest.raises(ModbusReadError, match="budget"):
+        await inverter.fetch_data(budget=0.2)
+    assert time.monotonic() - started < 1.0
+
+
+@pytest.mark.asyncio
+async def test_requests_use_learned_pause_and_timeout():
+    """A tuned link is read without pauses and with a short timeout."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    inverter.seed_link(
+        {"srtt": 0.05, "rttvar": 0.01, "pause": 0.0, "samples": [0.05] * 16}
+    )
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=_response)
+
+    with patch(
+        "custom_components.deye_inverter.InverterData.asyncio.sleep"
+    ) as sleep, patch(
+        "custom_components.deye_inverter.InverterData.asyncio.wait_for",
+        side_effect=asyncio.wait_for,
+    ) as wait_for:
+        await inverter.fetch_data()
+    sleep.assert_not_called()
+    assert {call.args[1] for call in wait_for.call_args_list} == {2.0}
+    assert inverter.link_state()["pause"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_failed_core_read_is_retried(no_sleep):
+    """A dropped frame is re-read; the other blocks are not."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+    failures = {0x0096: 1}
+
+    def read(request):
+        start = struct.unpack(">H", request[2:4])[0]
+        requests.append(start)
+        if failures.get(start):
+            failures[start] -= 1
+            return b"\x01\x03"  # truncated frame
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    result = await inverter.fetch_data()
+    assert requests == [0x003B, 0x0096, 0x0096, 0x0003, 0x00F4]
+    assert not result.partial
+
+
+@pytest.mark.asyncio
+async def test_fetch_data_records_link_stats(no_sleep):
+    """Requests, retries, reconnects and cycle durations are counted."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    failures = {0x0096: 1}
+
+    def read(request):
+        start = struct.unpack(">H", request[2:4])[0]
+        if failures.get(start):
+            failures[start] -= 1
+            return b"\x01\x03"  # truncated frame
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+    await inverter.connect()
+    await inverter.fetch_data()
+
+    stats = inverter.stats
+    grid = stats.blocks[(0x0096, 0x00C3)]
+    assert (grid.requests, grid.answered, grid.errors, grid.retries) == (2, 1, 1, 1)
+    assert grid.bytes_received == 5 + 2 * 46
+    assert stats.link.requests == 5
+    assert stats.success_ratio == 0.8
+    assert stats.cycles == 1 and stats.last_cycle is not None
+
+    inverter._modbus.writer = MagicMock()
+    await inverter.fetch_data()
+    assert stats.reconnects == 1
+    assert stats.cycles == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_core_block_keeps_last_values(no_sleep):
+    """Metrics of a block that keeps failing carry over from the last read."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+    fail = set()
+
+    def read(request):
+        start = struct.unpack(">H", request[2:4])[0]
+        requests.append(start)
+        if start in fail:
+            raise TimeoutError()
+        return _response(request, 2 if requests.count(start) > 1 else 1)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    with patch("custom_components.deye_inverter.InverterData.time") as clock:
+        clock.monotonic.return_value = 1000.0
+        clock.time.return_value = 5000.0
+        first = await inverter.fetch_data()
+
+        fail.add(0x0096)
+        requests.clear()
+        clock.time.return_value = 5030.0
+        second = await inverter.fetch_data()
+
+    assert requests.count(0x0096) == 1 + DEFAULT_MODBUS_RETRIES
+    assert second.partial
+    assert [block[0] for block in second.failed] == [0x0096]
+    # 0x00BA is in the failed block, 0x006C in the one read
+    assert second["PV1 Power"] == first["PV1 Power"]
+    assert second.read_at("PV1 Power") == 5000.0
+    assert second.read_at("Daily Production") == 5030.0
+
+
+@pytest.mark.asyncio
+async def test_core_block_failing_every_cycle_goes_stale(no_sleep):
+    """A core block that never reads counts toward the reload, and its
+    metrics are dropped once older than MAX_METRIC_AGE."""
+    hass = MagicMock()
+    config_entry = MagicMock(entry_id="test_entry")
+    inverter = InverterData(
+        host="localhost", port=8899, serial="1", hass=hass, config_entry=config_entry
+    )
+    fail = set()
+
+    def read(request):
+        if struct.unpack(">H", request[2:4])[0] in fail:
+            raise TimeoutError()
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    with patch("custom_components.deye_inverter.InverterData.time") as clock:
+        clock.monotonic.return_value = 1000.0
+        clock.time.return_value = 5000.0
+        await inverter.fetch_data()
+
+        fail.add(0x0096)
+        clock.time.return_value = 5000.0 + MAX_METRIC_AGE
+        result = await inverter.fetch_data()
+        assert "PV1 Power" in result
+        for cycle in range(3):
+            clock.time.return_value = 5001.0 + MAX_METRIC_AGE + cycle
+            result = await inverter.fetch_data()
+        hass.config_entries.async_reload.assert_not_called()
+
+        clock.time.return_value = 5100.0 + MAX_METRIC_AGE
+        result = await inverter.fetch_data()
+
+    assert "PV1 Power" not in result
+    assert "Daily Production" in result
+    hass.config_entries.async_reload.assert_called_once_with("test_entry")
+    # The logger answers: no reachability probe after a partial poll
+    assert not inverter._poll_failed
+
+
+@pytest.mark.asyncio
+async def test_retries_are_budgeted(no_sleep):
+    """Illegal addresses are not retried; retries are capped per cycle."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+
+    def read(request):
+        start = struct.unpack(">H", request[2:4])[0]
+        requests.append(start)
+        if start == 0x003B:
+            return _exception_response(request)
+        raise TimeoutError()
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    with patch(
+        "custom_components.deye_inverter.InverterData.DEFAULT_CYCLE_RETRIES", 1
+    ), pytest.raises(ModbusReadError):
+        await inverter.fetch_data()
+    assert requests == [0x003B, 0x0096, 0x0096]
+
+
+@pytest.mark.asyncio
+async def test_rejected_block_is_bisected_into_a_read_map(no_sleep):
+    """Only the metric behind a register the logger rejects is lost."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+
+    def read(request):
+        first, quantity = struct.unpack(">HH", request[2:6])
+        requests.append((first, first + quantity - 1))
+        if first <= 0x00A4 < first + quantity:
+            return _exception_response(request)
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    first = await inverter.fetch_data()
+    assert first.failed == ((0x0096, 0x00C3),)
+    assert "PV1 Power" not in first
+
+    # Rejected again: bisected, and the readable part read right away
+    second = await inverter.fetch_data()
+    assert not second.failed
+    assert "PV1 Power" in second
+    assert inverter.read_map.unreadable == {0x00A4}
+
+    requests.clear()
+    await inverter.fetch_data()
+    assert requests == [(0x003B, 0x0070), (0x0096, 0x00A1), (0x00A5, 0x00C3)]
+
+
+@pytest.mark.asyncio
+async def test_corrupt_frames_are_not_bisected(no_sleep):
+    """Link noise fails the read, but never ends up in the read map."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+
+    def read(request):
+        if struct.unpack(">H", request[2:4])[0] == 0x00F4:
+            return _response(request)[:-3]  # truncated
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+    with patch(
+        "custom_components.deye_inverter.InverterData.BlockHealth.should_read",
+        return_value=True,
+    ):
+        for _ in range(4):
+            await inverter.fetch_data()
+    assert inverter.read_map == ReadMap()
+
+
+@pytest.mark.asyncio
+async def test_bisection_kept_only_if_the_request_is_still_rejected(no_sleep):
+    """A request rejected for a while, then served, leaves no read map."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    full = []
+
+    def read(request):
+        first, quantity = struct.unpack(">HH", request[2:6])
+        if first == 0x0096 and quantity == 0x2E:
+            full.append(quantity)
+            if len(full) <= 2:
+                return _exception_response(request)
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+    await inverter.fetch_data()
+    result = await inverter.fetch_data()
+
+    # Bisected, then the confirming read of the whole request went through
+    assert len(full) == 3
+    assert inverter.read_map == ReadMap()
+    assert not result.failed and "PV1 Power" in result
+
+
+@pytest.mark.asyncio
+async def test_read_map_is_probed_again_after_a_day():
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+
+    def read(request):
+        requests.append(struct.unpack(">HH", request[2:6]))
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+    inverter.seed_read_map(
+        ReadMap(frozenset({0x00A4}), frozenset(), time.time() - READ_MAP_RETRY + 60)
+    )
+    await inverter.fetch_data()
+    assert (0x0096, 0x2E) not in requests
+
+    inverter.seed_read_map(
+        ReadMap(frozenset({0x00A4}), frozenset(), time.time() - READ_MAP_RETRY)
+    )
+    requests.clear()
+    await inverter.fetch_data()
+    assert (0x0096, 0x2E) in requests
+    assert inverter.read_map == ReadMap()
+
+
+@pytest.mark.asyncio
+async def test_long_requests_rejected_by_the_logger_are_split(no_sleep):
+    """A logger that rejects long requests gets shorter ones."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    requests = []
+
+    def read(request):
+        first, quantity = struct.unpack(">HH", request[2:6])
+        requests.append(quantity)
+        if quantity > 20:
+            return _exception_response(request, code=0x03)  # illegal value
+        return _response(request)
+
+    inverter._modbus.send_raw_modbus_frame = AsyncMock(side_effect=read)
+
+    with pytest.raises(ModbusReadError):
+        await inverter.fetch_data()
+    result = await inverter.fetch_data()
+    assert "PV1 Power" in result and "Daily Production" in result
+    assert inverter.read_map.splits and not inverter.read_map.unreadable
+
+    requests.clear()
+    await inverter.fetch_data()
+    assert max(requests) <= 20
+
+
+@pytest.mark.asyncio
+async def test_unreachable_logger_fails_fast(no_sleep):
+    """After a failed poll, a silent logger fails after one short read."""
+    inverter = InverterData(host="192.0.2.1", port=8899, serial="1")
+    modbus = inverter._modbus
+    send = modbus.send_raw_modbus_frame = AsyncMock(side_effect=TimeoutError())
+
+    await inverter.connect()
+    with pytest.raises(ModbusReadError):
+        await inverter.fetch_data()
+
+    send.reset_mock()
+    with pytest.raises(ModbusReadError, match="not reachable"):
+        await inverter.fetch_data()
+    # One device type read, on the connection already open
+    send.assert_awaited_once_with(rtu.read_holding_registers(1, 0x0000, 1))
+    assert modbus.connect.await_count == 1
+
+    # Any answer, an exception response too, lets the poll go ahead
+    def read(request):
+        if request[2:4] == b"\x00\x00":
+            return _exception_response(request)
+        return _response(request)
+
+    send.side_effect = read
+    send.reset_mock()
+    assert "PV1 Power" in await inverter.fetch_data()
+    assert send.await_args_list[0].args[0] == rtu.read_holding_registers(1, 0, 1)
+    assert modbus.connect.await_count == 1
+
+    # No probe once polls succeed
+    send.reset_mock()
+    await inverter.fetch_data()
+    assert rtu.read_holding_registers(1, 0, 1) not in [
+        call.args[0] for call in send.await_args_list
+    ]
+
+
+@pytest.mark.asyncio
+async def test_lost_connection_is_reopened_with_connect_timeout():
+    """A connection the logger dropped is opened again."""
+    inverter = InverterData(host="localhost", port=8899, serial="1")
+    modbus = inverter._modbus
+    timeouts = []
+
+    def connect():
+        timeouts.append(modbus.socket_timeout)
+        modbus.writer = MagicMock()
+
+    modbus.connect.side_effect = connect
+    modbus.send_raw_modbus_frame = AsyncMock(side_effect=_response)
+    await inverter.connect()
+
+    modbus.writer = None
+    await inverter.fetch_data()
+    assert modbus.connect.await_count == 2
+    assert timeouts == [DEFAULT_CONNECT_TIMEOUT] * 2
+    assert modbus.socket_timeout == DEFAULT_MODBUS_TIMEOUT
+
+
+@pytest.mark.asyncio
+async def test_units_behind_one_logger_share_its_link_timing():
+    """Pacing and the learned timeout are per logger connection, not per unit."""
+    first = InverterData(host="localhost", port=8899, serial="1", slave_id=1)
+    second = InverterData(host="localhost", port=8899, serial="1", slave_id=2)
+    assert first._link is second._link
+    first.seed_link({"srtt": 0.05, "rttvar": 0.01, "pause": 0.5})
+    first._modbus.send_raw_modbus_frame = AsyncMock(side_effect=_response)
+
+    await first.fetch_data()
+    with patch(
+        "custom_components.deye_inverter.LoggerConnection.asyncio.sleep"
+    ) as sleep:
+        await second.fetch_data()
+    # Its first request waits out the pause after the other unit's last one
+    first_wait = sleep.await_args_list[0].args[0]
+    assert 0.4 < first_wait <= 0.5
+    assert second.link_state()["srtt"] == first.link_state()["srtt"]
+    await first.close()
+    await second.close()
+    await close_idle_connections()
@@ -3,6 +3,7 @@
 # to achieve maximum test coverage on InverterDataParser.py
 
 import pytest
+from collections.abc import Mapping
 import importlib
 from custom_components.deye_inverter import InverterDataParser as parser
 
@@ -55,32 +56,25 @@ def test_enum_builder_skips_item_without_title(monkeypatch):
 
 def test_parse_skips_item_without_registers(monkeypatch):
     """Covers lines 61–62."""
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
-        [{"items": [{"titleEN": "NoRegs"}]}],  # missing "registers"
-    )
-    result = parser.parse_raw([0])
+    # No "registers"
+    plan = parser.compile_plan([{"items": [{"titleEN": "NoRegs"}]}])
+    result = parser.parse_raw([0], plan=plan)
     assert "NoRegs" not in result
 
 
 def test_parser_rule_6(monkeypatch):
     """Covers line 128."""
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
-        [{"items": [{"titleEN": "Bitfield", "parserRule": 6, "registers": ["003B"]}]}],
+    plan = parser.compile_plan(
+        [{"items": [{"titleEN": "Bitfield", "parserRule": 6, "registers": ["003B"]}]}]
     )
-    result = parser.parse_raw([255])
+    result = parser.parse_raw([255], plan=plan)
     assert result["Bitfield"] == "0x00FF"
 
 
 def test_parse_exception_handling(monkeypatch, caplog):
     """Covers line 161."""
     caplog.set_level("DEBUG")
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -91,9 +85,9 @@ def test_parse_exception_handling(monkeypatch, caplog):
                     }
                 ]
             }
-        ],
+        ]
     )
-    result = parser.parse_raw([1])
+    result = parser.parse_raw([1], plan=plan)
     assert "CrashField" not in result
     assert "Error parsing CrashField" in caplog.text
 
@@ -102,9 +96,7 @@ def test_parse_exception_handling(monkeypatch, caplog):
 
 
 def test_enum_mapping_unknown_value(monkeypatch):
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -121,18 +113,15 @@ def test_enum_mapping_unknown_value(monkeypatch):
                 ]
             }
         ],
+        {(0x003B, "EnumField"): {1: "OK"}},
     )
-    parser._ENUM_MAPPINGS.clear()
-    parser._ENUM_MAPPINGS[(0x003B, "EnumField")] = {1: "OK"}
-    result = parser.parse_raw([999])
+    result = parser.parse_raw([999], plan=plan)
     assert result["EnumField"] == "Unknown (999)"
 
 
 def test_total_battery_charge_reversed(monkeypatch):
     """Battery totals use the reversed (lo, hi) word order."""
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -144,17 +133,15 @@ def test_total_battery_charge_reversed(monkeypatch):
                     }
                 ]
             }
-        ],
+        ]
     )
     # lo=67, hi=0 -> 67 * 0.1 = 6.7 (matches live inverter reading)
-    result = parser.parse_raw([67, 0])
+    result = parser.parse_raw([67, 0], plan=plan)
     assert result["Total Battery Charge"] == pytest.approx(6.7)
 
 
 def test_total_grid_production(monkeypatch):
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -165,9 +152,9 @@ def test_total_grid_production(monkeypatch):
                     }
                 ]
             }
-        ],
+        ]
     )
-    result = parser.parse_raw([0x0001, 0x0002])
+    result = parser.parse_raw([0x0001, 0x0002], plan=plan)
     assert "Total Grid Production" in result
     # Reversed word order: 0x0002_0001 * 0.1
     assert result["Total Grid Production"] == pytest.approx(0x00020001 * 0.1, abs=0.01)
@@ -192,22 +179,18 @@ def test_load_definitions_full_fallback(monkeypatch, caplog):
 
 def test_ascii_parser_rule_fallback(monkeypatch):
     # 0x0001 = SOH = non-printable ASCII -> fallback to hex
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
-        [{"items": [{"titleEN": "Serial", "parserRule": 5, "registers": ["003B"]}]}],
+    plan = parser.compile_plan(
+        [{"items": [{"titleEN": "Serial", "parserRule": 5, "registers": ["003B"]}]}]
     )
-    result = parser.parse_raw([0x0001])
+    result = parser.parse_raw([0x0001], plan=plan)
     assert result["Serial"].startswith("0x")
 
 
 def test_parse_raw_returns_valid_field(monkeypatch):
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
-        [{"items": [{"titleEN": "Simple", "registers": ["003B"], "ratio": 1}]}],
+    plan = parser.compile_plan(
+        [{"items": [{"titleEN": "Simple", "registers": ["003B"], "ratio": 1}]}]
     )
-    result = parser.parse_raw([42])
+    result = parser.parse_raw([42], plan=plan)
     assert result["Simple"] == 42.0
 
 
@@ -215,9 +198,7 @@ def test_parse_raw_reaches_return(monkeypatch):
     from custom_components.deye_inverter import InverterDataParser as parser
 
     # Patch a definition with a non-special field
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -230,11 +211,11 @@ def test_parse_raw_reaches_return(monkeypatch):
                     }
                 ]
             }
-        ],
+        ]
     )
 
     raw = [123]
-    result = parser.parse_raw(raw)
+    result = parser.parse_raw(raw, plan=plan)
 
     # This will hit the default numeric parse path and reach return
     assert result == {"Generic Field": 123.0}
@@ -243,9 +224,7 @@ def test_parse_raw_reaches_return(monkeypatch):
 def test_parse_raw_forces_return_path(monkeypatch):
     from custom_components.deye_inverter import InverterDataParser as parser
 
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -263,10 +242,10 @@ def test_parse_raw_forces_return_path(monkeypatch):
                     },
                 ]
             }
-        ],
+        ]
     )
 
-    result = parser.parse_raw([99, 42])
+    result = parser.parse_raw([99, 42], plan=plan)
     assert result == {"First": "0x0063", "Final": 42.0}
 
 
@@ -274,9 +253,7 @@ def test_parse_raw_final_return(monkeypatch):
     from custom_components.deye_inverter import InverterDataParser as parser
 
     # Inject a barebones definition that cannot trigger any continue
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -290,14 +267,14 @@ def test_parse_raw_final_return(monkeypatch):
                     }
                 ]
             }
-        ],
+        ]
     )
 
     raw = [10]  # 0x003B maps to index 0
-    result = parser.parse_raw(raw)
+    result = parser.parse_raw(raw, plan=plan)
 
     # Assert not only correctness, but ensure parsing happened
-    assert isinstance(result, dict)
+    assert isinstance(result, Mapping)
     assert result == {"Simple Field": 10.0}
 
 
@@ -309,8 +286,6 @@ from custom_components.deye_inverter.InverterDataParser import (
     _load_definitions,
     parse_raw,
     combine_registers,
-    _ENUM_MAPPINGS,
-    _DEFINITIONS,
 )
 
 
@@ -348,10 +323,8 @@ def test_parse_raw_ascii_control_char(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    result = parse_raw([0x0001])
+    plan = parser.compile_plan(fake_defs)
+    result = parse_raw([0x0001], plan=plan)
     assert result["Serial"].startswith("0x")
 
 
@@ -367,11 +340,9 @@ def test_parse_raw_battery_status_positive(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
+    plan = parser.compile_plan(fake_defs)
     raw = [0] * 94 + [3]
-    result = parse_raw(raw)
+    result = parse_raw(raw, plan=plan)
     assert result["Battery Status"].startswith("Discharge")
 
 
@@ -387,12 +358,10 @@ def test_parse_raw_gen_connected_status(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
+    plan = parser.compile_plan(fake_defs)
     offset = (0x0070 - 0x003B + 1) + (0x00A6 - 0x0096)
     raw = [0] * offset + [0]
-    result = parse_raw(raw)
+    result = parse_raw(raw, plan=plan)
     assert result["Gen-connected Status"] == "Off"
 
 
@@ -414,18 +383,16 @@ def test_parse_raw_enum_mapping(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    _ENUM_MAPPINGS.clear()
+    enum_mappings = {}
     for item in fake_defs[0]["items"]:
         reg = int(item["registers"][0], 16)
         title = item["titleEN"]
         mapping = {opt["key"]: opt["valueEN"] for opt in item["optionRanges"]}
-        _ENUM_MAPPINGS[(reg, title)] = mapping
+        enum_mappings[(reg, title)] = mapping
+    plan = parser.compile_plan(fake_defs, enum_mappings)
     raw = [0] * 117
     raw[112] = 2  # 0x00F4 -> first register of the last read block
-    result = parse_raw(raw)
+    result = parse_raw(raw, plan=plan)
     assert result["Mode Status"] == "Manual"
 
 
@@ -444,17 +411,16 @@ def test_parse_raw_work_mode_pair(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    _ENUM_MAPPINGS.clear()
-    _ENUM_MAPPINGS[(0x00F4, "Work Mode")] = {
-        0: "Selling First",
-        1: "Zero-Export to Load&Solar Sell",
-        2: "Zero-Export to Home&Solar Sell",
-        3: "Zero-Export to Load",
-        4: "Zero-Export to Home",
+    enum_mappings = {
+        (0x00F4, "Work Mode"): {
+            0: "Selling First",
+            1: "Zero-Export to Load&Solar Sell",
+            2: "Zero-Export to Home&Solar Sell",
+            3: "Zero-Export to Load",
+            4: "Zero-Export to Home",
+        }
     }
+    plan = parser.compile_plan(fake_defs, enum_mappings)
 
     cases = [
         ((0, 0), "Selling First"),
@@ -468,7 +434,34 @@ def test_parse_raw_work_mode_pair(monkeypatch):
         raw = [0] * 117
         raw[112] = mode  # 0x00F4
         raw[115] = sell  # 0x00F7
-        assert parse_raw(raw)["Work Mode"] == expected
+        assert parse_raw(raw, plan=plan)["Work Mode"] == expected
+
+
+def test_parse_raw_work_mode_single_register():
+    """Without the solar sell register, Work Mode decodes like other items."""
+    fake_defs = [
+        {
+            "section": "Test",
+            "items": [
+                {
+                    "titleEN": "Work Mode",
+                    "registers": ["0x00F4"],
+                    "interactionType": 2,
+                    "ratio": 1,
+                }
+            ],
+        }
+    ]
+    raw = [0] * 117
+    raw[112] = 2  # 0x00F4
+
+    plan = parser.compile_plan(fake_defs)
+    assert parse_raw(raw, plan=plan)["Work Mode"] == 2.0
+
+    plan = parser.compile_plan(fake_defs, {(0x00F4, "Work Mode"): {2: "Home"}})
+    assert parse_raw(raw, plan=plan)["Work Mode"] == "Home"
+    raw[112] = 7
+    assert parse_raw(raw, plan=plan)["Work Mode"] == "Unknown (7)"
 
 
 def test_enum_builder_accepts_value_key():
@@ -512,27 +505,21 @@ def test_parse_raw_enum_unknown(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    _ENUM_MAPPINGS.clear()
+    enum_mappings = {}
     for item in fake_defs[0]["items"]:
         reg = int(item["registers"][0], 16)
         title = item["titleEN"]
         mapping = {opt["key"]: opt["valueEN"] for opt in item["optionRanges"]}
-        _ENUM_MAPPINGS[(reg, title)] = mapping
+        enum_mappings[(reg, title)] = mapping
+    plan = parser.compile_plan(fake_defs, enum_mappings)
     raw = [0] * 117
     raw[112] = 999  # 0x00F4 -> first register of the last read block
-    result = parse_raw(raw)
+    result = parse_raw(raw, plan=plan)
     assert result["Mode Status"] == "Unknown (999)"
 
 
-def test_parse_raw_invalid_definitions(monkeypatch):
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", 42
-    )
-    result = parse_raw([])
-    assert result == {}
+def test_parse_raw_invalid_definitions():
+    assert parser.compile_plan(42) is None
 
 
 def test_parse_raw_ascii_invalid_bytes(monkeypatch):
@@ -548,11 +535,9 @@ def test_parse_raw_ascii_invalid_bytes(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
+    plan = parser.compile_plan(fake_defs)
     raw = [0x0000, 0x0001]  # non-printable bytes
-    result = parse_raw(raw)
+    result = parse_raw(raw, plan=plan)
     assert result["Model"].startswith("0x")
 
 
@@ -563,19 +548,17 @@ def test_parse_raw_custom_parser_raises(monkeypatch):
             "items": [
                 {
                     "titleEN": "Bad Field",
-                    "registers": ["0x003B"],
+                    "registers": ["0x003B", "0x003C", "0x003D"],
                 }
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
+    plan = parser.compile_plan(fake_defs)
     monkeypatch.setattr(
         "custom_components.deye_inverter.InverterDataParser.combine_registers",
-        lambda *_: (_ for _ in ()).throw(Exception("fail")),
+        lambda *_, **__: (_ for _ in ()).throw(Exception("fail")),
     )
-    result = parse_raw([0x0001])
+    result = parse_raw([0x0001, 0x0001, 0x0001], plan=plan)
     assert "Bad Field" not in result
 
 
@@ -596,15 +579,11 @@ def test_load_definitions_fallback_file_missing(monkeypatch, caplog):
         assert "Could not read DYRealTime.txt" in caplog.text
 
 
-def test_parse_raw_invalid_definitions_type(monkeypatch, caplog):
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", 1234
-    )
-    from custom_components.deye_inverter.InverterDataParser import parse_raw
+def test_parse_raw_invalid_definitions_type(caplog):
+    from custom_components.deye_inverter.InverterDataParser import compile_plan
 
     with caplog.at_level("ERROR"):
-        result = parse_raw([0])
-        assert result == {}
+        assert compile_plan(1234) is None
         assert "Invalid definitions type" in caplog.text
 
 
@@ -612,10 +591,8 @@ def test_parse_raw_empty_registers(monkeypatch):
     fake_defs = [
         {"section": "X", "items": [{"titleEN": "Empty Regs", "registers": []}]}
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    result = parse_raw([1, 2, 3])
+    plan = parser.compile_plan(fake_defs)
+    result = parse_raw([1, 2, 3], plan=plan)
     assert "Empty Regs" not in result
 
 
@@ -623,10 +600,8 @@ def test_parse_raw_empty_block(monkeypatch):
     fake_defs = [
         {"section": "X", "items": [{"titleEN": "Bad Index", "registers": ["0xFFFF"]}]}
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    result = parse_raw([0] * 10)
+    plan = parser.compile_plan(fake_defs)
+    result = parse_raw([0] * 10, plan=plan)
     assert "Bad Index" not in result
 
 
@@ -643,10 +618,8 @@ def test_parse_raw_parser_rule_6(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    result = parse_raw([123])
+    plan = parser.compile_plan(fake_defs)
+    result = parse_raw([123], plan=plan)
     assert result["Alert Flags"] == "0x007B"
 
 
@@ -664,10 +637,8 @@ def test_parse_raw_temperature_adjustment(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    result = parse_raw([150])
+    plan = parser.compile_plan(fake_defs)
+    result = parse_raw([150], plan=plan)
     assert result["Ambient Temperature"] == 50.0  # 150 * 1 - 100
 
 
@@ -684,35 +655,25 @@ def test_parse_raw_exception(monkeypatch, caplog):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
+    plan = parser.compile_plan(fake_defs)
 
     with caplog.at_level("DEBUG"):
         try:
-            parse_raw([1])
+            parse_raw([1], plan=plan)
         except Exception:
             pass  # We only care that the exception was logged
         assert "Error parsing Error Field" in caplog.text
 
 
-def test_parse_raw_definitions_not_dict_or_list(monkeypatch):
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS",
-        "invalid_type",
-    )
-    result = parse_raw([1])
-    assert (
-        result == {}
-    )  # Should return empty dict when _DEFINITIONS is neither dict nor list
+def test_parse_raw_definitions_not_dict_or_list():
+    # No plan when the definitions are neither dict nor list
+    assert parser.compile_plan("invalid_type") is None
 
 
 def test_parse_raw_missing_registers(monkeypatch):
     fake_defs = [{"section": "Broken", "items": [{"titleEN": "No Regs"}]}]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    result = parse_raw([1])
+    plan = parser.compile_plan(fake_defs)
+    result = parse_raw([1], plan=plan)
     assert "No Regs" not in result  # Should skip item with no registers
 
 
@@ -729,10 +690,8 @@ def test_parse_raw_out_of_bounds(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    result = parse_raw([1])
+    plan = parser.compile_plan(fake_defs)
+    result = parse_raw([1], plan=plan)
     assert "Out of Bounds" not in result
 
 
@@ -749,12 +708,10 @@ def test_parse_raw_index_but_block_empty(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
+    plan = parser.compile_plan(fake_defs)
 
     # Raw too short for idx=248, so block will be empty
-    result = parse_raw([0] * 100)
+    result = parse_raw([0] * 100, plan=plan)
     assert "Missing Block" not in result
 
 
@@ -771,17 +728,15 @@ def test_parse_raw_block_empty_and_ascii_fallback(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
+    plan = parser.compile_plan(fake_defs)
 
     # Case 1: raw too short, will skip at line 128
-    result = parse_raw([0] * 100)
+    result = parse_raw([0] * 100, plan=plan)
     assert "ASCII Fallback" not in result
 
     # Case 2: block present but only control characters, triggers fallback to hex at line 139
     raw = [0x0000] * 249
-    result = parse_raw(raw)
+    result = parse_raw(raw, plan=plan)
     assert result["ASCII Fallback"].startswith("0x")
 
 
@@ -794,13 +749,9 @@ def test_load_definitions_all_fail(mock_path_read, mock_pkg_read, caplog):
         assert "Could not read DYRealTime.txt" in caplog.text
 
 
-def test_parse_raw_invalid_definitions_type_logs(monkeypatch, caplog):
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", 1234
-    )
+def test_parse_raw_invalid_definitions_type_logs(caplog):
     with caplog.at_level("ERROR"):
-        result = parse_raw([])
-        assert result == {}
+        assert parser.compile_plan(1234) is None
         assert "Invalid definitions type" in caplog.text
 
 
@@ -817,11 +768,9 @@ def test_parse_raw_offset_cast_fails(monkeypatch, caplog):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
+    plan = parser.compile_plan(fake_defs)
     with caplog.at_level("DEBUG"):
-        result = parse_raw([1])
+        result = parse_raw([1], plan=plan)
         assert "Bad Offset" not in result
         assert "Error parsing Bad Offset" in caplog.text
 
@@ -840,10 +789,8 @@ def test_parse_raw_reversed_field(monkeypatch):
             ],
         }
     ]
-    monkeypatch.setattr(
-        "custom_components.deye_inverter.InverterDataParser._DEFINITIONS", fake_defs
-    )
-    result = parse_raw([0x0001, 0x0002])
+    plan = parser.compile_plan(fake_defs)
+    result = parse_raw([0x0001, 0x0002], plan=plan)
     assert "Total Energy Bought" in result
     assert result["Total Energy Bought"] == 131073.0  # 0x00020001
 
@@ -895,35 +842,29 @@ def test_enum_builder_skips_item_without_title(monkeypatch):
 
 
 def test_parse_skips_item_without_registers(monkeypatch):
-    monkeypatch.setattr(parser, "_DEFINITIONS", [{"items": [{"titleEN": "NoRegs"}]}])
-    result = parser.parse_raw([0])
+    plan = parser.compile_plan([{"items": [{"titleEN": "NoRegs"}]}])
+    result = parser.parse_raw([0], plan=plan)
     assert "NoRegs" not in result
 
 
 def test_parse_rule_6(monkeypatch):
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
-        [{"items": [{"titleEN": "Bitfield", "registers": ["003B"], "parserRule": 6}]}],
+    plan = parser.compile_plan(
+        [{"items": [{"titleEN": "Bitfield", "registers": ["003B"], "parserRule": 6}]}]
     )
-    result = parser.parse_raw([255])
+    result = parser.parse_raw([255], plan=plan)
     assert result["Bitfield"] == "0x00FF"
 
 
 def test_parse_ascii_fallback(monkeypatch):
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
-        [{"items": [{"titleEN": "Serial", "parserRule": 5, "registers": ["003B"]}]}],
+    plan = parser.compile_plan(
+        [{"items": [{"titleEN": "Serial", "parserRule": 5, "registers": ["003B"]}]}]
     )
-    result = parser.parse_raw([0x0001])
+    result = parser.parse_raw([0x0001], plan=plan)
     assert result["Serial"].startswith("0x")
 
 
 def test_parse_enum_unknown(monkeypatch):
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -940,18 +881,15 @@ def test_parse_enum_unknown(monkeypatch):
                 ]
             }
         ],
+        {(0x003B, "EnumField"): {1: "On"}},
     )
-    parser._ENUM_MAPPINGS.clear()
-    parser._ENUM_MAPPINGS[(0x003B, "EnumField")] = {1: "On"}
-    result = parser.parse_raw([999])
+    result = parser.parse_raw([999], plan=plan)
     assert result["EnumField"] == "Unknown (999)"
 
 
 def test_parse_exception_in_block(monkeypatch, caplog):
     caplog.set_level("DEBUG")
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -962,17 +900,15 @@ def test_parse_exception_in_block(monkeypatch, caplog):
                     }
                 ]
             }
-        ],
+        ]
     )
-    result = parser.parse_raw([1])
+    result = parser.parse_raw([1], plan=plan)
     assert "CrashingField" not in result
     assert "Error parsing CrashingField" in caplog.text
 
 
 def test_parse_raw_final_return(monkeypatch):
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -986,9 +922,9 @@ def test_parse_raw_final_return(monkeypatch):
                     },
                 ]
             }
-        ],
+        ]
     )
-    result = parser.parse_raw([99, 42])
+    result = parser.parse_raw([99, 42], plan=plan)
     assert result["Bitfield"] == "0x0063"
     assert result["FinalField"] == 42.0
 
@@ -1013,9 +949,7 @@ def test_enum_mapping_skips_item_without_title(monkeypatch):
 def test_parse_skips_item_with_no_registers(monkeypatch):
     from custom_components.deye_inverter import InverterDataParser as parser
 
-    monkeypatch.setattr(
-        parser,
-        "_DEFINITIONS",
+    plan = parser.compile_plan(
         [
             {
                 "items": [
@@ -1025,34 +959,340 @@ def test_parse_skips_item_with_no_registers(monkeypatch):
                     }
                 ]
             }
-        ],
+        ]
     )
 
-    result = parser.parse_raw([123])
+    result = parser.parse_raw([123], plan=plan)
     assert "NoRegsField" not in result
 
 
+# === Compiled parse plan ===
+
+
+def test_compile_plan_resolves_kinds():
+    """Decoder kind, word order and enum table are fixed at compile time."""
+    plan = parser.compile_plan(parser._load_definitions())
+    metrics = {m.title: m for m in plan.metrics}
+
+    assert metrics["PV1 Power"].kind == parser.KIND_NUMERIC
+    assert metrics["DC Temperature"].kind == parser.KIND_TEMPERATURE
+    assert metrics["Battery Status"].kind == parser.KIND_DECODER
+    assert metrics["Running Status"].kind == parser.KIND_ENUM
+    assert metrics["Alert"].kind == parser.KIND_BITFIELD
+    assert metrics["Inverter ID"].kind == parser.KIND_ASCII
+    assert metrics["Work Mode"].decoder is parser.resolve_decoder(0x00F4, "work_mode")
+    assert metrics["Total Production"].reverse
+    assert metrics["Total Production"].indices == (
+        parser.register_index(0x0060),
+        parser.register_index(0x0061),
+    )
+    assert plan.width == 117
+
+
+def test_decoder_field_selects_registered_decoder(monkeypatch):
+    monkeypatch.setattr(parser, "_DECODERS", dict(parser._DECODERS))
+    parser.register_decoder("doubled")(lambda block, value, metric: value * 2)
+    parser.register_decoder("doubled", register=0x003C)(
+        lambda block, value, metric: f"{metric.title}: {value}"
+    )
+    plan = parser.compile_plan(
+        [
+            {
+                "items": [
+                    {"titleEN": "Generic", "registers": ["003B"], "decoder": "doubled"},
+                    {
+                        "titleEN": "Specific",
+                        "registers": ["003C"],
+                        "decoder": "doubled",
+                    },
+                    {
+                        "titleEN": "Status",
+                        "registers": ["003D"],
+                        "decoder": "grid_status",
+                    },
+                ]
+            }
+        ]
+    )
+    assert parser.parse_raw([21, 5, 0xFFFF], plan=plan) == {
+        "Generic": 42,
+        "Specific": "Specific: 5",
+        "Status": "SELL",
+    }
+
+
+def test_unknown_decoder_falls_back_to_numeric(monkeypatch, caplog):
+    plan = parser.compile_plan(
+        [{"items": [{"titleEN": "Plain", "registers": ["003B"], "decoder": "nope"}]}]
+    )
+    with caplog.at_level("WARNING"):
+        assert parser.parse_raw([3], plan=plan) == {"Plain": 3.0}
+    assert "Unknown decoder 'nope' for Plain" in caplog.text
+
+
+def test_compile_plan_invalid_definitions():
+    assert parser.compile_plan(42) is None
+
+
+def test_parse_raw_decodes_the_given_plan():
+    first = parser.compile_plan(
+        [{"items": [{"titleEN": "First", "registers": ["003B"]}]}]
+    )
+    assert parser.parse_raw([7], plan=first) == {"First": 7.0}
+
+    second = parser.compile_plan(
+        [{"items": [{"titleEN": "Second", "registers": ["003B"], "ratio": 2}]}]
+    )
+    assert parser.parse_raw([7], plan=second) == {"Second": 14.0}
+    # Without a plan, the profile's compiled definitions
+    assert "PV1 Power" in parser.parse_raw([7] * 117)
+
+
+def test_parse_uses_the_cached_plan(monkeypatch):
+    """Parsing never reads the definitions file or recompiles."""
+    plan = parser.load_compiled_definitions().plan
+    monkeypatch.setattr(
+        parser,
+        "compile_plan",
+        lambda *a, **k: (_ for _ in ()).throw(AssertionError("recompiled")),
+    )
+    monkeypatch.setattr(
+        parser,
+        "_read_definitions_text",
+        lambda *a, **k: (_ for _ in ()).throw(AssertionError("file read")),
+    )
+    assert parser._current_plan() is plan
+    assert parser.parse_raw([0] * 117)
+
+
 # === Register scaling verified against a real inverter ===
 
 
 def test_power_register_scaling():
-   from custom_components.deye_inverter.InverterDataParser import register_index
-
-   raw = [0] * 117
-   raw[register_index(0x00B2)] = 301  # Total Load Power
-   raw[register_index(0x00B0)] = 301  # Load L1 Power
-   raw[register_index(0x00A9)] = 0x10000 - 432  # Total Grid Power, negative
-   raw[register_index(0x00AA)] = 0x10000 - 432  # External CT L1
-   raw[register_index(0x00BF)] = 0x10000 - 10  # Battery Current, negative
-   raw[register_index(0x00B7)] = 5421 # Battery Voltage (x0.1)
-
-   result = parse_raw(raw)
-   assert result["Total Load Power"] == pytest.approx(301)
-   assert result["Load L1 Power"] == pytest.approx(301)
-   assert result["Total Grid Power"] == pytest.approx(-432)
-   assert result["External CT L1 Power"] == pytest.approx(-432)
-   # V x I must reproduce Battery Power
-   assert result["Battery Current"] == pytest.approx(-0.1)
-   assert result["Battery Voltage"] * result["Battery Current"] == pytest.approx(
-       -5.42, abs=1
-   )
+    from custom_components.deye_inverter.InverterDataParser import register_index
+
+    raw = [0] * 117
+    raw[register_index(0x00B2)] = 301  # Total Load Power
+    raw[register_index(0x00B0)] = 301  # Load L1 Power
+    raw[register_index(0x00A9)] = 0x10000 - 432  # Total Grid Power, negative
+    raw[register_index(0x00AA)] = 0x10000 - 432  # External CT L1
+    raw[register_index(0x00BF)] = 0x10000 - 10  # Battery Current, negative
+    raw[register_index(0x00B7)] = 5421  # Battery Voltage (x0.1)
+
+    result = parse_raw(raw)
+    assert result["Total Load Power"] == pytest.approx(301)
+    assert result["Load L1 Power"] == pytest.approx(301)
+    assert result["Total Grid Power"] == pytest.approx(-432)
+    assert result["External CT L1 Power"] == pytest.approx(-432)
+    # V x I must reproduce Battery Power
+    assert result["Battery Current"] == pytest.approx(-0.1)
+    assert result["Battery Voltage"] * result["Battery Current"] == pytest.approx(
+        -5.42, abs=1
+    )
+
+
+# === NumPy batch decoder ===
+
+
+def test_parse_raw_batch_matches_parse_raw():
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(7)
+    words = rng.integers(0, 0x10000, size=(300, 117))
+    # Edge values: zero, sign bit, all ones
+    words[:30] = rng.choice([0, 1, 0x7FFF, 0x8000, 0xFFFF], size=(30, 117))
+    rows = words.tolist()
+    for row in rows[::4]:
+        row[112:] = [None] * 5  # work-mode block unread
+    for row in rows[1::4]:
+        row[104:] = [None] * 13  # both optional blocks unread
+
+    columns = parser.parse_raw_batch(rows)
+
+    for i, row in enumerate(rows):
+        decoded = {}
+        for title, column in columns.items():
+            value = column[i]
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            decoded[title] = value
+        assert decoded == parser.parse_raw(row)
+
+
+def test_parse_raw_batch_numeric_columns():
+    np = pytest.importorskip("numpy")
+    matrix = np.zeros((2, 117), dtype=np.uint16)
+    matrix[0, parser.register_index(0x00A9)] = 0x10000 - 432  # Total Grid Power
+    matrix[1, parser.register_index(0x00A9)] = 1200
+    matrix[:, parser.register_index(0x005A)] = 1250  # DC Temperature
+
+    columns = parser.parse_raw_batch(matrix)
+
+    assert columns["Total Grid Power"].tolist() == [-432.0, 1200.0]
+    assert columns["Grid Status"].tolist() == ["SELL", "BUY"]
+    assert columns["DC Temperature"].tolist() == [25.0, 25.0]
+
+
+def test_parse_raw_batch_rejects_narrow_matrix():
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        parser.parse_raw_batch([[0] * 10])
+
+
+# === Lazy loading and compiled definitions cache ===
+
+
+def test_import_reads_no_definitions():
+    """Importing the parser does no file I/O; definitions load on first use."""
+    import subprocess
+    import sys
+    from pathlib import Path
+
+    code = (
+        "from custom_components.deye_inverter import InverterDataParser as p\n"
+        "assert not p._COMPILED\n"
+        "assert p.parse_raw([0] * 117)\n"
+        "assert p._COMPILED\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[1],
+        check=True,
+    )
+
+
+def test_compiled_cache_round_trip(tmp_path, monkeypatch):
+    cache_file = tmp_path / "DYRealTime.plan"
+    cold = parser._load_compiled(cache_file)
+    assert cache_file.exists()
+
+    # A warm start must not parse the JSON again
+    monkeypatch.setattr(
+        parser.json,
+        "loads",
+        lambda *a, **k: (_ for _ in ()).throw(AssertionError("JSON parsed")),
+    )
+    warm = parser._load_compiled(cache_file)
+
+    assert warm == cold
+
+
+def test_compiled_cache_invalidated_by_content(tmp_path, monkeypatch):
+    cache_file = tmp_path / "DYRealTime.plan"
+    parser._load_compiled(cache_file)
+
+    defs = [{"items": [{"titleEN": "Only", "registers": ["0x003B"], "unit": "W"}]}]
+    monkeypatch.setattr(parser, "_read_definitions_text", lambda *_: json.dumps(defs))
+    compiled = parser._load_compiled(cache_file)
+
+    assert [m.title for m in compiled.plan.metrics] == ["Only"]
+    assert compiled.sensors == (("Only", "W"),)
+
+
+def test_compiled_cache_unreadable_is_ignored(tmp_path):
+    cache_file = tmp_path / "DYRealTime.plan"
+    cache_file.write_bytes(b"not marshal data")
+    compiled = parser._load_compiled(cache_file)
+    assert compiled.plan.metrics
+    assert parser._read_cache(cache_file, "other key") is None
+
+
+# === Incremental parsing ===
+
+
+def test_incremental_parser_matches_parse_raw():
+    import random
+
+    rnd = random.Random(3)
+    incremental = parser.IncrementalParser()
+    raw = [rnd.randrange(0x10000) for _ in range(117)]
+    previous = {}
+
+    for step in range(200):
+        for _ in range(rnd.choice([0, 1, 3, 20])):
+            raw[rnd.randrange(117)] = rnd.randrange(0x10000)
+        if step % 25 == 0:
+            raw[112:] = [None] * 5  # work-mode block not read this cycle
+        elif raw[112] is None:
+            raw[112:] = [0, 0, 0, 1, 0]
+
+        expected = parse_raw(raw)
+        assert incremental.parse(raw) == expected
+        assert incremental.changed == {
+            t
+            for t in set(expected) | set(previous)
+            if expected.get(t) != previous.get(t)
+        }
+        previous = expected
+
+
+def test_incremental_parser_redecodes_only_dirty_metrics(monkeypatch):
+    incremental = parser.IncrementalParser()
+    raw = [0] * 117
+    incremental.parse(raw)
+
+    decoded = []
+    real = parser._decode_metrics
+
+    def spy(metrics, *args):
+        decoded.extend(m.title for m in metrics)
+        real(metrics, *args)
+
+    monkeypatch.setattr(parser, "_decode_metrics", spy)
+
+    assert incremental.parse(raw)["PV1 Power"] == 0.0
+    assert decoded == [] and incremental.changed == set()
+
+    raw[parser.register_index(0x00BA)] = 480  # PV1 Power
+    result = incremental.parse(raw)
+
+    assert decoded == ["PV1 Power"]
+    assert incremental.changed == {"PV1 Power"}
+    assert result["PV1 Power"] == 480.0
+    assert result["Battery Status"] == "Stand-by"  # carried over
+
+
+def test_incremental_parser_recompiles_on_new_definitions():
+    incremental = parser.IncrementalParser()
+    incremental.parse([5] * 117)
+
+    plan = parser.compile_plan(
+        [{"items": [{"titleEN": "Only", "registers": ["003B"]}]}]
+    )
+    assert incremental.parse([5] * 117, plan=plan) == {"Only": 5.0}
+    assert "Only" in incremental.changed and "PV1 Power" in incremental.changed
+
+
+def test_register_image_from_registers():
+    from custom_components.deye_inverter.RegisterImage import RegisterImage
+
+    raw = list(range(117))
+    raw[1] = None
+    image = RegisterImage.from_registers(raw[:-2])
+
+    assert image.word(0x003B) == 0
+    assert image.word(0x003C) is None  # None entry
+    assert image.word(0x003D) == 2
+    assert image.word(0x00F6) == 114
+    assert image.word(0x00F7) is None  # past the end of raw
+    assert image.word(0x0000) is None  # not in any block
+
+    with pytest.raises(ValueError):
+        image.write(image.size - 1, b"\x00\x01\x00\x02")
+
+
+def test_parse_image_skips_invalidated_registers():
+    from custom_components.deye_inverter.RegisterImage import RegisterImage
+
+    raw = [1] * 117
+    image = RegisterImage.from_registers(raw)
+    assert parser.parse_image(image) == parse_raw(raw)
+
+    incremental = parser.IncrementalParser()
+    assert "Work Mode" in incremental.parse_image(image)
+
+    image.invalidate(0x00F4, 5)
+    result = incremental.parse_image(image)
+    assert "Work Mode" not in result
+    assert incremental.changed == {"Work Mode", "Time of use"}
+    raw[112:] = [None] * 5
+    assert result == parse_raw(raw)
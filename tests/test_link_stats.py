@@ -0,0 +1,59 @@
+import pytest
+
+from custom_components.deye_inverter.LinkStats import Histogram, LinkStats
+
+
+def test_histogram_quantiles_are_interpolated():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) is None
+    for value in (0.03, 0.04, 0.07, 0.4, 12.0):
+        histogram.add(value)
+    assert histogram.quantile(0.4) == pytest.approx(0.05)
+    assert histogram.quantile(0.5) == pytest.approx(0.075)
+    assert histogram.quantile(0.7) == pytest.approx(0.35)
+    # Narrowed to the largest value, not the bucket's upper bound
+    assert histogram.quantile(0.95) == pytest.approx(11.5)
+    assert histogram.quantile(1.0) == 12.0
+    assert histogram.as_dict()["buckets"]["15.0"] == 1
+    assert histogram.as_dict()["count"] == 5
+
+
+def test_requests_counted_per_block_and_for_the_link():
+    stats = LinkStats()
+    stats.answered((0x3B, 0x70), 8, 117, 0.1, rejected=False)
+    stats.answered((0xF4, 0xF8), 8, 5, 0.1, rejected=True)
+    stats.failed((0x3B, 0x70), 8, timed_out=True)
+    stats.failed((0x3B, 0x70), 8, timed_out=False)
+    stats.retried((0x3B, 0x70))
+
+    core = stats.blocks[(0x3B, 0x70)]
+    assert (core.requests, core.answered, core.timeouts, core.errors) == (3, 1, 1, 1)
+    assert core.retries == 1
+    assert (core.bytes_sent, core.bytes_received) == (24, 117)
+    assert stats.link.requests == 4
+    assert stats.link.rejected == 1
+    # Rejections are answers, but carry no registers
+    assert stats.success_ratio == 0.25
+
+
+def test_cycles_and_summary():
+    stats = LinkStats()
+    assert stats.success_ratio is None
+    stats.cycle_done(2.5, failed=False)
+    stats.cycle_done(7.0, failed=True)
+    stats.reconnected()
+    stats.answered((0x96, 0xC3), 8, 97, 0.2, rejected=False)
+
+    summary = stats.summary()
+    assert summary["last_cycle"] == 7.0
+    assert (summary["cycles"], summary["failed_cycles"]) == (2, 1)
+    assert summary["reconnects"] == 1
+    assert summary["latency_p50"] == 0.2
+    assert list(summary["blocks"]) == ["0x0096-0x00C3"]
+
+
+def test_histogram_quantile_of_one_value_is_exact():
+    histogram = Histogram()
+    histogram.add(0.21)
+    assert histogram.quantile(0.5) == pytest.approx(0.21)
+    assert histogram.quantile(0.95) == pytest.approx(0.21)
@@ -0,0 +1,64 @@
+import pytest
+
+from custom_components.deye_inverter.LinkTuner import (
+    INITIAL_ESTIMATE,
+    MIN_SAMPLES,
+    MIN_TIMEOUT,
+    LinkTuner,
+)
+
+
+def test_timeout_follows_learned_round_trips():
+    link = LinkTuner(max_timeout=15.0)
+    assert link.timeout == 15.0
+    assert link.estimate == INITIAL_ESTIMATE
+
+    for _ in range(MIN_SAMPLES):
+        link.success(0.2)
+    assert link.estimate == pytest.approx(0.2)
+    assert link.percentile(0.5) == 0.2
+    assert link.timeout == MIN_TIMEOUT
+
+    # A slow link: the 95th percentile sets the timeout
+    for _ in range(64):
+        link.success(3.0)
+    assert link.timeout == pytest.approx(6.0, abs=0.5)
+
+    # Timeouts in a row double it, up to the maximum
+    link.failure(timed_out=True, paced=False)
+    assert link.timeout == pytest.approx(12.0, abs=1.0)
+    link.failure(timed_out=True, paced=False)
+    assert link.timeout == 15.0
+    link.success(3.0)
+    assert link.timeout < 15.0
+
+
+def test_pause_is_lowered_on_success_and_raised_on_paced_failures():
+    link = LinkTuner(min_pause=0.0, max_pause=0.5)
+    assert link.pause == pytest.approx(0.1)
+    for _ in range(20):
+        link.success(0.1)
+    assert link.pause == 0.0
+
+    link.failure(timed_out=False, paced=False)
+    assert link.pause == 0.0
+    for _ in range(10):
+        link.failure(timed_out=False, paced=True)
+    assert link.pause == 0.5
+
+
+def test_state_round_trip():
+    link = LinkTuner()
+    for rtt in (0.1, 0.3, 0.2):
+        link.success(rtt)
+    restored = LinkTuner()
+    restored.restore(link.state())
+
+    assert restored.state() == link.state()
+    assert restored.timeout == link.timeout
+
+    # Out-of-bounds stored pause is clamped
+    restored = LinkTuner(max_pause=0.5)
+    restored.restore({"pause": 5.0})
+    assert restored.pause == 0.5
+    assert restored.srtt is None
@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.deye_inverter import LoggerConnection as module
+from custom_components.deye_inverter.LoggerConnection import (
+    acquire_connection,
+    close_idle_connections,
+)
+
+
+@pytest.fixture(autouse=True)
+def clients():
+    """A fresh mock client per connection, and an empty registry."""
+    created = []
+
+    def client(*args, **kwargs):
+        mock = MagicMock()
+        mock.writer = None
+
+        def connect():
+            mock.writer = MagicMock()
+
+        mock.connect = AsyncMock(side_effect=connect)
+        mock.disconnect = AsyncMock()
+        created.append(mock)
+        return mock
+
+    with patch.object(module, "PySolarmanV5Async", side_effect=client), patch.dict(
+        module._CONNECTIONS, clear=True
+    ):
+        yield created
+
+
+@pytest.mark.asyncio
+async def test_same_logger_shares_one_client(clients):
+    first = acquire_connection("192.0.2.1", 8899, 1)
+    second = acquire_connection("192.0.2.1", 8899, 1)
+    other = acquire_connection("192.0.2.1", 8899, 2)
+    assert first is second
+    assert other is not first
+    assert len(clients) == 2
+
+    await first.open()
+    await second.open()
+    first.client.connect.assert_awaited_once()
+
+    await first.release()
+    first.client.disconnect.assert_not_awaited()
+    await second.release()
+    await other.release()
+    await close_idle_connections()
+    first.client.disconnect.assert_awaited_once()
+    assert module._CONNECTIONS == {}
+
+
+@pytest.mark.asyncio
+async def test_released_connection_lingers_for_the_next_user(monkeypatch):
+    monkeypatch.setattr(module, "CONNECTION_LINGER", 0.05)
+    connection = acquire_connection("192.0.2.1", 8899, 1)
+    await connection.open()
+    await connection.release()
+
+    # Taken again before it expires: the same, still open client
+    assert acquire_connection("192.0.2.1", 8899, 1) is connection
+    await asyncio.sleep(0.1)
+    connection.client.disconnect.assert_not_awaited()
+
+    await connection.release()
+    await asyncio.sleep(0.1)
+    connection.client.disconnect.assert_awaited_once()
+    assert module._CONNECTIONS == {}
+    # The close task is referenced until done
+    assert connection._closing is not None and connection._closing.done()
+
+
+@pytest.mark.asyncio
+async def test_dropped_connection_is_reopened_by_the_next_turn():
+    with patch.object(module, "PySolarmanV5Async") as client_class:
+        client_class.return_value = MagicMock(writer=None)
+        connection = acquire_connection("192.0.2.9", 8899, 1)
+    assert client_class.call_args.kwargs["auto_reconnect"] is False
+    client = connection.client
+    client.connect = AsyncMock(side_effect=lambda: setattr(client, "writer", 1))
+    client.disconnect = AsyncMock()
+
+    async with connection.turn():
+        pass
+    client.connect.assert_not_awaited()
+    async with connection.turn(connect=True) as opened:
+        assert opened.writer == 1
+    async with connection.turn(connect=True):
+        pass
+    client.connect.assert_awaited_once()
+    await connection.release()
+    await close_idle_connections()
+
+
+@pytest.mark.asyncio
+async def test_unconnected_client_is_closed_on_release():
+    connection = acquire_connection("192.0.2.1", 8899, 1)
+    await connection.release()
+    assert module._CONNECTIONS == {}
+
+
+@pytest.mark.asyncio
+async def test_turns_are_taken_in_arrival_order():
+    connection = acquire_connection("192.0.2.1", 8899, 1)
+    order = []
+
+    async def use(name):
+        async with connection.turn():
+            order.append(name)
+            await asyncio.sleep(0)
+            order.append(name)
+
+    await asyncio.gather(*(use(name) for name in "abc"))
+    assert order == ["a", "a", "b", "b", "c", "c"]
+    await connection.release()
@@ -0,0 +1,211 @@
+"""End-to-end tests against the fake logger in benchmarks/logger_simulator.py."""
+
+import asyncio
+
+import pytest
+from pysolarmanv5 import NoSocketAvailableError
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from benchmarks.logger_simulator import Faults, LoggerSimulator
+from custom_components.deye_inverter.const import CONF_PROFILE, CONF_SLAVE_IDS, DOMAIN
+from custom_components.deye_inverter.coordinator import DeyeDataUpdateCoordinator
+from custom_components.deye_inverter.InverterData import (
+    InverterData,
+    ModbusReadError,
+    test_connection as connection_test,
+)
+from custom_components.deye_inverter.LoggerConnection import close_idle_connections
+
+SERIAL = 2306123456
+REGISTERS = {
+    0x0000: 0x0003,  # single-phase hybrid
+    0x00B8: 87,  # Battery SOC
+    0x00BA: 500,  # PV1 Power
+    0x00BB: 300,  # PV2 Power
+}
+
+
+@pytest.fixture(autouse=True)
+async def local_sockets(socket_enabled):
+    """The simulator listens on 127.0.0.1, which the test plugin allows."""
+    yield
+    # Connections released by the test would linger
+    await close_idle_connections()
+
+
+@pytest.fixture
+async def logger():
+    async with LoggerSimulator(SERIAL, dict(REGISTERS), seed=1) as simulator:
+        yield simulator
+
+
+def inverter_for(simulator):
+    return InverterData("127.0.0.1", simulator.port, str(SERIAL))
+
+
+async def test_connection_reads_device_type(logger):
+    assert await connection_test("127.0.0.1", logger.port, str(SERIAL)) == 0x0003
+    assert logger.stats.requests == [(0x0000, 1)]
+
+
+async def test_fetch_data_end_to_end(logger):
+    inverter = inverter_for(logger)
+    await inverter.connect()
+    try:
+        data = await inverter.fetch_data()
+        assert data["PV1 Power"] == 500
+        assert data["Battery SOC"] == 87
+        assert not data.partial
+
+        logger.registers[0x00BA] = 650
+        data = await inverter.fetch_data()
+        assert data["PV1 Power"] == 650
+        assert "PV1 Power" in inverter.changed_metrics
+    finally:
+        await inverter.close()
+
+
+async def test_second_client_is_refused(logger):
+    inverter = inverter_for(logger)
+    await inverter.connect()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", logger.port)
+        assert await reader.read() == b""
+        writer.close()
+        assert logger.stats.rejected_connections == 1
+        # The first client is unaffected
+        assert (await inverter.fetch_data())["PV1 Power"] == 500
+    finally:
+        await inverter.close()
+
+
+async def test_connection_test_shares_the_open_connection(logger):
+    inverter = inverter_for(logger)
+    await inverter.connect()
+    try:
+        assert await connection_test("127.0.0.1", logger.port, str(SERIAL)) == 0x0003
+        assert (await inverter.fetch_data())["PV1 Power"] == 500
+        assert logger.stats.connections == 1
+        assert logger.stats.rejected_connections == 0
+    finally:
+        await inverter.close()
+
+
+async def test_concurrent_users_take_turns(logger):
+    first, second = inverter_for(logger), inverter_for(logger)
+    await asyncio.gather(first.connect(), second.connect())
+    try:
+        for data in await asyncio.gather(first.fetch_data(), second.fetch_data()):
+            assert data["PV1 Power"] == 500
+        assert logger.stats.connections == 1
+    finally:
+        await first.close()
+        await second.close()
+
+
+async def test_released_connection_is_reused(logger):
+    inverter = inverter_for(logger)
+    await inverter.connect()
+    await inverter.close()
+
+    reloaded = inverter_for(logger)
+    await reloaded.connect()
+    try:
+        assert (await reloaded.fetch_data())["PV1 Power"] == 500
+        assert logger.stats.connections == 1
+    finally:
+        await reloaded.close()
+
+
+async def test_illegal_optional_registers_are_backed_off():
+    faults = Faults(illegal={0x0003})
+    async with LoggerSimulator(SERIAL, dict(REGISTERS), faults) as simulator:
+        inverter = inverter_for(simulator)
+        await inverter.connect()
+        try:
+            for _ in range(2):
+                data = await inverter.fetch_data()
+                assert data["PV1 Power"] == 500
+            assert inverter.identity == {}
+            # Rejected once, then skipped until its retry delay has passed
+            assert simulator.stats.exceptions == 1
+        finally:
+            await inverter.close()
+
+
+async def test_corrupted_frames_fail_the_read(monkeypatch):
+    monkeypatch.setattr(
+        "custom_components.deye_inverter.InverterData.RETRY_BACKOFF", 0.0
+    )
+    faults = Faults(corrupt_rate=1.0)
+    async with LoggerSimulator(SERIAL, dict(REGISTERS), faults) as simulator:
+        inverter = inverter_for(simulator)
+        await inverter.connect()
+        try:
+            with pytest.raises(ModbusReadError):
+                await inverter.fetch_data()
+            # Each core block was retried
+            assert len(simulator.stats.requests) > 2
+        finally:
+            await inverter.close()
+
+
+async def test_dropped_connection_is_reported(logger):
+    inverter = inverter_for(logger)
+    await inverter.connect()
+    await logger.stop()
+    # Let the client notice the connection is gone
+    await asyncio.sleep(0.1)
+    try:
+        with pytest.raises((ModbusReadError, NoSocketAvailableError)):
+            await inverter.fetch_data()
+    finally:
+        await inverter.close()
+
+
+async def test_coordinator_end_to_end(hass, logger):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "host": "127.0.0.1",
+            "port": logger.port,
+            "serial": str(SERIAL),
+            CONF_PROFILE: "hybrid_single_phase",
+        },
+    )
+    entry.add_to_hass(hass)
+    coordinator = DeyeDataUpdateCoordinator(hass, entry, installed_power=5.0)
+    try:
+        data = await coordinator._async_update_data()
+        assert data["PV1 Power"] == 500
+        assert data["PV2 Power"] == 300
+    finally:
+        await coordinator.async_shutdown()
+
+
+async def test_parallel_units_share_the_connection(hass):
+    """Each slave ID is its own unit; the site sums add them up."""
+    units = {1: dict(REGISTERS), 2: {**REGISTERS, 0x00BA: 700, 0x00BB: 100}}
+    async with LoggerSimulator(SERIAL, seed=1, units=units) as simulator:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                "host": "127.0.0.1",
+                "port": simulator.port,
+                "serial": str(SERIAL),
+                CONF_PROFILE: "hybrid_single_phase",
+                CONF_SLAVE_IDS: [1, 2],
+            },
+        )
+        entry.add_to_hass(hass)
+        coordinator = DeyeDataUpdateCoordinator(hass, entry, installed_power=5.0)
+        (follower,) = coordinator.followers
+        try:
+            data = await coordinator._async_update_data()
+            assert data["PV1 Power"] == 500
+            assert follower.data["PV1 Power"] == 700
+            assert coordinator.site_data["PV1 Power"] == 1200
+            assert coordinator.site_data["PV2 Power"] == 400
+            assert simulator.stats.connections == 1
+        finally:
+            await coordinator.async_shutdown()
@@ -0,0 +1,58 @@
+from custom_components.deye_inverter import InverterDataParser as parser
+from custom_components.deye_inverter.profiles import (
+    DEFAULT_PROFILE,
+    PROFILES,
+    get_profile,
+    profile_for_device_type,
+)
+
+
+def test_profile_for_device_type():
+    assert profile_for_device_type(0x0003) == "hybrid_single_phase"
+    assert profile_for_device_type(0x0005) == "hybrid_three_phase"
+    assert profile_for_device_type(0x0006) == "hybrid_three_phase"
+    # Unknown models fall back to the default map
+    assert profile_for_device_type(0x0042) == DEFAULT_PROFILE
+
+
+def test_get_profile_falls_back_to_default():
+    assert get_profile(None).name == DEFAULT_PROFILE
+    assert get_profile("no_such_model").name == DEFAULT_PROFILE
+    assert get_profile("hybrid_three_phase").definitions == "DYRealTime3P.txt"
+
+
+def test_every_profile_compiles_its_whole_map():
+    for name, profile in PROFILES.items():
+        definitions = parser._load_definitions(profile.definitions)
+        items = [i for s in definitions for i in s["items"]]
+        compiled = parser.load_compiled_definitions(name)
+
+        # Every item is inside the profile's blocks, so none is dropped
+        assert len(compiled.plan.metrics) == len(items), name
+        assert all(end - start < 125 for start, end in profile.blocks), name
+
+        raw = [0] * compiled.plan.width
+        assert len(parser.parse_raw(raw, name)) == len(compiled.sensors), name
+
+
+def test_compiled_definitions_are_shared():
+    first = parser.load_compiled_definitions("hybrid_three_phase")
+    assert parser.load_compiled_definitions("hybrid_three_phase") is first
+    assert parser.load_compiled_definitions() is not first
+
+
+def test_three_phase_values():
+    profile = PROFILES["hybrid_three_phase"]
+    indices = parser._register_indices(profile.blocks)
+    raw = [0] * parser.load_compiled_definitions(profile.name).plan.width
+    raw[indices[0x024C]] = 87  # Battery SOC
+    raw[indices[0x0271]] = 0x10000 - 1500  # Total Grid Power, exporting
+    raw[indices[0x0216]] = 0x5678  # Total Production, low word first
+    raw[indices[0x0217]] = 0x0001
+
+    result = parser.parse_raw(raw, profile.name)
+
+    assert result["Battery SOC"] == 87
+    assert result["Total Grid Power"] == -1500
+    assert result["Grid Status"] == "SELL"
+    assert result["Total Production"] == round(0x15678 * 0.1, 2)
@@ -0,0 +1,81 @@
+import pytest
+
+from custom_components.deye_inverter.ReadPlanner import (
+    ReadMap,
+    ReadPlan,
+    plan_profile_reads,
+    plan_reads,
+)
+
+
+def test_plan_reads_bridges_small_gaps_only():
+    registers = [0x10, 0x11, 0x14, 0x40, 0x41]
+    assert plan_reads(registers, max_gap=2) == ((0x10, 0x14), (0x40, 0x41))
+    assert plan_reads(registers, max_gap=1) == (
+        (0x10, 0x11),
+        (0x14, 0x14),
+        (0x40, 0x41),
+    )
+    assert plan_reads(registers, max_gap=100) == ((0x10, 0x41),)
+    assert plan_reads([]) == ()
+
+
+def test_plan_reads_respects_request_size():
+    registers = range(0, 300)
+    blocks = plan_reads(registers)
+    assert len(blocks) == 3
+    assert all(last - first + 1 <= 125 for first, last in blocks)
+    assert [r for first, last in blocks for r in range(first, last + 1)] == list(
+        registers
+    )
+
+    # Fewest requests first, then fewest registers read
+    assert plan_reads([0, 1, 9, 10], max_registers=10, max_gap=10) == (
+        (0, 1),
+        (9, 10),
+    )
+    with pytest.raises(ValueError):
+        plan_reads([1], max_registers=0)
+
+
+def test_plan_reads_stays_inside_readable_blocks():
+    registers = [0x6F, 0x70, 0x96, 0x97]
+    assert plan_reads(registers, max_gap=64) == ((0x6F, 0x97),)
+    assert plan_reads(registers, max_gap=64, readable=[(0x3B, 0x70), (0x96, 0xC3)]) == (
+        (0x6F, 0x70),
+        (0x96, 0x97),
+    )
+    with pytest.raises(ValueError):
+        plan_reads([0x80], readable=[(0x3B, 0x70)])
+
+
+def test_plan_profile_reads_keeps_core_and_optional_apart():
+    plan = plan_profile_reads(
+        [0x04, 0x05, 0x3B, 0x3C, 0x60, 0xF4],
+        core_blocks=[(0x3B, 0x70)],
+        optional_blocks=[(0x03, 0x0E), (0xF4, 0xF8)],
+        max_gap=64,
+    )
+    assert plan == ReadPlan(core=((0x3B, 0x60),), optional=((0x04, 0x05), (0xF4, 0xF4)))
+
+
+def test_plan_reads_never_spans_a_split():
+    registers = [0x10, 0x11, 0x14, 0x18]
+    assert plan_reads(registers, max_gap=8, splits=[0x14]) == (
+        (0x10, 0x11),
+        (0x14, 0x18),
+    )
+    # Splits outside the registers change nothing
+    assert plan_reads(registers, max_gap=8, splits=[0x10, 0x40]) == ((0x10, 0x18),)
+
+
+def test_plan_profile_reads_avoids_the_read_map():
+    read_map = ReadMap(unreadable=frozenset({0x40}), splits=frozenset({0x50}))
+    plan = plan_profile_reads(
+        [0x3B, 0x40, 0x41, 0x4F, 0x50, 0x60],
+        core_blocks=[(0x3B, 0x70)],
+        optional_blocks=[],
+        max_gap=64,
+        read_map=read_map,
+    )
+    assert plan.core == ((0x3B, 0x3B), (0x41, 0x4F), (0x50, 0x60))
@@ -0,0 +1,47 @@
+import pytest
+
+from custom_components.deye_inverter.ReadRecovery import bisect_reads
+
+
+def _logger(bad=(), max_registers=125):
+    """read() of a logger rejecting some registers and long requests."""
+    requests = []
+
+    async def read(first, last):
+        requests.append((first, last))
+        if last - first + 1 > max_registers:
+            return False
+        return not any(first <= reg <= last for reg in bad)
+
+    return read, requests
+
+
+@pytest.mark.asyncio
+async def test_bisection_finds_the_bad_register():
+    read, requests = _logger(bad={0x20})
+    registers = list(range(0x10, 0x30))
+
+    found = await bisect_reads(registers, read)
+    assert found.unreadable == {0x20}
+    assert found.splits == set()
+    assert found.readable == len(registers) - 1
+    assert len(requests) < len(registers) // 2
+
+
+@pytest.mark.asyncio
+async def test_bisection_splits_requests_that_are_too_long():
+    read, _ = _logger(max_registers=10)
+    registers = list(range(0x10, 0x30))
+
+    found = await bisect_reads(registers, read)
+    assert found.unreadable == set()
+    assert found.readable == len(registers)
+    assert found.splits == {0x18, 0x20, 0x28}
+
+
+@pytest.mark.asyncio
+async def test_bisection_of_unreadable_registers():
+    read, _ = _logger(bad={0x03, 0x04})
+    found = await bisect_reads([0x03, 0x04], read)
+    assert found.readable == 0
+    assert found.unreadable == {0x03, 0x04}
@@ -5,11 +5,18 @@ from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.const import EntityCategory
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
-from custom_components.deye_inverter.entity_descriptions import build_descriptions
+from custom_components.deye_inverter.entity_descriptions import (
+    LINK_SENSOR_DESCRIPTIONS,
+    build_descriptions,
+    build_site_descriptions,
+)
+from custom_components.deye_inverter.LinkStats import LinkStats
 from custom_components.deye_inverter.sensor import (
     DeyeInverterSensor,
+    DeyeLinkSensor,
     DeyeMetricSensor,
     DeyeProductionPercentSensor,
+    DeyeSiteSensor,
 )
 
 
@@ -65,6 +72,18 @@ def test_device_info(mock_coordinator):
     assert info["name"] == "Deye Inverter ABC123"
     assert info["model"] == "Hybrid Inverter"
 
+
+def test_device_info_from_identity(mock_coordinator):
+    """Serial number and firmware come from the cached inverter identity."""
+    mock_coordinator.device_identity = {
+        "serial_number": "2305131234",
+        "sw_version": "3115/1234",
+    }
+    info = DeyeInverterSensor(mock_coordinator).device_info
+
+    assert info["serial_number"] == "2305131234"
+    assert info["sw_version"] == "3115/1234"
+
 def test_native_value_fallback():
     """Ensure native_value returns 0.0 on bad data."""
     coordinator = MagicMock()
@@ -133,7 +152,7 @@ def test_build_descriptions_covers_device_info_metrics():
 
 def test_registers_outside_read_blocks_are_skipped():
     """An item whose registers are not covered by any read block is excluded."""
-    from custom_components.deye_inverter.entity_descriptions import (
+    from custom_components.deye_inverter.InverterDataParser import (
         _registers_in_read_range,
     )
 
@@ -213,3 +232,90 @@ def test_metric_sensor_handles_none_data(mock_coordinator):
 
     assert sensor.native_value is None
     assert sensor.available is False
+
+def test_metric_sensor_writes_state_only_on_change(mock_coordinator):
+    sensor = DeyeMetricSensor(mock_coordinator, _description("PV1 Power"))
+    sensor.async_write_ha_state = MagicMock()
+
+    mock_coordinator.changed_metrics = {"PV1 Power"}
+    sensor._handle_coordinator_update()
+    mock_coordinator.changed_metrics = {"PV2 Power"}
+    sensor._handle_coordinator_update()
+    assert sensor.async_write_ha_state.call_count == 1
+
+    # Availability changes are written even when the value did not change
+    mock_coordinator.last_update_success = False
+    sensor._handle_coordinator_update()
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+# === Link sensors ===
+
+def _link_sensor(coordinator, key):
+    (description,) = [d for d in LINK_SENSOR_DESCRIPTIONS if d.key == key]
+    return DeyeLinkSensor(coordinator, description)
+
+
+def test_link_sensors_are_disabled_diagnostics():
+    for description in LINK_SENSOR_DESCRIPTIONS:
+        assert description.entity_category is EntityCategory.DIAGNOSTIC
+        assert description.entity_registry_enabled_default is False
+
+
+def test_link_sensor_values(mock_coordinator):
+    stats = LinkStats()
+    for rtt in (0.08, 0.09, 0.15, 0.3):
+        stats.answered((0x3B, 0x70), 8, 120, rtt, rejected=False)
+    stats.failed((0x3B, 0x70), 8, timed_out=True)
+    stats.cycle_done(1.234, failed=False)
+    mock_coordinator.link_stats = stats
+
+    assert _link_sensor(mock_coordinator, "link_latency_p50").native_value == 100
+    assert _link_sensor(mock_coordinator, "link_latency_p95").native_value == 280
+    assert _link_sensor(mock_coordinator, "link_success_ratio").native_value == 80.0
+    sensor = _link_sensor(mock_coordinator, "last_update_duration")
+    assert sensor.native_value == 1.23
+    assert sensor.unique_id == "ABC123_last_update_duration"
+    assert sensor.available is True
+
+
+def test_link_sensor_unavailable_before_connecting(mock_coordinator):
+    mock_coordinator.link_stats = None
+    sensor = _link_sensor(mock_coordinator, "link_latency_p50")
+    assert sensor.available is False
+    assert sensor.native_value is None
+
+
+# === Parallel units ===
+
+def test_follower_unit_is_a_sub_device(mock_coordinator):
+    follower = MagicMock(spec=DataUpdateCoordinator)
+    follower.serial = "ABC123"
+    follower.unit_id = "ABC123_2"
+    follower.slave_id = 2
+    follower.data = {"PV1 Power": 700}
+    sensor = DeyeMetricSensor(follower, _description("PV1 Power"))
+
+    info = sensor.device_info
+    assert info["identifiers"] == {("deye_inverter", "ABC123_2")}
+    assert info["name"] == "Deye Inverter ABC123 unit 2"
+    assert info["via_device"] == ("deye_inverter", "ABC123")
+    assert sensor.unique_id.startswith("ABC123_2_")
+    assert sensor.native_value == 700
+
+
+def test_site_sensor_sums_the_units(mock_coordinator):
+    (description,) = [
+        d for d in build_site_descriptions() if d.metric_title == "PV1 Power"
+    ]
+    assert description.name == "Site PV1 Power"
+    assert "Battery SOC" not in {d.metric_title for d in build_site_descriptions()}
+    mock_coordinator.site_data = {"PV1 Power": 1200}
+    sensor = DeyeSiteSensor(mock_coordinator, description)
+
+    assert sensor.native_value == 1200
+    assert sensor.available is True
+    assert sensor.device_info["identifiers"] == {("deye_inverter", "ABC123")}
+
+    mock_coordinator.site_data = {}
+    assert sensor.available is False
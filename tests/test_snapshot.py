@@ -0,0 +1,62 @@
+import pytest
+
+from custom_components.deye_inverter import InverterDataParser as parser
+from custom_components.deye_inverter.Snapshot import MISSING, Snapshot
+
+
+def test_snapshot_is_a_read_only_mapping_by_title():
+    ids = {"PV1 Power": 0, "Grid Status": 1, "Alert": 2}
+    snapshot = Snapshot([120.0, MISSING, "0x0000"], ids, timestamp=5.0)
+
+    assert snapshot == {"PV1 Power": 120.0, "Alert": "0x0000"}
+    assert list(snapshot) == ["PV1 Power", "Alert"]
+    assert len(snapshot) == 2
+    assert snapshot["PV1 Power"] == 120.0
+    assert snapshot.get("Grid Status", "n/a") == "n/a"
+    assert snapshot.get("Unknown") is None
+    assert "Grid Status" not in snapshot and "Unknown" not in snapshot
+    with pytest.raises(KeyError):
+        snapshot["Grid Status"]
+    with pytest.raises(TypeError):
+        snapshot["PV1 Power"] = 0.0  # type: ignore[index]
+
+    assert snapshot.metric_id("Alert") == 2
+    assert snapshot.value(0) == 120.0 and snapshot.value(1) is None
+    assert snapshot.timestamp == 5.0
+
+
+def test_parse_raw_snapshots_share_the_plan_index():
+    raw = [0] * 117
+    first = parser.parse_raw(raw)
+    second = parser.parse_raw(raw)
+
+    assert first == second
+    assert first._ids is second._ids
+    assert first.timestamp <= second.timestamp
+    metric_id = first.metric_id("PV1 Power")
+    assert metric_id is not None and first.value(metric_id) == 0.0
+
+
+def test_incremental_snapshots_are_not_modified_later():
+    incremental = parser.IncrementalParser()
+    raw = [0] * 117
+    first = incremental.parse(raw)
+
+    raw[parser.register_index(0x00BA)] = 480  # PV1 Power
+    second = incremental.parse(raw)
+
+    assert first["PV1 Power"] == 0.0
+    assert second["PV1 Power"] == 480.0
+
+
+def test_snapshot_read_times_and_ages():
+    ids = {"PV1 Power": 0, "Inverter ID": 1, "Work Mode": 2}
+    snapshot = Snapshot(
+        [120.0, "2305131234", MISSING], ids, timestamp=100.0, read_at=[100.0, 40.0, 0.0]
+    )
+
+    assert snapshot.read_at("PV1 Power") == 100.0
+    assert snapshot.age("Inverter ID") == 60.0
+    assert snapshot.age("Work Mode") is None
+    assert snapshot.age("Unknown") is None
+    assert Snapshot([1.0], {"PV1 Power": 0}).age("PV1 Power") is None